@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+
+"""A stand-in query server and a load test for `multihypergraph.aio`.
+
+The server speaks one JSON object per line. Requests look like
+    {"op": "subgraph", "g": "ab,bc", "h": "xy,yz,zx", "seconds": 1.0}
+where "op" is "subgraph" or "isomorphism" and "seconds" is optional, and
+replies look like {"morphism": {...}} or {"error": "..."}.
+The load test starts the server in-process and runs concurrent clients
+against it. Each client sends seeded random queries (see
+`multihypergraph.generators`), some of them repeated, and waits for each
+reply before sending the next. It reports throughput, latency percentiles,
+the number of merged requests and how late the event loop ran a heartbeat,
+which is the time the loop was blocked.
+Run with `python benchmarks/bench_aio.py`, or `--blocking` to compare with a
+server that calls `subgraph` directly on the event loop, or `--serve` to
+only run the server.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from multihypergraph import morphisms as M
+from multihypergraph.aio import MorphismService
+from multihypergraph.generators import random_graph, random_subgraph
+from multihypergraph.matching import Budget, SearchTimeout
+
+Query = Dict[str, Any]
+
+
+# Define the server.
+async def answer(service: Optional[MorphismService], request: Query) \
+    -> Dict[str, Any]:
+    """Answer one request, on the service or, if there is none, directly on
+    the event loop."""
+    budget: Optional[Budget] = None
+    if request.get('seconds') is not None:
+        budget = Budget(seconds=request['seconds'])
+    try:
+        if request['op'] == 'subgraph':
+            morphism = (M.subgraph(request['g'], request['h'])
+                        if service is None else
+                        await service.subgraph(request['g'], request['h'],
+                                               budget))
+        elif request['op'] == 'isomorphism':
+            morphism = (M.isomorphism(request['g'], request['h'])
+                        if service is None else
+                        await service.isomorphism(request['g'], request['h'],
+                                                  budget))
+        else:
+            return {'error': f'unknown op {request["op"]!r}'}
+    except SearchTimeout:
+        return {'error': 'timeout'}
+    return {'morphism': morphism}
+
+
+async def serve(host: str, port: int, service: Optional[MorphismService]) \
+    -> asyncio.base_events.Server:
+    """Start a server answering requests on a host and port."""
+    async def handle(reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line: bytes = await reader.readline()
+                if not line:
+                    break
+                reply: Dict[str, Any] = await answer(service,
+                                                     json.loads(line))
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+# Define the load test.
+def queries(count: int, repeats: float, seed: int) -> List[Query]:
+    """Return seeded random queries, a fraction 'repeats' of which repeat an
+    earlier query."""
+    rng: random.Random = random.Random(seed)
+    result: List[Query] = []
+    for i in range(count):
+        if result and rng.random() < repeats:
+            result.append(rng.choice(result))
+            continue
+        h = random_graph(rng.randint(20, 60), rng.randint(40, 120), arity=3,
+                         multiplicity=2, seed=seed + i)
+        if rng.random() < 0.5:
+            result.append({'op': 'subgraph', 'h': h,
+                           'g': random_subgraph(h, rng.randint(3, 8),
+                                                seed=seed + i)})
+        else:
+            result.append({'op': 'subgraph', 'h': h,
+                           'g': random_graph(6, 8, arity=3, seed=seed + i)})
+    return result
+
+
+async def client(host: str, port: int, work: List[Query],
+                 latencies: List[float]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    for query in work:
+        start: float = time.perf_counter()
+        writer.write(json.dumps(query).encode() + b'\n')
+        await writer.drain()
+        json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def heartbeat(lags: List[float], interval: float = 0.01) -> None:
+    """Record how late the event loop wakes up, until cancelled."""
+    while True:
+        start: float = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    service: Optional[MorphismService] = None
+    if not args.blocking:
+        service = MorphismService(args.workers, args.max_pending)
+    server: asyncio.base_events.Server
+    server = await serve(args.host, args.port, service)
+    port: int = server.sockets[0].getsockname()[1]
+    work: List[Query] = queries(args.requests, args.repeats, args.seed)
+    latencies: List[float] = []
+    lags: List[float] = []
+    beat: asyncio.Task = asyncio.ensure_future(heartbeat(lags))
+    start: float = time.perf_counter()
+    await asyncio.gather(*[
+        client(args.host, port, work[i::args.clients], latencies)
+        for i in range(args.clients)])
+    seconds: float = time.perf_counter() - start
+    beat.cancel()
+    server.close()
+    await server.wait_closed()
+    merged: int = 0
+    if service is not None:
+        merged = service.merged
+        await service.close()
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {'mode': 'blocking' if args.blocking else 'service',
+            'clients': args.clients, 'requests': len(latencies),
+            'seconds': seconds,
+            'requests per second': len(latencies) / seconds,
+            'latency p50': percentile(0.5), 'latency p95': percentile(0.95),
+            'latency p99': percentile(0.99), 'merged': merged,
+            'largest loop lag': max(lags, default=0.0)}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0,
+                        help='port to listen on (default: any free port)')
+    parser.add_argument('--serve', action='store_true',
+                        help='only run the server, until interrupted')
+    parser.add_argument('--blocking', action='store_true',
+                        help='search on the event loop, without a service')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repeats', type=float, default=0.3,
+                        help='fraction of repeated queries (default: 0.3)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        async def forever() -> None:
+            server = await serve(args.host, args.port,
+                                 MorphismService(args.workers,
+                                                 args.max_pending))
+            print('Serving on', server.sockets[0].getsockname()[:2])
+            await server.serve_forever()
+        asyncio.run(forever())
+        return
+    print(json.dumps(asyncio.run(load_test(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+"""Microbenchmarks for FrozenCounter.
+
+Compare the current FrozenCounter with the original implementation, which
+rebuilt and sorted its key on every call to __hash__.
+Run with `python benchmarks/bench_hashable_counter.py`.
+"""
+
+import os
+import sys
+import timeit
+from typing import Callable, Counter, Dict, List, Tuple, TypeVar
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from multihypergraph.hashable_counter import FrozenCounter
+
+T = TypeVar('T')
+
+
+class OriginalFrozenCounter(Counter[T]):
+    def __key(self) -> Tuple[Tuple[T, int], ...]:
+        return tuple((key, self[key]) for key in sorted(self))  # type: ignore
+
+    def __hash__(self) -> int:  # type: ignore
+        if self.__key():
+            return hash(self.__key())
+        return 0
+
+
+def bench(statement: Callable[[], object], number: int = 100_000) -> float:
+    """Return the best time per call, in microseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=5)) \
+        / number * 1e6
+
+
+def main() -> None:
+    vertices: str = 'abcdefghijklmnopqrstuvwxyz'
+    edge_strings: List[str] = [vertices[i] + vertices[(i * 7) % 26]
+                               + vertices[(i * 11) % 26] for i in range(26)]
+    results: Dict[str, List[float]] = {}
+    for cls in [OriginalFrozenCounter, FrozenCounter]:
+        edge = cls('abcab')
+        other = cls('bacba')
+        table = {cls('ab'): 1, cls('abc'): 2, edge: 3}
+        edge_list = [cls(s) for s in edge_strings] * 2
+        timings: Dict[str, float] = {
+            'hash (5 elements)': bench(lambda: hash(edge)),
+            'equality': bench(lambda: edge == other),
+            'dict lookup': bench(lambda: other in table),
+            'construction': bench(lambda: cls('abcab')),
+            'counting 52 edges': bench(lambda: cls(edge_list), number=10_000),
+        }
+        for name, timing in timings.items():
+            results.setdefault(name, []).append(timing)
+
+    print(f'{"benchmark":<28}{"original (us)":>15}{"current (us)":>15}'
+          f'{"speedup":>10}')
+    for name, (original, current) in results.items():
+        print(f'{name:<28}{original:>15.3f}{current:>15.3f}'
+              f'{original / current:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
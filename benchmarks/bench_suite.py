@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+
+"""Scaling benchmarks for the objects and morphisms modules.
+
+Every benchmark is timed on a curve of seeded random graphs (see
+`multihypergraph.generators`) of growing size, and the results are written
+as JSON --
+    {"environment": {...},
+     "benchmarks": {name: {"parameters": {...},
+                           "points": [{"size": n, "seconds": t}, ...],
+                           "exponent": k}}}
+where t is the best time per call and k is the slope of log(t) against
+log(n), so t grows roughly like n ** k.
+If a baseline file is given, then every point is compared with the same
+point of the baseline, and the run fails if any point is slower than the
+baseline by more than the threshold.
+Run with `python benchmarks/bench_suite.py --output results.json`, and later
+with `python benchmarks/bench_suite.py --baseline results.json`.
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+
+from multihypergraph import morphisms as M
+from multihypergraph import objects as G
+from multihypergraph.generators import (random_graph, random_relabelling,
+                                        relabelled_graph, random_subgraph)
+from multihypergraph.grouping import group_by_isomorphism
+from multihypergraph.hashable_counter import FrozenCounter
+from multihypergraph.patterns import PatternSet
+
+Setup = Callable[[int, int], Callable[[], object]]
+
+
+class Benchmark(NamedTuple):
+    """A benchmark, given by a setup function that builds the inputs for one
+    size and returns the statement to time."""
+    setup: Setup
+    sizes: Tuple[int, ...]
+    quick_sizes: Tuple[int, ...]
+    parameters: Dict[str, Any]
+
+
+def bench(statement: Callable[[], object], repeat: int = 5,
+          minimum_seconds: float = 0.05) -> float:
+    """Return the best time per call, in seconds."""
+    timer: timeit.Timer = timeit.Timer(statement)
+    number: int = 1
+    while timer.timeit(number) < minimum_seconds and number < 1 << 20:
+        number *= 4
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+# Define the benchmarks. Sizes are vertex counts unless stated otherwise.
+def setup_graph(size: int, seed: int) -> Callable[[], object]:
+    expression: G.Graph = random_graph(size, 2 * size, arity=3,
+                                       multiplicity=3, seed=seed)
+    return lambda: G.graph(expression)
+
+
+def setup_compiled_graph(size: int, seed: int) -> Callable[[], object]:
+    expression: G.Graph = random_graph(size, 2 * size, arity=3,
+                                       multiplicity=3, seed=seed)
+    return lambda: G.compiled_graph(expression)
+
+
+def setup_edges(size: int, seed: int) -> Callable[[], object]:
+    expression: G.Graph = random_graph(size, 2 * size, arity=3,
+                                       multiplicity=3, seed=seed)
+    return lambda: G.edges(expression)
+
+
+def setup_vertices(size: int, seed: int) -> Callable[[], object]:
+    expression: G.Graph = random_graph(size, 2 * size, arity=3,
+                                       multiplicity=3, seed=seed)
+    return lambda: G.vertices(expression)
+
+
+def setup_frozencounter_hash(size: int, seed: int) -> Callable[[], object]:
+    """Size is the number of elements, drawn from 8 vertices."""
+    members: G.Graph = random_graph(8, 1, arity=size, loops=True, seed=seed)
+    return lambda: hash(FrozenCounter(members))
+
+
+def setup_is_morphism(size: int, seed: int) -> Callable[[], object]:
+    g: G.CompiledGraph = G.compiled_graph(
+        random_graph(size, 2 * size, arity=3, multiplicity=3, seed=seed))
+    relabelling: Dict[G.Vertex, G.Vertex] = random_relabelling(g, seed)
+    h: G.CompiledGraph = G.compiled_graph(relabelled_graph(g, seed))
+    return lambda: M.is_morphism(relabelling, g, h)
+
+
+def setup_generate_vertexmaps(size: int, seed: int) -> Callable[[], object]:
+    """Size is the number of vertices of g, mapped into 6 vertices."""
+    g: G.Graph = random_graph(size, size, arity=min(size, 2), seed=seed)
+    h: G.Graph = random_graph(6, 8, arity=2, seed=seed)
+    return lambda: sum(1 for _ in M.generate_vertexmaps(g, h))
+
+
+def setup_subgraph(size: int, seed: int) -> Callable[[], object]:
+    """Size is the number of vertices of the host, which contains a copy of
+    a pattern with 6 edges."""
+    h: G.Graph = random_graph(size, 2 * size, arity=3, multiplicity=2,
+                              seed=seed)
+    g: G.Graph = random_subgraph(h, 6, seed=seed)
+    return lambda: M.subgraph(g, h)
+
+
+def setup_pattern_set(size: int, seed: int) -> Callable[[], object]:
+    """Size is the number of patterns, each with 5 edges of a motif with 9
+    vertices and 14 edges, searched for in a host with 300 vertices."""
+    motif: G.Graph = random_graph(9, 14, seed=seed)
+    h: G.Graph = random_graph(300, 900, seed=seed)
+    patterns: PatternSet = PatternSet(
+        random_subgraph(motif, 5, seed=seed + i) for i in range(size))
+    return lambda: patterns.subgraphs(h)
+
+
+def setup_group_by_isomorphism(size: int, seed: int) -> Callable[[], object]:
+    """Size is the number of graphs, relabelled copies of 100 graphs with 10
+    vertices, grouped in the calling process."""
+    bases: List[G.Graph] = [random_graph(10, 14, arity=3, multiplicity=2,
+                                         seed=seed + i) for i in range(100)]
+    graphs: List[G.Graph] = [relabelled_graph(bases[i % 100], seed=seed + i)
+                             for i in range(size)]
+    return lambda: sum(1 for _ in group_by_isomorphism(graphs, workers=0))
+
+
+def setup_isomorphism(size: int, seed: int) -> Callable[[], object]:
+    g: G.Graph = random_graph(size, 2 * size, arity=3, multiplicity=2,
+                              seed=seed)
+    h: G.Graph = relabelled_graph(g, seed=seed)
+    return lambda: M.isomorphism(g, h)
+
+
+GRAPH_PARAMETERS: Dict[str, Any] = {'edges': '2 * size', 'arity': 3,
+                                    'multiplicity': 3}
+BENCHMARKS: Dict[str, Benchmark] = {
+    'graph': Benchmark(setup_graph, (100, 1000, 10000), (100, 1000),
+                       GRAPH_PARAMETERS),
+    'compiled_graph': Benchmark(setup_compiled_graph, (100, 1000, 10000),
+                                (100, 1000), GRAPH_PARAMETERS),
+    'edges': Benchmark(setup_edges, (100, 1000, 10000), (100, 1000),
+                       GRAPH_PARAMETERS),
+    'vertices': Benchmark(setup_vertices, (100, 1000, 10000), (100, 1000),
+                          GRAPH_PARAMETERS),
+    'FrozenCounter hash': Benchmark(setup_frozencounter_hash,
+                                    (4, 16, 64, 256), (4, 64),
+                                    {'vertices': 8}),
+    'is_morphism': Benchmark(setup_is_morphism, (100, 1000, 10000),
+                             (100, 1000), GRAPH_PARAMETERS),
+    'generate_vertexmaps': Benchmark(setup_generate_vertexmaps,
+                                     (2, 3, 4, 5), (2, 3),
+                                     {'host vertices': 6, 'host edges': 8}),
+    'subgraph': Benchmark(setup_subgraph, (50, 200, 800, 3200), (50, 200),
+                          {'edges': '2 * size', 'arity': 3,
+                           'multiplicity': 2, 'pattern edges': 6}),
+    'PatternSet': Benchmark(setup_pattern_set, (16, 64, 256), (16, 64),
+                            {'motif vertices': 9, 'motif edges': 14,
+                             'pattern edges': 5, 'host vertices': 300,
+                             'host edges': 900}),
+    'group_by_isomorphism': Benchmark(setup_group_by_isomorphism,
+                                      (250, 1000, 4000), (250, 1000),
+                                      {'classes': 100, 'vertices': 10,
+                                       'edges': 14, 'arity': 3,
+                                       'multiplicity': 2, 'workers': 0}),
+    'isomorphism': Benchmark(setup_isomorphism, (50, 200, 800, 3200),
+                             (50, 200), {'edges': '2 * size', 'arity': 3,
+                                         'multiplicity': 2}),
+}
+
+
+# Define the report.
+def exponent(points: List[Dict[str, float]]) -> Optional[float]:
+    """Return the least-squares slope of log(seconds) against log(size)."""
+    if len(points) < 2:
+        return None
+    xs: List[float] = [math.log(point['size']) for point in points]
+    ys: List[float] = [math.log(point['seconds']) for point in points]
+    x_mean: float = sum(xs) / len(xs)
+    y_mean: float = sum(ys) / len(ys)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) \
+        / sum((x - x_mean) ** 2 for x in xs)
+
+
+def run(names: List[str], quick: bool, seed: int) -> Dict[str, Any]:
+    """Run some benchmarks and return the report."""
+    report: Dict[str, Any] = {
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'seed': seed,
+            'quick': quick,
+        },
+        'benchmarks': {},
+    }
+    for name in names:
+        benchmark: Benchmark = BENCHMARKS[name]
+        points: List[Dict[str, float]] = []
+        for size in benchmark.quick_sizes if quick else benchmark.sizes:
+            statement: Callable[[], object] = benchmark.setup(size, seed)
+            points.append({'size': size, 'seconds': bench(statement)})
+            print(f'{name:<24}{size:>8}{points[-1]["seconds"] * 1e6:>14.2f} us',
+                  file=sys.stderr)
+        report['benchmarks'][name] = {'parameters': benchmark.parameters,
+                                      'points': points,
+                                      'exponent': exponent(points)}
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float) -> List[str]:
+    """Print the ratio of every point to the same point of a baseline, and
+    return the points that regressed by more than the threshold."""
+    regressions: List[str] = []
+    print(f'{"benchmark":<24}{"size":>8}{"baseline (us)":>15}'
+          f'{"current (us)":>15}{"ratio":>8}')
+    for name, result in report['benchmarks'].items():
+        base_points: Dict[int, float] = {
+            point['size']: point['seconds'] for point in
+            baseline['benchmarks'].get(name, {}).get('points', [])}
+        for point in result['points']:
+            if point['size'] not in base_points:
+                continue
+            base: float = base_points[point['size']]
+            ratio: float = point['seconds'] / base
+            flag: str = ''
+            if ratio > threshold:
+                regressions.append(f'{name} (size {point["size"]})')
+                flag = '  REGRESSION'
+            print(f'{name:<24}{point["size"]:>8}{base * 1e6:>15.2f}'
+                  f'{point["seconds"] * 1e6:>15.2f}{ratio:>7.2f}x{flag}')
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='write the report to this file')
+    parser.add_argument('--baseline', help='compare with a saved report')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='largest allowed ratio to the baseline '
+                             '(default: 1.25)')
+    parser.add_argument('--quick', action='store_true',
+                        help='run the smaller sizes only')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS),
+                        default=list(BENCHMARKS), metavar='NAME',
+                        help='run some benchmarks only')
+    args = parser.parse_args(argv)
+
+    report: Dict[str, Any] = run(args.only, args.quick, args.seed)
+    text: str = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    elif not args.baseline:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline: Dict[str, Any] = json.load(file)
+        regressions: List[str] = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) over '
+                  f'{args.threshold}x: {", ".join(regressions)}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,25 @@
 #!/usr/bin/env python
 
+from . import cache
+from . import profiling
 from . import hashable_counter
 from . import objects
+from . import matching
+from . import canonical
+from . import symmetry
+from . import invariants
+from . import incidence
 from . import morphisms
+from . import batch
+from . import index
+from . import store
+from . import ingest
+from . import persistent
+from . import generators
+from . import aio
+from . import homomorphisms
+from . import patterns
+from . import grouping
 
 name = "multihypergraph"
 __version__ = "0.0.1"
\ No newline at end of file
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+
+"""Asynchronous searches for asyncio applications.
+
+Searches are pure Python and would block an event loop, so a
+MorphismService runs them on its own pool of worker threads --
+1. Identical requests in flight are merged: a second request for the same
+   search (same graph strings and same budget) waits for the first one
+   instead of starting a new search. Requests are compared on their raw
+   arguments, so that nothing is parsed on the event loop.
+2. At most 'max_pending' searches are queued or running at once. Further
+   requests wait for a free slot, so that a burst of requests cannot pile up
+   unbounded work. Enumerations stream through a bounded buffer, so that a
+   search runs ahead of its consumer by at most 'buffer' morphisms.
+3. Cancelling a request cancels the search behind it (through a
+   `matching.CancellationToken`), once no other request is waiting for it.
+   The search stops within `matching.CLOCK_INTERVAL` nodes and frees its
+   slot.
+Worker threads keep the event loop responsive, but share one interpreter, so
+they do not add CPU throughput. For throughput on many pairs, see `batch`.
+`asubgraph`, `aisomorphism` and `aiter_embeddings` use one default service
+per event loop.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Any, AsyncIterator, Callable, Dict, Hashable, Optional,
+                    Set, Tuple)
+
+from .matching import Budget, CancellationToken, SearchTimeout
+from .morphisms import (Embeddings, Morphism, SearchResult,
+                        bounded_isomorphism, bounded_subgraph, copy_morphism)
+from .objects import AnyGraph
+
+DEFAULT_WORKERS: int = 4
+DEFAULT_MAX_PENDING: int = 64
+DEFAULT_BUFFER: int = 64
+POLL_INTERVAL: float = 0.05  # Seconds between looks at a token while blocked.
+
+_END: object = object()
+
+
+class _Flight:
+    """A search in flight, along with the number of requests waiting for
+    it."""
+    __slots__ = ('future', 'token', 'waiters')
+
+    def __init__(self, future: 'asyncio.Future[Any]',
+                 token: CancellationToken) -> None:
+        self.future = future
+        self.token = token
+        self.waiters: int = 0
+
+
+def _search(search: Callable[..., SearchResult], g: AnyGraph, h: AnyGraph,
+            budget: Optional[Budget], token: CancellationToken) -> Morphism:
+    """Run a bounded search in a worker thread, raising SearchTimeout if it
+    runs out of budget."""
+    result: SearchResult = search(g, h, budget, token)
+    if result.found is None and not token.cancelled:
+        raise SearchTimeout
+    return result.morphism
+
+
+class MorphismService:
+    """A pool of worker threads running searches for one event loop.
+
+    Use as an asynchronous context manager, or call `close` when done.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING) -> None:
+        assert workers > 0 and max_pending > 0, \
+            'Services need at least one worker and one slot.'
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            workers, thread_name_prefix='multihypergraph')
+        self.max_pending: int = max_pending
+        self.flights: Dict[Hashable, _Flight] = {}
+        self.enumerations: Set[CancellationToken] = set()
+        self.merged: int = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        # Created on first use, inside the event loop.
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def _merged(self, key: Optional[Hashable],
+                      call: Callable[[CancellationToken], Any]) -> Any:
+        """Run a call in a worker thread, or wait for the same call already
+        in flight."""
+        flight: Optional[_Flight] = None
+        if key is not None:
+            flight = self.flights.get(key)
+        if flight is None:
+            await self.slots.acquire()
+            if key is not None:
+                flight = self.flights.get(key)
+            if flight is not None:
+                self.slots.release()
+        if flight is None:
+            token: CancellationToken = CancellationToken()
+            future: 'asyncio.Future[Any]' = \
+                asyncio.get_running_loop().run_in_executor(
+                    self.executor, call, token)
+            flight = _Flight(future, token)
+            if key is not None:
+                self.flights[key] = flight
+            future.add_done_callback(functools.partial(self._land, key,
+                                                       flight))
+        else:
+            self.merged += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.future.done():
+                flight.token.cancel()
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _land(self, key: Optional[Hashable], flight: Optional[_Flight],
+              future: 'asyncio.Future[Any]') -> None:
+        """Free the slot of a finished search."""
+        if key is not None and self.flights.get(key) is flight:
+            del self.flights[key]
+        self.slots.release()
+        if not future.cancelled():
+            future.exception()  # Retrieved, even if no one is waiting.
+
+    async def subgraph(self, g: AnyGraph, h: AnyGraph,
+                       budget: Optional[Budget] = None) -> Morphism:
+        """Search for g as a subgraph of h (see `morphisms.subgraph`).
+
+        If a budget is provided, then raise SearchTimeout if the search runs
+        out of it (see `morphisms.bounded_subgraph`).
+        """
+        key: Optional[Hashable] = _request_key('subgraph', g, h, budget)
+        return copy_morphism(await self._merged(key, functools.partial(
+            _search, bounded_subgraph, g, h, budget)))
+
+    async def isomorphism(self, g: AnyGraph, h: AnyGraph,
+                          budget: Optional[Budget] = None) -> Morphism:
+        """Search for an isomorphism from g to h (see
+        `morphisms.isomorphism`).
+
+        If a budget is provided, then raise SearchTimeout if the search runs
+        out of it (see `morphisms.bounded_isomorphism`).
+        """
+        key: Optional[Hashable] = _request_key('isomorphism', g, h, budget)
+        return copy_morphism(await self._merged(key, functools.partial(
+            _search, bounded_isomorphism, g, h, budget)))
+
+    async def iter_embeddings(self, g: AnyGraph, h: Optional[AnyGraph] = None,
+                              limit: Optional[int] = None,
+                              up_to_symmetry: bool = False,
+                              budget: Optional[Budget] = None,
+                              buffer: int = DEFAULT_BUFFER) \
+        -> AsyncIterator[Morphism]:
+        """Generate every morphism under which g is a subgraph of h (see
+        `morphisms.iter_embeddings`).
+
+        The enumeration holds one slot until it ends, and runs ahead of its
+        consumer by at most 'buffer' morphisms. Closing the generator early
+        stops the enumeration.
+        """
+        assert buffer > 0, 'Buffers must hold at least one morphism.'
+        if h is None:
+            h = g
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        queue: 'asyncio.Queue[Tuple[Any, Optional[BaseException]]]'
+        queue = asyncio.Queue(buffer)
+        token: CancellationToken = CancellationToken()
+
+        def put(item: Tuple[Any, Optional[BaseException]]) -> bool:
+            # Wait for room in the buffer, unless the consumer goes away.
+            done: 'concurrent.futures.Future[None]'
+            done = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    done.result(POLL_INTERVAL)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if token.cancelled:
+                        done.cancel()
+                        return False
+
+        def produce(token: CancellationToken) -> None:
+            try:
+                for morphism in Embeddings(g, h, limit, None, up_to_symmetry,
+                                           budget, token):
+                    if token.cancelled or not put((morphism, None)):
+                        return
+            except Exception as exception:
+                if not token.cancelled:
+                    put((None, exception))
+                return
+            put((_END, None))
+
+        await self.slots.acquire()
+        self.enumerations.add(token)
+        future: 'asyncio.Future[None]' = loop.run_in_executor(
+            self.executor, produce, token)
+        future.add_done_callback(functools.partial(self._land, None, None))
+        try:
+            while True:
+                item, exception = await queue.get()
+                if exception is not None:
+                    raise exception
+                if item is _END:
+                    return
+                yield item
+        finally:
+            token.cancel()
+            self.enumerations.discard(token)
+
+    async def close(self) -> None:
+        """Cancel every search in flight and shut the worker threads down."""
+        for flight in self.flights.values():
+            flight.token.cancel()
+        for token in self.enumerations:
+            token.cancel()
+        self.flights.clear()
+        self.enumerations.clear()
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.executor.shutdown, wait=True))
+
+    async def __aenter__(self) -> 'MorphismService':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+def _request_key(name: str, g: AnyGraph, h: AnyGraph,
+                 budget: Optional[Budget]) -> Optional[Hashable]:
+    """Return the key under which identical requests are merged, or None if
+    they are not merged.
+
+    Only requests on graph strings are merged, and the strings are compared
+    as they are, without parsing them, since this runs on the event loop.
+    """
+    if isinstance(g, str) and isinstance(h, str):
+        return name, g, h, budget
+    return None
+
+
+# Define the default services.
+Loop = asyncio.AbstractEventLoop
+_services: 'weakref.WeakKeyDictionary[Loop, MorphismService]' = \
+    weakref.WeakKeyDictionary()
+
+
+def default_service() -> MorphismService:
+    """Return the default service of the running event loop."""
+    loop: Loop = asyncio.get_running_loop()
+    if loop not in _services:
+        _services[loop] = MorphismService()
+    return _services[loop]
+
+
+async def asubgraph(g: AnyGraph, h: AnyGraph,
+                    budget: Optional[Budget] = None) -> Morphism:
+    """Search for g as a subgraph of h without blocking the event loop (see
+    `MorphismService.subgraph`)."""
+    return await default_service().subgraph(g, h, budget)
+
+
+async def aisomorphism(g: AnyGraph, h: AnyGraph,
+                       budget: Optional[Budget] = None) -> Morphism:
+    """Search for an isomorphism from g to h without blocking the event loop
+    (see `MorphismService.isomorphism`)."""
+    return await default_service().isomorphism(g, h, budget)
+
+
+def aiter_embeddings(g: AnyGraph, h: Optional[AnyGraph] = None,
+                     limit: Optional[int] = None,
+                     up_to_symmetry: bool = False,
+                     budget: Optional[Budget] = None,
+                     buffer: int = DEFAULT_BUFFER) -> AsyncIterator[Morphism]:
+    """Generate morphisms without blocking the event loop (see
+    `MorphismService.iter_embeddings`)."""
+    return default_service().iter_embeddings(g, h, limit, up_to_symmetry,
+                                             budget, buffer)
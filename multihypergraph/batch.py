@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+"""Batch subgraph-containment over many (pattern, host) pairs.
+
+Patterns and hosts are compiled once in the calling process and shipped to
+every worker process once, as compact tuples of vertex labels, edge members
+and edge-multiplicities. Tasks then only carry chunks of (pattern, host)
+index pairs, and results stream back as soon as each chunk finishes.
+"""
+
+import itertools as it
+import os
+import time
+from concurrent.futures import (FIRST_COMPLETED, Future, ProcessPoolExecutor,
+                                wait)
+from typing import (Iterable, Iterator, List, NamedTuple, Optional, Set,
+                    Tuple)
+
+from .invariants import admissible
+from .matching import SearchTimeout, first_embedding
+from .morphisms import Morphism, embedding_to_morphism, empty_morphism
+from .objects import (AnyGraph, CompiledGraph, EdgeMembers, Vertex,
+                      compiled_graph)
+from .symmetry import symmetry
+
+# Define new types and type aliases.
+Encoding = Tuple[Tuple[Vertex, ...], Tuple[EdgeMembers, ...], Tuple[int, ...]]
+Pair = Tuple[int, int]
+
+
+class Containment(NamedTuple):
+    """Result of one subgraph search in a batch.
+
+    `pattern` and `host` are positions in the input sequences. If the search
+    ran out of time, then `timed_out` is True and `morphism` is empty.
+    """
+    pattern: int
+    host: int
+    morphism: Morphism
+    timed_out: bool
+
+
+# Define compact encodings.
+def encode(g: CompiledGraph) -> Encoding:
+    """Encode a compiled graph as plain tuples."""
+    return g.labels, g.edge_members, g.edge_multiplicities
+
+
+def decode(encoding: Encoding) -> CompiledGraph:
+    """Rebuild a compiled graph from its encoding without any parsing."""
+    labels, edge_members, edge_multiplicities = encoding
+    return CompiledGraph(labels, dict(zip(edge_members, edge_multiplicities)))
+
+
+# Define the work done for each pair.
+def contains(g: CompiledGraph, h: CompiledGraph,
+             timeout: Optional[float] = None) -> Tuple[Morphism, bool]:
+    """Search for g in h and return the morphism found and whether the
+    search timed out.
+
+    The timeout covers breaking the symmetries of g (see `symmetry`) as well
+    as the search itself.
+    """
+    if not admissible(g, h):
+        return empty_morphism(), False
+    deadline: Optional[float] = None
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+    try:
+        embedding = first_embedding(g, h, deadline,
+                                    conditions=symmetry(g, deadline)
+                                    .conditions)
+    except SearchTimeout:
+        return empty_morphism(), True
+    if embedding is None:
+        return empty_morphism(), False
+    return embedding_to_morphism(embedding, g, h), False
+
+
+_patterns: List[CompiledGraph] = []
+_hosts: List[CompiledGraph] = []
+
+
+def _initialise(patterns: List[Encoding], hosts: List[Encoding]) -> None:
+    """Decode all graphs once in a worker process."""
+    _patterns[:] = map(decode, patterns)
+    _hosts[:] = map(decode, hosts)
+
+
+def _run_chunk(pairs: List[Pair], timeout: Optional[float]) \
+    -> List[Containment]:
+    results: List[Containment] = []
+    for i, j in pairs:
+        morphism, timed_out = contains(_patterns[i], _hosts[j], timeout)
+        results.append(Containment(i, j, morphism, timed_out))
+    return results
+
+
+# Define the batch interface.
+def subgraph_many(patterns: Iterable[AnyGraph], hosts: Iterable[AnyGraph],
+                  workers: Optional[int] = None, chunksize: int = 64,
+                  timeout: Optional[float] = None) -> Iterator[Containment]:
+    """Search for every pattern in every host, in parallel.
+
+    Generate one Containment per (pattern, host) pair, in order of
+    completion rather than input order.
+    Pairs are split into chunks of 'chunksize' and run on a pool of
+    'workers' processes (by default, one per CPU). If 'workers' is 0, then
+    run all searches in the calling process instead.
+    If 'timeout' is provided, then any single search taking longer than
+    'timeout' seconds, including the time spent breaking the symmetries of
+    its pattern, is abandoned and reported with `timed_out` set.
+    If the generator is closed before it is exhausted, then chunks not yet
+    started are cancelled, and only those already running are waited for.
+    """
+    assert chunksize > 0, 'Chunks must contain at least one pair.'
+    compiled_patterns: List[CompiledGraph] = list(map(compiled_graph,
+                                                      patterns))
+    compiled_hosts: List[CompiledGraph] = list(map(compiled_graph, hosts))
+    pairs: Iterator[Pair] = it.product(range(len(compiled_patterns)),
+                                       range(len(compiled_hosts)))
+    chunks: Iterator[List[Pair]] = iter(
+        lambda: list(it.islice(pairs, chunksize)), [])
+
+    if workers == 0:
+        for i, j in pairs:
+            morphism, timed_out = contains(compiled_patterns[i],
+                                           compiled_hosts[j], timeout)
+            yield Containment(i, j, morphism, timed_out)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor: ProcessPoolExecutor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_initialise,
+        initargs=([encode(g) for g in compiled_patterns],
+                  [encode(h) for h in compiled_hosts]))
+    try:
+        # Keep a few chunks per worker in flight, so that pairs are only
+        # generated as fast as they are consumed.
+        pending: Set[Future] = set()
+        for chunk in it.islice(chunks, 4 * workers):
+            pending.add(executor.submit(_run_chunk, chunk, timeout))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for chunk in it.islice(chunks, 1):
+                    pending.add(executor.submit(_run_chunk, chunk, timeout))
+                yield from future.result()
+    finally:
+        # If the caller stops early, then drop the chunks not started yet.
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+
+"""Opt-in, size-bounded memoisation of pure graph functions.
+
+Parsing (`objects.edges`, `objects.vertices`, `objects.graph`,
+`objects.compiled_graph`) and searching (`morphisms.subgraph`,
+`morphisms.isomorphism`, `morphisms.is_isomorphic`) are pure functions of
+their arguments. Once caching is switched on with `enable`, each of them keeps
+a least-recently-used cache of its results, so that repeated calls with the
+same graphs become dictionary lookups.
+Search results are keyed on the edge-counters of the graphs (see
+`objects.edges`), so that the same graph written with its edges or vertices
+in a different order is a hit.
+Caches may be shared by searches running on several threads (see `aio`), so
+every access to a cache holds its lock.
+Caching is off by default, in which case every call goes straight through.
+"""
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from typing import (Any, Callable, Dict, Hashable, NamedTuple, Optional,
+                    TypeVar, cast)
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+DEFAULT_MAXSIZE: int = 1024
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of one cache."""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class LRUCache:
+    """A dictionary that forgets its least recently used entries once it
+    holds more than 'maxsize' of them."""
+    __slots__ = ('entries', 'maxsize', 'hits', 'misses', 'evictions',
+                 '_lock')
+
+    entries: 'OrderedDict[Hashable, Any]'
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        assert maxsize > 0, 'Caches must hold at least one entry.'
+        self.entries = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value of a key and mark it as recently used."""
+        with self._lock:
+            try:
+                value: Any = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used one if full."""
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum size, evicting entries if needed."""
+        assert maxsize > 0, 'Caches must hold at least one entry.'
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self) -> None:
+        # Callers hold the lock.
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Forget all entries and reset all statistics."""
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             len(self.entries), self.maxsize)
+
+
+CACHES: Dict[str, LRUCache] = {}
+_enabled: bool = False
+_missing: object = object()
+
+
+# Define the decorator.
+def memoised(name: str, key: Optional[Callable[..., Optional[Hashable]]] = None,
+             copy: Optional[Callable[[Any], Any]] = None) -> Callable[[F], F]:
+    """Memoise a function in the cache called 'name', while caching is on.
+
+    'key' maps the arguments of a call to its cache key, or to None if the
+    call should not be cached (by default, the tuple of arguments is used).
+    'copy' is applied to every result handed out, so that callers cannot
+    change mutable results stored in the cache.
+    Calls with keyword arguments are first rewritten as positional calls, so
+    that they share cache entries with them.
+    """
+    assert name not in CACHES, 'Cache names must be unique.'
+    cache: LRUCache = CACHES.setdefault(name, LRUCache())
+
+    def decorator(function: F) -> F:
+        signature: inspect.Signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if kwargs:
+                bound: inspect.BoundArguments = signature.bind(*args,
+                                                               **kwargs)
+                bound.apply_defaults()
+                args = bound.args
+            if not _enabled:
+                return function(*args)
+            try:
+                key_: Optional[Hashable] = key(*args) if key else args
+                hash(key_)
+            except TypeError:
+                key_ = None
+            if key_ is None:
+                return function(*args)
+            value: Any = cache.get(key_, _missing)
+            if value is _missing:
+                value = function(*args)
+                cache.put(key_, value)
+            return copy(value) if copy else value
+        return cast(F, wrapper)
+    return decorator
+
+
+# Define the public interface.
+def enable(maxsize: int = DEFAULT_MAXSIZE,
+           sizes: Optional[Dict[str, int]] = None) -> None:
+    """Switch caching on, with at most 'maxsize' entries per cache.
+
+    Sizes of individual caches can be set by name in 'sizes'.
+    """
+    global _enabled
+    sizes = sizes or {}
+    assert set(sizes) <= set(CACHES), 'Unknown cache name.'
+    for name, cache in CACHES.items():
+        cache.resize(sizes.get(name, maxsize))
+    _enabled = True
+
+
+def disable() -> None:
+    """Switch caching off and forget all cached results."""
+    global _enabled
+    _enabled = False
+    clear()
+
+
+def enabled() -> bool:
+    """Check if caching is on."""
+    return _enabled
+
+
+def clear() -> None:
+    """Forget all cached results and reset all statistics."""
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def info() -> Dict[str, CacheInfo]:
+    """Return the statistics of every cache, by name."""
+    return {name: cache.info() for name, cache in CACHES.items()}
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+
+"""Canonical labelling and certificates for looped-multi-hyper-graphs.
+
+Two graphs are isomorphic if and only if they have the same certificate.
+Certificates are computed by individualisation-refinement, in the style of
+nauty, adapted to edge-multisets and hyperedges --
+1. Colour refinement: vertices are repeatedly recoloured by the multiset of
+   edges around them, where an edge is described by its multiplicity, the
+   number of times the vertex occurs in it and the colours of all its
+   vertices. This stops when no colour class splits any further.
+2. Individualisation: if some colour class still has more than one vertex,
+   then every vertex of the first such class is given a colour of its own in
+   turn, and refinement is repeated.
+Every branch ends in a colouring where each vertex has a distinct colour,
+i.e. a labelling. The certificate is the smallest labelled graph over all
+branches, and the labelling producing it is the canonical labelling.
+Two branches producing the same labelled graph differ by an automorphism,
+which is used to skip branches that are known to repeat earlier ones.
+"""
+
+import string
+from typing import Dict, List, Optional, Tuple
+
+from .objects import (Vertex, Graph, AnyGraph, CompiledGraph, EdgeMembers,
+                      VertexId, compiled_graph)
+from .matching import CancellationToken, checkpoint
+from .profiling import CallStats
+
+# Define new types and type aliases.
+Colouring = List[int]
+Labelling = Tuple[int, ...]
+Certificate = Tuple[int, Tuple[Tuple[EdgeMembers, int], ...]]
+Permutation = Tuple[VertexId, ...]
+
+CANONICAL_VERTICES: str = (string.ascii_lowercase + string.ascii_uppercase
+                           + string.digits)
+
+
+# Define colour refinement.
+def _incidences(g: CompiledGraph) -> List[List[Tuple[int, int]]]:
+    """Return the (edge index, occurrences) pairs around every vertex."""
+    incidences: List[List[Tuple[int, int]]]
+    incidences = [[] for _ in range(g.vertex_count)]
+    for index, members in enumerate(g.edge_members):
+        for v in set(members):
+            incidences[v].append((index, members.count(v)))
+    return incidences
+
+
+def refine(g: CompiledGraph, colouring: Colouring,
+           incidences: List[List[Tuple[int, int]]]) -> Colouring:
+    """Refine a colouring of the vertices of a graph until it is stable.
+
+    Colours are numbered 0, 1, ... in the sorted order of the data they were
+    computed from, so that refinement commutes with relabelling vertices.
+    """
+    cells: int = len(set(colouring))
+    while True:
+        edge_colours: List[Tuple[int, ...]]
+        edge_colours = [tuple(sorted([colouring[v] for v in members]))
+                        for members in g.edge_members]
+        signatures = [
+            (colouring[v],
+             tuple(sorted((occurrences, g.edge_multiplicities[index],
+                           edge_colours[index])
+                          for index, occurrences in incidences[v])))
+            for v in range(g.vertex_count)]
+        ranks = {signature: rank
+                 for rank, signature in enumerate(sorted(set(signatures)))}
+        colouring = [ranks[signature] for signature in signatures]
+        if len(ranks) == cells:
+            return colouring
+        cells = len(ranks)
+
+
+def individualise(colouring: Colouring, v: VertexId) -> Colouring:
+    """Give a vertex a colour of its own, just ahead of the rest of its
+    colour class."""
+    individualised: Colouring = [2 * colour + 1 for colour in colouring]
+    individualised[v] -= 1
+    return individualised
+
+
+def _labelled_edges(g: CompiledGraph, labelling: Labelling) \
+    -> Tuple[Tuple[EdgeMembers, int], ...]:
+    """Return the sorted edges of a graph relabelled by a labelling."""
+    return tuple(sorted(
+        (tuple(sorted([labelling[v] for v in members])), multiplicity)
+        for members, multiplicity in zip(g.edge_members,
+                                         g.edge_multiplicities)))
+
+
+# Define the individualisation-refinement search.
+class _Search:
+    """State of one canonical labelling search."""
+
+    def __init__(self, g: CompiledGraph, deadline: Optional[float] = None,
+                 max_nodes: Optional[int] = None,
+                 token: Optional[CancellationToken] = None) -> None:
+        self.g = g
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        self.token = token
+        self.incidences = _incidences(g)
+        self.best: Optional[Tuple[Tuple[Tuple[EdgeMembers, int], ...],
+                                  Labelling]] = None
+        self.best_path: Tuple[VertexId, ...] = ()
+        self.generators: List[Permutation] = []
+        self.nodes: int = 0
+        self.leaves: int = 0
+        self.peak_depth: int = 0
+        self.next_check: int = checkpoint(0, deadline, max_nodes, token)
+
+    def run(self) -> Tuple[Certificate, Labelling]:
+        colouring: Colouring = refine(self.g, [0] * self.g.vertex_count,
+                                      self.incidences)
+        self.visit(colouring, ())
+        assert self.best is not None
+        edges_, labelling = self.best
+        return (self.g.vertex_count, edges_), labelling
+
+    def visit(self, colouring: Colouring, prefix: Tuple[VertexId, ...]) \
+        -> Optional[int]:
+        """Explore the search tree below a node.
+
+        If an automorphism shows that the rest of the subtree rooted at some
+        ancestor repeats an explored subtree, then return the depth of that
+        ancestor.
+        """
+        self.nodes += 1
+        if self.nodes == self.next_check:
+            self.next_check = checkpoint(self.nodes, self.deadline,
+                                         self.max_nodes, self.token)
+        self.peak_depth = max(self.peak_depth, len(prefix))
+        cells: Dict[int, List[VertexId]] = {}
+        for v, colour in enumerate(colouring):
+            cells.setdefault(colour, []).append(v)
+        target: Optional[List[VertexId]]
+        target = next((cells[colour] for colour in sorted(cells)
+                       if len(cells[colour]) > 1), None)
+        if target is None:
+            return self.leaf(tuple(colouring), prefix)
+
+        explored: List[VertexId] = []
+        orbits: List[VertexId] = []
+        known_generators: int = -1
+        for v in target:
+            if len(self.generators) != known_generators:
+                known_generators = len(self.generators)
+                orbits = self.orbits(prefix)
+            if any(orbits[v] == orbits[w] for w in explored):
+                continue
+            explored.append(v)
+            depth: Optional[int]
+            depth = self.visit(refine(self.g, individualise(colouring, v),
+                                      self.incidences),
+                               prefix + (v,))
+            if depth is not None and depth < len(prefix):
+                return depth
+        return None
+
+    def leaf(self, labelling: Labelling, path: Tuple[VertexId, ...]) \
+        -> Optional[int]:
+        self.leaves += 1
+        edges_ = _labelled_edges(self.g, labelling)
+        if self.best is None or edges_ < self.best[0]:
+            self.best = (edges_, labelling)
+            self.best_path = path
+            return None
+        if edges_ != self.best[0]:
+            return None
+        # Both labellings give the same graph, so composing one with the
+        # inverse of the other is an automorphism. It maps the branch leading
+        # to the best leaf onto the current branch from the point where the
+        # two paths part, so the rest of the current branch can be skipped.
+        inverse: Dict[int, VertexId] = {label: v for v, label
+                                         in enumerate(self.best[1])}
+        self.generators.append(tuple(inverse[labelling[v]] for v
+                                     in range(self.g.vertex_count)))
+        common: int = 0
+        while common < len(path) and path[common] == self.best_path[common]:
+            common += 1
+        return common
+
+    def orbits(self, prefix: Tuple[VertexId, ...]) -> List[VertexId]:
+        """Return a representative of the orbit of every vertex under the
+        known automorphisms that fix the prefix."""
+        parent: List[VertexId] = list(range(self.g.vertex_count))
+
+        def find(x: VertexId) -> VertexId:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for gamma in self.generators:
+            if all(gamma[x] == x for x in prefix):
+                for x, y in enumerate(gamma):
+                    parent[find(x)] = find(y)
+        return [find(x) for x in range(self.g.vertex_count)]
+
+
+# Define the public interface.
+def canonical_search(g: AnyGraph, stats: Optional[CallStats] = None,
+                     deadline: Optional[float] = None,
+                     max_nodes: Optional[int] = None,
+                     token: Optional[CancellationToken] = None) \
+    -> Tuple[Certificate, Labelling]:
+    """Return the certificate of a graph along with the canonical label of
+    each of its vertex ids.
+
+    If a CallStats is provided, then the counters of the search are added to
+    it (see `profiling`). Optional arguments 'deadline', 'max_nodes' (which
+    limits the nodes of the search tree) and 'token' are as for
+    `matching.embeddings`.
+    """
+    search: _Search = _Search(compiled_graph(g), deadline, max_nodes, token)
+    try:
+        return search.run()
+    finally:
+        if stats is not None:
+            stats.counters.update({'tree nodes': search.nodes,
+                                   'leaves': search.leaves,
+                                   'automorphisms': len(search.generators)})
+            stats.reach(search.peak_depth)
+
+
+def canonical_labelling(g: AnyGraph) -> Dict[Vertex, int]:
+    """Return the canonical labelling of a graph.
+
+    The canonical labelling numbers the vertices 0, 1, ... so that isomorphic
+    graphs become identical once relabelled by their canonical labellings.
+    """
+    g = compiled_graph(g)
+    labelling: Labelling = canonical_search(g)[1]
+    return {g.labels[v]: label for v, label in enumerate(labelling)}
+
+
+def certificate(g: AnyGraph) -> Certificate:
+    """Return a certificate of a graph.
+
+    Certificates are hashable, and two graphs are isomorphic if and only if
+    their certificates are equal.
+    """
+    return canonical_search(g)[0]
+
+
+def canonical_vertex(label: int) -> Vertex:
+    """Return the vertex used for a canonical label in canonical forms."""
+    if label < len(CANONICAL_VERTICES):
+        return Vertex(CANONICAL_VERTICES[label])
+    return Vertex(chr(0x100 + label))
+
+
+def canonical_form(g: AnyGraph) -> Graph:
+    """Return the canonical form of a graph.
+
+    The canonical form relabels the vertices of a graph by their canonical
+    labels and lists the edges in sorted order. Isomorphic graphs have
+    identical canonical forms.
+    """
+    edges_: Tuple[Tuple[EdgeMembers, int], ...] = certificate(g)[1]
+    edge_strings: List[str] = [
+        ''.join(map(canonical_vertex, members))
+        for members, multiplicity in edges_ for _ in range(multiplicity)]
+    return Graph(','.join(edge_strings))
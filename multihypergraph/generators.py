@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+"""Seeded random generators of looped-multi-hyper-graphs.
+
+Every generator takes a seed, so the same arguments always give the same
+graph. Vertices are the characters returned by `canonical.canonical_vertex`,
+so graphs can have any number of vertices and still be graph strings.
+"""
+
+import random
+from typing import Dict, List, Optional, Set
+
+from .canonical import canonical_vertex
+from .objects import Vertex, VertexId, Graph, AnyGraph, compiled_graph
+
+
+def random_graph(vertex_count: int, edge_count: int, arity: int = 2,
+                 multiplicity: int = 1, loops: bool = False,
+                 seed: Optional[int] = None) -> Graph:
+    """Return a random graph.
+
+    'edge_count' edges are drawn, each with 'arity' vertices out of
+    'vertex_count' vertices, and each repeated between 1 and 'multiplicity'
+    times. Edges drawn twice are merged, adding up their multiplicities.
+    If 'loops' is set to True, then vertices are drawn with replacement, so
+    edges may be self-loops or collapsed edges.
+    """
+    assert vertex_count > 0 and edge_count > 0 and arity > 0, \
+        'Graphs must have vertices and edges.'
+    assert loops or arity <= vertex_count, \
+        'Arity exceeds the number of vertices.'
+    rng: random.Random = random.Random(seed)
+    vertices: List[Vertex] = [canonical_vertex(i) for i in range(vertex_count)]
+    edge_strings: List[str] = []
+    for _ in range(edge_count):
+        members: List[Vertex] = (rng.choices(vertices, k=arity) if loops
+                                 else rng.sample(vertices, arity))
+        edge_strings += [''.join(members)] * rng.randint(1, multiplicity)
+    return Graph(','.join(edge_strings))
+
+
+def random_relabelling(g: AnyGraph, seed: Optional[int] = None) \
+    -> Dict[Vertex, Vertex]:
+    """Return a random bijection from the vertices of a graph to vertices
+    of the same form."""
+    g = compiled_graph(g)
+    rng: random.Random = random.Random(seed)
+    images: List[Vertex] = [canonical_vertex(i)
+                            for i in range(g.vertex_count)]
+    rng.shuffle(images)
+    return dict(zip(g.labels, images))
+
+
+def relabelled_graph(g: AnyGraph, seed: Optional[int] = None) -> Graph:
+    """Return a random isomorphic copy of a graph, with its edges in a
+    random order."""
+    g = compiled_graph(g)
+    relabelling: Dict[Vertex, Vertex] = random_relabelling(g, seed)
+    rng: random.Random = random.Random(seed)
+    edge_strings: List[str] = [
+        ''.join(relabelling[g.labels[v]] for v in members)
+        for members, multiplicity in zip(g.edge_members,
+                                         g.edge_multiplicities)
+        for _ in range(multiplicity)]
+    rng.shuffle(edge_strings)
+    return Graph(','.join(edge_strings))
+
+
+def random_subgraph(g: AnyGraph, edge_count: int,
+                    seed: Optional[int] = None) -> Graph:
+    """Return a random relabelled subgraph of a graph with 'edge_count'
+    edges (counted with multiplicity).
+
+    Edges are picked by growing outwards from a random edge, so the subgraph
+    is connected whenever the graph allows it.
+    """
+    g = compiled_graph(g)
+    assert 0 < edge_count <= g.multiplicity, 'Too many edges requested.'
+    rng: random.Random = random.Random(seed)
+    remaining: Dict[int, int] = dict(enumerate(g.edge_multiplicities))
+    picked: List[int] = []
+    touched: Set[VertexId] = set()
+    while len(picked) < edge_count:
+        frontier: List[int] = [index for index in remaining
+                               if touched.intersection(g.edge_members[index])]
+        index: int = rng.choice(frontier or list(remaining))
+        picked.append(index)
+        touched.update(g.edge_members[index])
+        remaining[index] -= 1
+        if not remaining[index]:
+            del remaining[index]
+    subgraph_string: str = ','.join(
+        ''.join(g.labels[v] for v in g.edge_members[index])
+        for index in picked)
+    return relabelled_graph(Graph(subgraph_string), seed)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+
+"""Grouping large collections of graphs into isomorphism classes.
+
+Testing graphs pairwise for isomorphism takes quadratically many searches.
+`group_by_isomorphism` instead runs in stages --
+1. Bucketing: every graph is hashed on its cheap invariants (see
+   `invariants`), which isomorphic graphs share, and written to one of
+   'partitions' files on disk chosen by that hash.
+2. Canonicalisation: partitions are read back one at a time and their graphs
+   grouped by hash. A graph alone in its group is a class of its own. The
+   graphs of every other group get certificates and canonical labellings
+   (see `canonical`).
+3. Grouping: graphs with equal certificates form a class. The first graph of
+   a class, in input order, is its representative, and every member comes
+   with an isomorphism onto it, composed from their canonical labellings.
+Hashing and canonicalisation run on a pool of worker processes, in chunks,
+with a few chunks per worker in flight (as in `batch`). The input is only
+read one chunk at a time and classes are generated as soon as each partition
+is done, so memory use is bounded by the largest partition rather than by
+the whole collection.
+"""
+
+import hashlib
+import itertools as it
+import json
+import os
+import tempfile
+from concurrent.futures import (FIRST_COMPLETED, Executor, Future,
+                                ProcessPoolExecutor, wait)
+from typing import (Any, Callable, Dict, IO, Iterable, Iterator, List,
+                    NamedTuple, Optional, Set, Tuple, TypeVar)
+
+from .batch import Encoding, encode
+from .canonical import Certificate, Labelling, canonical_search
+from .invariants import INVARIANTS, invariant_value
+from .morphisms import InjectiveVertexMap, Morphism, VertexMap
+from .objects import Vertex, Graph, AnyGraph, CompiledGraph, compiled_graph
+
+DEFAULT_PARTITIONS: int = 64
+DEFAULT_CHUNKSIZE: int = 256
+
+T = TypeVar('T')
+Record = Tuple[int, Graph]  # A graph and its position in the input.
+Spilled = Tuple[int, Graph, Encoding]  # Also with its compiled encoding.
+Canonical = Tuple[int, Certificate, Tuple[Vertex, ...], Labelling]
+
+
+class Member(NamedTuple):
+    """A graph of an isomorphism class, with its position in the input and an
+    isomorphism onto the representative of its class."""
+    position: int
+    graph: Graph
+    morphism: Morphism
+
+
+class IsomorphismClass(NamedTuple):
+    """A representative graph and all the graphs isomorphic to it, in input
+    order. The representative is the first member."""
+    representative: Graph
+    members: Tuple[Member, ...]
+
+
+def invariant_hash(g: AnyGraph) -> int:
+    """Return a 64-bit hash of the registered invariants of a graph (see
+    `invariants`).
+
+    Isomorphic graphs have equal hashes. Hashes do not depend on the process
+    or run computing them.
+    """
+    g = compiled_graph(g)
+    values: Tuple[Any, ...] = tuple(invariant_value(g, invariant)
+                                    for invariant in INVARIANTS)
+    return int.from_bytes(hashlib.blake2b(repr(values).encode(),
+                                          digest_size=8).digest(), 'little')
+
+
+# Define the work done in worker processes.
+def _hash_chunk(chunk: List[Record]) -> List[Tuple[int, Spilled]]:
+    results: List[Tuple[int, Spilled]] = []
+    for position, g in chunk:
+        compiled: CompiledGraph = compiled_graph(g)
+        results.append((invariant_hash(compiled),
+                        (position, g, encode(compiled))))
+    return results
+
+
+def _canonicalise_chunk(chunk: List[Spilled]) -> List[Canonical]:
+    results: List[Canonical] = []
+    for position, g, (labels, edge_members, edge_multiplicities) in chunk:
+        # Rebuild the compiled graph without parsing g again.
+        compiled: CompiledGraph = CompiledGraph(
+            labels, dict(zip(edge_members, edge_multiplicities)), g)
+        certificate, labelling = canonical_search(compiled)
+        results.append((position, certificate, labels, labelling))
+    return results
+
+
+def _run(executor: Optional[Executor], function: Callable[[List[Any]], T],
+         chunks: Iterator[List[Any]], in_flight: int) -> Iterator[T]:
+    """Generate the results of a function on every chunk, in order of
+    completion, keeping at most 'in_flight' chunks in flight on an executor
+    (or running them in the calling process if there is none)."""
+    if executor is None:
+        yield from map(function, chunks)
+        return
+    pending: Set[Future] = {executor.submit(function, chunk)
+                            for chunk in it.islice(chunks, in_flight)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            for chunk in it.islice(chunks, 1):
+                pending.add(executor.submit(function, chunk))
+            yield future.result()
+
+
+def _chunked(items: Iterable[T], chunksize: int) -> Iterator[List[T]]:
+    iterator: Iterator[T] = iter(items)
+    return iter(lambda: list(it.islice(iterator, chunksize)), [])
+
+
+# Define the stages.
+def _bucket(graphs: Iterable[Graph], paths: List[str],
+            executor: Optional[Executor], chunksize: int,
+            in_flight: int) -> None:
+    """Write every graph, with its position, hash and compiled encoding (see
+    `batch.encode`), to the partition file chosen by its hash."""
+    files: List[IO[str]] = []
+    try:
+        for path in paths:
+            files.append(open(path, 'w'))
+        for results in _run(executor, _hash_chunk,
+                            _chunked(enumerate(graphs), chunksize),
+                            in_flight):
+            for key, spilled in results:
+                files[key % len(files)].write(json.dumps([key, spilled])
+                                              + '\n')
+    finally:
+        for file in files:
+            file.close()
+
+
+def _group(path: str, executor: Optional[Executor], chunksize: int,
+           in_flight: int) -> List[IsomorphismClass]:
+    """Return the isomorphism classes of the graphs in one partition file,
+    in order of their representatives."""
+    buckets: Dict[int, List[Spilled]] = {}
+    with open(path) as file:
+        for line in file:
+            key, (position, g, (labels, edge_members, edge_multiplicities)) \
+                = json.loads(line)
+            buckets.setdefault(key, []).append((
+                position, Graph(g), (tuple(labels),
+                                     tuple(map(tuple, edge_members)),
+                                     tuple(edge_multiplicities))))
+
+    classes: List[IsomorphismClass] = []
+    shared: List[Spilled] = []
+    for bucket in buckets.values():
+        if len(bucket) == 1:
+            # Alone with its hash, so alone in its class.
+            position, g, (labels, _, _) = bucket[0]
+            classes.append(IsomorphismClass(g, (Member(
+                position, g, _morphism(dict(zip(labels, labels)))),)))
+        else:
+            shared.extend(bucket)
+
+    graphs: Dict[int, Graph] = {position: g for position, g, _ in shared}
+    found: Dict[Certificate, List[Canonical]] = {}
+    # Spread the partition over every chunk in flight.
+    chunksize = max(1, min(chunksize, -(-len(shared) // in_flight)))
+    for results in _run(executor, _canonicalise_chunk,
+                        _chunked(shared, chunksize), in_flight):
+        for result in results:
+            found.setdefault(result[1], []).append(result)
+    for members in found.values():
+        members.sort(key=lambda member: member[0])
+        _, _, labels, labelling = members[0]
+        vertex_of: Dict[int, Vertex] = dict(zip(labelling, labels))
+        classes.append(IsomorphismClass(graphs[members[0][0]], tuple(
+            Member(position, graphs[position], _morphism(
+                {v: vertex_of[label]
+                 for v, label in zip(member_labels, member_labelling)}))
+            for position, _, member_labels, member_labelling in members)))
+    classes.sort(key=lambda class_: class_.members[0].position)
+    return classes
+
+
+def _morphism(d: Dict[Vertex, Vertex]) -> Morphism:
+    return Morphism(InjectiveVertexMap(VertexMap(d)))
+
+
+# Define the pipeline.
+def group_by_isomorphism(graphs: Iterable[Graph],
+                         workers: Optional[int] = None,
+                         partitions: int = DEFAULT_PARTITIONS,
+                         chunksize: int = DEFAULT_CHUNKSIZE,
+                         directory: Optional[str] = None) \
+    -> Iterator[IsomorphismClass]:
+    """Generate the isomorphism classes of a collection of graph strings.
+
+    Every graph belongs to exactly one class, and its Member records its
+    position in the input and an isomorphism onto the representative of its
+    class. Classes are generated partition by partition, each in order of
+    its representative.
+    Work is split into chunks of 'chunksize' graphs and run on a pool of
+    'workers' processes (by default, one per CPU). If 'workers' is 0, then
+    all work runs in the calling process instead.
+    Graphs are spilled to 'partitions' files in a temporary directory, inside
+    'directory' if provided, which is removed once the classes are all
+    generated. More partitions make each of them, and so memory use, smaller.
+    """
+    assert partitions > 0, 'Graphs need at least one partition.'
+    assert chunksize > 0, 'Chunks must contain at least one graph.'
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # Keep a few chunks per worker in flight.
+    in_flight: int = 4 * max(workers, 1)
+    executor: Optional[Executor] = None
+    if workers:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        with tempfile.TemporaryDirectory(prefix='multihypergraph-',
+                                         dir=directory) as spill:
+            paths: List[str] = [os.path.join(spill, f'partition-{i}.jsonl')
+                                for i in range(partitions)]
+            _bucket(graphs, paths, executor, chunksize, in_flight)
+            for path in paths:
+                classes: List[IsomorphismClass] = _group(
+                    path, executor, chunksize, in_flight)
+                os.remove(path)
+                yield from classes
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -4,22 +4,82 @@
 
 This will allow for counter's keys to themselves be counters.
 This will also require counter to be thereafter be frozen.
-Immutability is not enforced but is required for this to make sense.
+Immutability is enforced: every method that would change a frozencounter
+raises a TypeError instead. Copies are plain, mutable Counters.
+The key used for hashing and equality (the sorted tuple of (key, count)
+pairs with non-zero count) and the hash itself are computed once, the first
+time they are needed, and stored.
 
 Reference link to various similar solutions:
 https://stackoverflow.com/questions/1151658/python-hashable-dicts
 """
 
-from typing import Tuple, Counter, TypeVar
+from collections import Counter as counter
+from typing import Any, Counter, FrozenSet, NoReturn, Tuple, TypeVar, Union
 
 T = TypeVar('T')
 
+
+def _sort_key(item: Tuple[Any, int]) -> Tuple[int, Any, int]:
+    """Order (key, count) pairs with nested frozencounters by their keys.
+
+    Counters themselves are only partially ordered (by inclusion), so sorting
+    them directly would not give a well-defined order.
+    """
+    key, count = item
+    if isinstance(key, FrozenCounter):
+        hash(key)
+        if isinstance(key._key, frozenset):
+            raise TypeError('Nested key is not sortable.')
+        return (1, key._key, count)
+    return (0, key, count)
+
+
 class FrozenCounter(Counter[T]):
-    def __key(self) -> Tuple[Tuple[T, int], ...]:
-        return tuple((key, self[key]) for key in sorted(self))
-  
-    def __hash__(self) -> int: # type: ignore
-        if self.__key():
-            return hash(self.__key())
+    _key: Union[Tuple[Tuple[T, int], ...], FrozenSet[Tuple[T, int]]]
+    _hash: int
+
+    def __init__(self, *args: Any, **kwds: Any) -> None:
+        dict.update(self, counter(*args, **kwds))
+
+    def _freeze(self) -> None:
+        """Compute the key and the hash, once."""
+        items = [(key, count) for key, count in self.items() if count]
+        try:
+            if any(isinstance(key, FrozenCounter) for key in self):
+                self._key = tuple(sorted(items, key=_sort_key))
+            else:
+                self._key = tuple(sorted(items))
+        except TypeError:
+            # Keys that cannot be sorted are compared as a set instead.
+            self._key = frozenset(items)
+        self._hash = hash(self._key)
+
+    def __hash__(self) -> int:  # type: ignore
+        try:
+            return self._hash
+        except AttributeError:
+            self._freeze()
+            return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenCounter):
+            return hash(self) == hash(other) and self._key == other._key
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def copy(self) -> Counter[T]:  # type: ignore
+        """Return a mutable copy, as a plain Counter."""
+        return counter(self)
+
+    def _immutable(self, *args: Any, **kwds: Any) -> NoReturn:
+        raise TypeError('FrozenCounter is immutable.')
+
+    __setitem__ = __delitem__ = _immutable
+    update = subtract = clear = _immutable  # type: ignore
+    pop = popitem = setdefault = _immutable  # type: ignore
+    __iadd__ = __isub__ = __iand__ = __ior__ = _immutable  # type: ignore
 
 frozencounter = FrozenCounter
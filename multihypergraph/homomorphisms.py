@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+
+"""Counting homomorphisms between looped-multi-hyper-graphs.
+
+A homomorphism from g to h is any map from the vertices of g to the vertices
+of h, injective or not, that sends every edge of g to an edge of h. Edges are
+sent to edges as multisets, so an edge whose vertices are merged by the map
+must land on a collapsed edge of h. Edge-multiplicities are ignored, unless
+homomorphisms are weighted, in which case every map counts as the product
+over edges e of g of multiplicity_h(image of e) ** multiplicity_g(e).
+
+Homomorphisms are counted without listing them, by variable elimination --
+1. Every edge of g becomes a table over its vertices, listing the images
+   under which it lands on an edge of h.
+2. Vertices of g are eliminated one at a time: the tables mentioning a vertex
+   are joined and the vertex is summed out, leaving a table over its
+   remaining neighbours.
+Eliminating vertices in some order is dynamic programming over the tree
+decomposition whose bags are each vertex with its neighbours at the time it
+is eliminated (see `tree_decomposition`). Orders are picked greedily, by
+fewest neighbours and then fewest new adjacencies (fill-in). Tables never
+have more than |V(h)| ** (width + 1) rows, so counts take polynomial time in
+the size of h for patterns of bounded treewidth.
+Injective homomorphisms are counted by inclusion-exclusion over the partitions
+of the vertices of g, by Mobius inversion on the lattice of partitions --
+    inj(g, h) = sum over partitions P of mu(P) * hom(g / P, h),
+    mu(P) = product over blocks B of P of (-1) ** (|B| - 1) * (|B| - 1)!,
+where g / P merges the vertices in each block. Quotients are grouped by
+certificate (see `canonical`), so that each class of isomorphic quotients is
+only counted once.
+"""
+
+import itertools as it
+import math
+from typing import (Dict, FrozenSet, Iterator, List, NamedTuple, Optional,
+                    Set, Tuple)
+
+from .canonical import Certificate, canonical_vertex, certificate
+from .matching import Budget, CancellationToken, checkpoint
+from .objects import (Vertex, AnyGraph, CompiledGraph, EdgeMembers, VertexId,
+                      compiled_graph)
+
+# Define new types and type aliases.
+Scope = Tuple[VertexId, ...]
+Table = Dict[Tuple[VertexId, ...], int]
+
+
+class Factor(NamedTuple):
+    """A table of weights over assignments of host vertices to some pattern
+    vertices (the scope). Assignments missing from the table weigh zero."""
+    scope: Scope
+    table: Table
+
+
+class TreeDecomposition(NamedTuple):
+    """A tree decomposition of a graph.
+
+    `bags[i]` is a set of vertices and `parents[i]` is the index of the
+    parent of bag i in the tree (or None for roots; a disconnected graph gets
+    one tree per component). Every edge of the graph lies inside some bag,
+    and the bags containing any one vertex form a subtree.
+    """
+    bags: Tuple[FrozenSet[Vertex], ...]
+    parents: Tuple[Optional[int], ...]
+
+    @property
+    def width(self) -> int:
+        return max(map(len, self.bags), default=0) - 1
+
+
+# Define tree decompositions.
+def _primal_graph(g: CompiledGraph) -> List[Set[VertexId]]:
+    """Return the neighbours of every vertex, where vertices are neighbours if
+    they share an edge."""
+    neighbours: List[Set[VertexId]] = [set() for _ in range(g.vertex_count)]
+    for members in g.edge_members:
+        for v in members:
+            neighbours[v].update(members)
+    for v, vertex_neighbours in enumerate(neighbours):
+        vertex_neighbours.discard(v)
+    return neighbours
+
+
+def elimination_order(g: CompiledGraph) \
+    -> List[Tuple[VertexId, FrozenSet[VertexId]]]:
+    """Return a greedy elimination order of the vertex ids of a graph, with
+    the neighbours of each vertex at the time it is eliminated.
+
+    The order is memoised on the compiled graph.
+    """
+    if 'elimination order' in g.cache:
+        return g.cache['elimination order']
+    neighbours: List[Set[VertexId]] = _primal_graph(g)
+    remaining: Set[VertexId] = set(range(g.vertex_count))
+    order: List[Tuple[VertexId, FrozenSet[VertexId]]] = []
+
+    def fill_in(v: VertexId) -> int:
+        return sum(1 for a, b in it.combinations(neighbours[v], 2)
+                   if b not in neighbours[a])
+
+    while remaining:
+        v: VertexId = min(remaining, key=lambda w: (len(neighbours[w]),
+                                                    fill_in(w), w))
+        remaining.remove(v)
+        bag: FrozenSet[VertexId] = frozenset(neighbours[v])
+        order.append((v, bag))
+        for a in bag:
+            neighbours[a].discard(v)
+            neighbours[a].update(bag - {a})
+    g.cache['elimination order'] = order
+    return order
+
+
+def tree_decomposition(g: AnyGraph) -> TreeDecomposition:
+    """Return the tree decomposition of a graph used to count homomorphisms.
+
+    Bag i holds the i-th eliminated vertex and its neighbours at that time,
+    and its parent is the bag of whichever of those neighbours is eliminated
+    first.
+    """
+    g = compiled_graph(g)
+    order: List[Tuple[VertexId, FrozenSet[VertexId]]] = elimination_order(g)
+    position: Dict[VertexId, int] = {v: i for i, (v, _) in enumerate(order)}
+    bags: List[FrozenSet[Vertex]] = []
+    parents: List[Optional[int]] = []
+    for v, neighbours in order:
+        bags.append(frozenset(g.labels[w] for w in neighbours | {v}))
+        parents.append(min((position[w] for w in neighbours), default=None))
+    return TreeDecomposition(tuple(bags), tuple(parents))
+
+
+# Define factors.
+def _edge_factor(members: EdgeMembers, multiplicity: int,
+                 host_edges: Dict[int, List[Tuple[EdgeMembers, int]]],
+                 weighted: bool) -> Factor:
+    """Return the factor of one edge of the pattern, listing the images of
+    its vertices under which it lands on an edge of the host."""
+    scope: Scope = tuple(sorted(set(members)))
+    table: Table = {}
+    for host_members, host_multiplicity in host_edges.get(len(members), []):
+        weight: int = host_multiplicity ** multiplicity if weighted else 1
+        for image in set(it.permutations(host_members)):
+            assignment: Dict[VertexId, VertexId] = {}
+            if all(assignment.setdefault(v, w) == w
+                   for v, w in zip(members, image)):
+                table[tuple(assignment[v] for v in scope)] = weight
+    return Factor(scope, table)
+
+
+def _join(f1: Factor, f2: Factor, eliminate: Optional[VertexId] = None) \
+    -> Factor:
+    """Multiply two factors.
+
+    If a vertex to eliminate (in both scopes) is provided, then sum the
+    product over its images on the fly, without building the product first.
+    """
+    shared: List[int] = [i for i, v in enumerate(f2.scope) if v in f1.scope]
+    shared_in_f1: List[int] = [f1.scope.index(f2.scope[i]) for i in shared]
+    rest: List[int] = [i for i, v in enumerate(f2.scope)
+                       if v not in f1.scope]
+    index: Dict[Tuple[VertexId, ...], List[Tuple[Tuple[VertexId, ...], int]]]
+    index = {}
+    for assignment, weight in f2.table.items():
+        index.setdefault(tuple([assignment[i] for i in shared]), []).append(
+            (tuple([assignment[i] for i in rest]), weight))
+
+    # Rows of f1 are split into the key matching rows of f2 and the part
+    # kept in the product.
+    kept: List[int] = [i for i, v in enumerate(f1.scope) if v != eliminate]
+    table: Table = {}
+    get = table.get
+    for assignment, weight in f1.table.items():
+        matches = index.get(tuple([assignment[i] for i in shared_in_f1]))
+        if matches is None:
+            continue
+        prefix: Tuple[VertexId, ...] = (
+            assignment if eliminate is None
+            else tuple([assignment[i] for i in kept]))
+        for extension, other_weight in matches:
+            key: Tuple[VertexId, ...] = prefix + extension
+            table[key] = get(key, 0) + weight * other_weight
+    return Factor(tuple(f1.scope[i] for i in kept)
+                  + tuple(f2.scope[i] for i in rest), table)
+
+
+def _sum_out(f: Factor, v: VertexId) -> Factor:
+    """Sum a factor over the images of one vertex."""
+    i: int = f.scope.index(v)
+    table: Table = {}
+    for assignment, weight in f.table.items():
+        key: Tuple[VertexId, ...] = assignment[:i] + assignment[i + 1:]
+        table[key] = table.get(key, 0) + weight
+    return Factor(f.scope[:i] + f.scope[i + 1:], table)
+
+
+def _count_homomorphisms(g: CompiledGraph, h: CompiledGraph, weighted: bool,
+                         deadline: Optional[float] = None,
+                         max_rows: Optional[int] = None,
+                         token: Optional[CancellationToken] = None,
+                         rows: int = 0) -> Tuple[int, int]:
+    """Count the homomorphisms from g to h, and return the count along with
+    the number of table rows built so far (starting from 'rows').
+
+    The limits of the count are checked after every table (see
+    `matching.checkpoint`), with rows standing in for search nodes.
+    """
+    host_edges: Dict[int, List[Tuple[EdgeMembers, int]]] = {}
+    for members, multiplicity in zip(h.edge_members, h.edge_multiplicities):
+        host_edges.setdefault(len(members), []).append((members,
+                                                        multiplicity))
+
+    factors: List[Factor] = []
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        factors.append(_edge_factor(members, multiplicity, host_edges,
+                                    weighted))
+        rows += len(factors[-1].table)
+        checkpoint(rows, deadline, max_rows, token)
+    for v, _ in elimination_order(g):
+        bucket: List[Factor] = [f for f in factors if v in f.scope]
+        factors = [f for f in factors if v not in f.scope]
+        bucket.sort(key=lambda f: len(f.table))
+        joined: Factor = bucket[0]
+        for f in bucket[1:-1]:
+            joined = _join(joined, f)
+            if not joined.table:
+                return 0, rows
+            rows += len(joined.table)
+            checkpoint(rows, deadline, max_rows, token)
+        joined = (_join(joined, bucket[-1], v) if len(bucket) > 1
+                  else _sum_out(joined, v))
+        if not joined.table:
+            return 0, rows
+        rows += len(joined.table)
+        checkpoint(rows, deadline, max_rows, token)
+        factors.append(joined)
+    return math.prod(f.table[()] for f in factors), rows
+
+
+# Define the public interface.
+def count_homomorphisms(g: AnyGraph, h: AnyGraph, weighted: bool = False,
+                        budget: Optional[Budget] = None,
+                        token: Optional[CancellationToken] = None) -> int:
+    """Count the homomorphisms from g to h.
+
+    If optional argument 'weighted' is set to True, then weigh every
+    homomorphism by edge-multiplicities (see module docstring).
+    If a budget is provided, then raise SearchTimeout once the count runs
+    past `budget.seconds` or builds more than `budget.nodes` table rows in
+    all, and if a cancellation token is provided, then raise SearchCancelled
+    once it is cancelled. Limits are checked between tables, so a single
+    join always runs to the end.
+    """
+    budget = budget or Budget()
+    return _count_homomorphisms(compiled_graph(g), compiled_graph(h),
+                                weighted, budget.deadline(), budget.nodes,
+                                token)[0]
+
+
+def _partitions(n: int, apart: List[Set[int]]) -> Iterator[List[int]]:
+    """Generate the partitions of 0, ..., n - 1 as lists of block numbers
+    (restricted growth strings), where i and j never share a block if j is in
+    `apart[i]`."""
+    blocks: List[int] = [0] * n
+    members: List[List[int]] = []
+
+    def extend(i: int) -> Iterator[List[int]]:
+        if i == n:
+            yield blocks
+            return
+        for block, block_members in enumerate(members):
+            if not apart[i].intersection(block_members):
+                blocks[i] = block
+                block_members.append(i)
+                yield from extend(i + 1)
+                block_members.pop()
+        blocks[i] = len(members)
+        members.append([i])
+        yield from extend(i + 1)
+        members.pop()
+
+    return extend(0)
+
+
+def _quotient(g: CompiledGraph, blocks: List[int],
+              weighted: bool) -> CompiledGraph:
+    """Merge the vertices of a graph that share a block.
+
+    Unless 'weighted' is set to True, edges merged together are kept once,
+    since edge-multiplicities do not change unweighted counts.
+    """
+    edge_table: Dict[EdgeMembers, int] = {}
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        merged: EdgeMembers = tuple(sorted(blocks[v] for v in members))
+        edge_table[merged] = (edge_table.get(merged, 0) + multiplicity
+                              if weighted else 1)
+    return CompiledGraph(map(canonical_vertex, range(max(blocks) + 1)),
+                         edge_table)
+
+
+def count_injective_homomorphisms(g: AnyGraph, h: AnyGraph,
+                                  weighted: bool = False,
+                                  budget: Optional[Budget] = None,
+                                  token: Optional[CancellationToken] = None) \
+    -> int:
+    """Count the injective homomorphisms from g to h, by inclusion-exclusion
+    over partitions of the vertices of g (see module docstring).
+
+    Optional arguments 'weighted', 'budget' and 'token' are as for
+    `count_homomorphisms`, and the budget covers the counts of every
+    quotient together. The number of partitions grows exponentially with the
+    number of vertices of g, but only quotients that have a homomorphism to h
+    are counted. In particular, if h has no collapsed edges, then vertices
+    sharing an edge are never merged.
+    """
+    g = compiled_graph(g)
+    h = compiled_graph(h)
+    budget = budget or Budget()
+    deadline: Optional[float] = budget.deadline()
+    collapsed: bool = any(len(set(members)) < len(members)
+                          for members in h.edge_members)
+    apart: List[Set[int]] = ([set() for _ in range(g.vertex_count)]
+                             if collapsed else _primal_graph(g))
+
+    coefficients: Dict[Certificate, int] = {}
+    quotients: Dict[Certificate, CompiledGraph] = {}
+    for blocks in _partitions(g.vertex_count, apart):
+        checkpoint(0, deadline, None, token)
+        sizes: List[int] = [0] * (max(blocks, default=-1) + 1)
+        for block in blocks:
+            sizes[block] += 1
+        mu: int = math.prod((-1) ** (size - 1) * math.factorial(size - 1)
+                            for size in sizes)
+        quotient: CompiledGraph = _quotient(g, blocks, weighted)
+        key: Certificate = certificate(quotient)
+        coefficients[key] = coefficients.get(key, 0) + mu
+        quotients.setdefault(key, quotient)
+
+    total: int = 0
+    rows: int = 0
+    for key, coefficient in coefficients.items():
+        if coefficient:
+            count, rows = _count_homomorphisms(quotients[key], h, weighted,
+                                               deadline, budget.nodes, token,
+                                               rows)
+            total += coefficient * count
+    return total
+
+
+def homomorphism_density(g: AnyGraph, h: AnyGraph) -> float:
+    """Return the probability that a uniformly random map from the vertices
+    of g to those of h is a homomorphism."""
+    g = compiled_graph(g)
+    h = compiled_graph(h)
+    return count_homomorphisms(g, h) / h.vertex_count ** g.vertex_count
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+
+"""Incidence-matrix backend for looped-multi-hyper-graphs.
+
+An IncidenceGraph stores a graph as a sparse vertex-by-edge incidence matrix,
+whose entry (v, e) is the number of times vertex v occurs in edge e, along
+with a separate vector of edge-multiplicities. The matrix is kept both in
+CSR form (vertex-major) and in CSC form (edge-major) as plain NumPy arrays,
+and `to_scipy` converts it to a scipy.sparse matrix.
+Degrees, arities, neighbourhoods, invariants and morphism validation are then
+computed with array operations rather than per-edge Python counters.
+`validate_morphisms` checks whole arrays of candidate vertex-maps at once.
+
+This backend requires NumPy, which is an optional dependency
+(`pip install multihypergraph[numpy]`).
+"""
+
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+from .objects import (Vertex, Graph, AnyGraph, CompiledGraph, EdgeMembers,
+                      compiled_graph)
+
+# Define new types and type aliases.
+Array = Any  # numpy.ndarray, which may not be importable.
+
+
+def require_numpy() -> None:
+    """Raise an ImportError if NumPy is not installed."""
+    if np is None:
+        raise ImportError('The incidence backend requires numpy. '
+                          'Install it with `pip install numpy`.')
+
+
+# Define the incidence representation.
+class IncidenceGraph:
+    """A graph stored as a sparse vertex-by-edge incidence matrix.
+
+    Vertex ids and edge order are the same as in the compiled graph it was
+    built from. In CSR form, the edges containing vertex v are
+    `indices[indptr[v]:indptr[v + 1]]`, with the number of times v occurs in
+    each of them at the same positions of `data`. In CSC form, the vertices of
+    edge e are `edge_vertices[edge_indptr[e]:edge_indptr[e + 1]]`, sorted,
+    with their counts at the same positions of `edge_data`.
+    """
+    __slots__ = ('labels', 'ids', 'vertex_count', 'edge_count',
+                 'multiplicities', 'indptr', 'indices', 'data',
+                 'edge_indptr', 'edge_vertices', 'edge_data', 'cache')
+
+    labels: Tuple[Vertex, ...]
+    ids: Dict[Vertex, int]
+    vertex_count: int
+    edge_count: int
+    multiplicities: Array
+    indptr: Array
+    indices: Array
+    data: Array
+    edge_indptr: Array
+    edge_vertices: Array
+    edge_data: Array
+    cache: Dict[str, Any]
+
+    def __init__(self, labels: Tuple[Vertex, ...], edge_indptr: Array,
+                 edge_vertices: Array, edge_data: Array,
+                 multiplicities: Array) -> None:
+        """Build an incidence graph from its CSC arrays."""
+        require_numpy()
+        self.labels = labels
+        self.ids = {vertex_: id_ for id_, vertex_ in enumerate(labels)}
+        self.vertex_count = len(labels)
+        self.edge_count = len(multiplicities)
+        self.multiplicities = np.asarray(multiplicities, dtype=np.int64)
+        self.edge_indptr = np.asarray(edge_indptr, dtype=np.int64)
+        self.edge_vertices = np.asarray(edge_vertices, dtype=np.int64)
+        self.edge_data = np.asarray(edge_data, dtype=np.int64)
+
+        # Transpose into CSR form with a stable sort on vertex ids.
+        edge_of_entry: Array = _segment_ids(self.edge_indptr)
+        order: Array = np.argsort(self.edge_vertices, kind='stable')
+        self.indices = edge_of_entry[order]
+        self.data = self.edge_data[order]
+        self.indptr = np.zeros(self.vertex_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_vertices, minlength=self.vertex_count),
+                  out=self.indptr[1:])
+        self.cache = {}
+
+    def to_compiled(self) -> CompiledGraph:
+        """Convert back to a compiled graph."""
+        edge_table: Dict[EdgeMembers, int] = {}
+        repeated: Array = np.repeat(self.edge_vertices, self.edge_data)
+        bounds: Array = np.concatenate(([0], np.cumsum(arities(self))))
+        for e in range(self.edge_count):
+            members: EdgeMembers = tuple(repeated[bounds[e]:bounds[e + 1]]
+                                         .tolist())
+            edge_table[members] = int(self.multiplicities[e])
+        return CompiledGraph(self.labels, edge_table)
+
+    def to_graph(self) -> Graph:
+        """Convert back to a graph string.
+
+        Raise ValueError if the graph is labelled and has none (see
+        `objects.CompiledGraph.graph`).
+        """
+        return self.to_compiled().graph
+
+    def to_scipy(self) -> Any:
+        """Return the incidence matrix as a scipy.sparse CSR matrix."""
+        from scipy.sparse import csr_matrix  # type: ignore
+        return csr_matrix((self.data, self.indices, self.indptr),
+                          shape=(self.vertex_count, self.edge_count))
+
+    def __repr__(self) -> str:
+        return (f'<IncidenceGraph with {self.vertex_count} vertices and '
+                f'{self.edge_count} edges>')
+
+
+def _segment_ids(indptr: Array) -> Array:
+    """Return, for every entry of a CSR/CSC array, the row it belongs to."""
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+def incidence_graph(g: AnyGraph) -> IncidenceGraph:
+    """Convert a graph (or compiled graph) to an incidence graph."""
+    require_numpy()
+    g = compiled_graph(g)
+    arity: Array = np.fromiter(map(len, g.edge_members), dtype=np.int64,
+                               count=g.edge_count)
+    members: Array = np.fromiter(
+        (v for members_ in g.edge_members for v in members_),
+        dtype=np.int64, count=int(arity.sum()))
+    edge_of_member: Array = np.repeat(np.arange(g.edge_count), arity)
+
+    # Edge members are sorted, so collapsing repeated (edge, vertex) pairs
+    # leaves every edge's distinct vertices sorted and grouped together.
+    keys: Array = edge_of_member * max(g.vertex_count, 1) + members
+    unique_keys, counts = np.unique(keys, return_counts=True)
+    edge_vertices: Array = unique_keys % max(g.vertex_count, 1)
+    edge_indptr: Array = np.zeros(g.edge_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(unique_keys // max(g.vertex_count, 1),
+                          minlength=g.edge_count), out=edge_indptr[1:])
+    return IncidenceGraph(g.labels, edge_indptr, edge_vertices, counts,
+                          g.edge_multiplicities)
+
+
+def as_incidence_graph(g: Union[AnyGraph, IncidenceGraph]) -> IncidenceGraph:
+    """Convert a graph to an incidence graph, unless it already is one."""
+    if isinstance(g, IncidenceGraph):
+        return g
+    return incidence_graph(g)
+
+
+# Define vectorised graph methods.
+def arities(ig: IncidenceGraph) -> Array:
+    """Return the arity of every edge (counting collapsed vertices)."""
+    return np.add.reduceat(ig.edge_data, ig.edge_indptr[:-1]) \
+        if ig.edge_count else np.zeros(0, dtype=np.int64)
+
+
+def degrees(ig: IncidenceGraph) -> Array:
+    """Return the degree of every vertex.
+
+    The degree of a vertex is the number of edges containing it, counted with
+    edge-multiplicities.
+    """
+    return np.bincount(_segment_ids(ig.indptr),
+                       weights=ig.multiplicities[ig.indices],
+                       minlength=ig.vertex_count).astype(np.int64)
+
+
+def neighbours(ig: IncidenceGraph, v: int) -> Array:
+    """Return the sorted ids of the vertices sharing an edge with vertex v."""
+    incident: Array = ig.indices[ig.indptr[v]:ig.indptr[v + 1]]
+    starts: Array = ig.edge_indptr[incident]
+    lengths: Array = ig.edge_indptr[incident + 1] - starts
+    positions: Array = (np.repeat(starts - np.cumsum(lengths) + lengths,
+                                  lengths)
+                        + np.arange(int(lengths.sum())))
+    found: Array = np.unique(ig.edge_vertices[positions])
+    return found[found != v]
+
+
+def arity_histogram(ig: IncidenceGraph) -> Tuple[Tuple[int, int], ...]:
+    """Return the number of edges of each arity, counted with
+    edge-multiplicities (see `invariants.arity_histogram`)."""
+    histogram: Array = np.bincount(arities(ig), weights=ig.multiplicities)
+    return tuple((int(arity), int(count))
+                 for arity, count in enumerate(histogram) if count)
+
+
+def loop_counts(ig: IncidenceGraph) -> Tuple[int, int]:
+    """Return the numbers of self-loops and of other collapsed edges,
+    counted with edge-multiplicities (see `invariants.loop_counts`)."""
+    distinct: Array = np.diff(ig.edge_indptr)
+    arity: Array = arities(ig)
+    loops: Array = (distinct == 1) & (arity > 1)
+    collapsed: Array = (distinct > 1) & (distinct < arity)
+    return (int(ig.multiplicities[loops].sum()),
+            int(ig.multiplicities[collapsed].sum()))
+
+
+def degree_sequence(ig: IncidenceGraph) -> Tuple[int, ...]:
+    """Return the degrees of all vertices in decreasing order (see
+    `invariants.degree_sequence`)."""
+    return tuple(np.sort(degrees(ig))[::-1].tolist())
+
+
+# Define vectorised morphism validation.
+def edge_rows(edge_indptr: Array, edge_vertices: Array,
+              edge_data: Array) -> Array:
+    """Encode every edge as one row of a 2-D array.
+
+    A row lists the (vertex, count) pairs of an edge sorted by vertex, padded
+    with -1, so that two edges are equal if and only if their rows are.
+    """
+    lengths: Array = np.diff(edge_indptr)
+    width: int = int(lengths.max()) if len(lengths) else 0
+    edge_of_entry: Array = _segment_ids(edge_indptr)
+    order: Array = np.lexsort((edge_vertices, edge_of_entry))
+    position: Array = np.arange(len(edge_vertices)) \
+        - np.repeat(edge_indptr[:-1], lengths)
+    rows: Array = np.full((len(lengths), 2 * width), -1, dtype=np.int64)
+    rows[edge_of_entry, 2 * position] = edge_vertices[order]
+    rows[edge_of_entry, 2 * position + 1] = edge_data[order]
+    return rows
+
+
+def edge_table(ig: IncidenceGraph) -> Array:
+    """Return the (memoised) rows of all edges of an incidence graph."""
+    if 'edge rows' not in ig.cache:
+        ig.cache['edge rows'] = edge_rows(ig.edge_indptr, ig.edge_vertices,
+                                          ig.edge_data)
+    return ig.cache['edge rows']
+
+
+def rows_in(rows: Array, table: Array) -> Array:
+    """Return a boolean mask of which rows also occur as rows of a table."""
+    width: int = max(rows.shape[1], table.shape[1])
+    rows = np.pad(rows, ((0, 0), (0, width - rows.shape[1])),
+                  constant_values=-1)
+    table = np.pad(table, ((0, 0), (0, width - table.shape[1])),
+                   constant_values=-1)
+    _, inverse = np.unique(np.concatenate((table, rows)), axis=0,
+                           return_inverse=True)
+    inverse = inverse.reshape(-1)
+    return np.isin(inverse[len(table):], inverse[:len(table)])
+
+
+def is_morphism(d: Dict[Vertex, Vertex], g: IncidenceGraph,
+                h: Optional[IncidenceGraph] = None) -> bool:
+    """Check if a dictionary is a morphism from one incidence graph to
+    another (see `morphisms.is_morphism`).
+
+    Images of all edges are computed and looked up in the edges of h at once.
+    """
+    if h is None:
+        h = g
+    if len(d) != g.vertex_count or any(x not in g.ids for x in d):
+        return False
+    if any(y not in h.ids for y in d.values()):
+        return False
+    image: Array = np.fromiter((h.ids[d[x]] for x in g.labels),
+                               dtype=np.int64, count=g.vertex_count)
+    if len(np.unique(image)) != g.vertex_count:
+        return False
+    mapped: Array = edge_rows(g.edge_indptr, image[g.edge_vertices],
+                              g.edge_data)
+    return bool(rows_in(mapped, edge_table(h)).all())
+
+
+# Define batch morphism validation.
+BLOCK_SIZE: int = 1 << 20  # Number of mapped vertices gathered per block.
+NETWORK_WIDTH: int = 6  # Longest rows sorted by a sorting network.
+LOOKUP_SIZE: int = 1 << 24  # Largest number of edge codes in a dense table.
+
+
+def edge_matrix(ig: IncidenceGraph) -> Array:
+    """Return the (memoised) members of all edges as rows of a 2-D array.
+
+    Row e lists the vertices of edge e in sorted order, with repeats for
+    collapsed edges, padded with -1 up to the largest arity.
+    """
+    if 'edge matrix' not in ig.cache:
+        arity: Array = arities(ig)
+        width: int = int(arity.max()) if ig.edge_count else 0
+        matrix: Array = np.full((ig.edge_count, width), -1, dtype=np.int64)
+        edge_of_member: Array = np.repeat(np.arange(ig.edge_count), arity)
+        starts: Array = np.concatenate(([0], np.cumsum(arity)[:-1]))
+        position: Array = (np.arange(int(arity.sum()))
+                           - np.repeat(starts, arity))
+        matrix[edge_of_member, position] = np.repeat(ig.edge_vertices,
+                                                     ig.edge_data)
+        ig.cache['edge matrix'] = matrix
+    return ig.cache['edge matrix']
+
+
+def _sort_rows(a: Array) -> None:
+    """Sort an array along its last axis, in place.
+
+    Short rows are sorted by an odd-even transposition network of pairwise
+    minima and maxima, which is much faster than numpy's sort for them.
+    """
+    width: int = a.shape[-1]
+    if width > NETWORK_WIDTH:
+        a.sort(axis=-1)
+        return
+    for round_ in range(width):
+        for i in range(round_ % 2, width - 1, 2):
+            low: Array = np.minimum(a[..., i], a[..., i + 1])
+            np.maximum(a[..., i], a[..., i + 1], out=a[..., i + 1])
+            a[..., i] = low
+
+
+def _edge_codes(members: Array, base: int) -> Array:
+    """Encode sorted rows of vertex ids (padded with base - 1) as integers
+    written in the given base."""
+    codes: Array = np.zeros(members.shape[:-1], dtype=np.int64)
+    for column in range(members.shape[-1]):
+        codes = codes * base + members[..., column]
+    return codes
+
+
+def _padded_edges(ig: IncidenceGraph, width: int) -> Array:
+    """Return the members of all edges of arity at most 'width', as rows
+    padded with |V| up to 'width'."""
+    matrix: Array = edge_matrix(ig)[arities(ig) <= width]
+    padded: Array = np.full((len(matrix), width), ig.vertex_count,
+                            dtype=np.int64)
+    columns: int = min(width, matrix.shape[1])
+    padded[:, :columns] = matrix[:, :columns]
+    padded[padded < 0] = ig.vertex_count
+    return padded
+
+
+def edge_code_table(ig: IncidenceGraph, width: int) -> Array:
+    """Return the (memoised) sorted codes of all edges of arity at most
+    'width' (see `validate_morphisms`)."""
+    key: str = f'edge codes: {width}'
+    if key not in ig.cache:
+        ig.cache[key] = np.unique(_edge_codes(_padded_edges(ig, width),
+                                              ig.vertex_count + 1))
+    return ig.cache[key]
+
+
+def edge_code_lookup(ig: IncidenceGraph, width: int) -> Array:
+    """Return a (memoised) boolean array, indexed by edge code, of which
+    edges of arity at most 'width' occur in a graph."""
+    key: str = f'edge code lookup: {width}'
+    if key not in ig.cache:
+        lookup: Array = np.zeros((ig.vertex_count + 1) ** width, dtype=bool)
+        lookup[edge_code_table(ig, width)] = True
+        ig.cache[key] = lookup
+    return ig.cache[key]
+
+
+def validate_morphisms(candidates: Array, g: Union[AnyGraph, IncidenceGraph],
+                       h: Union[AnyGraph, IncidenceGraph, None] = None) \
+    -> Array:
+    """Check which rows of a 2-D array of candidate vertex-maps are
+    morphisms from g to h (see `morphisms.is_morphism`).
+
+    Column i of the array is the image of the vertex with id i in g, given
+    as a vertex id of h. Return a boolean mask with one entry per row.
+    Edges of g are checked one at a time against all remaining candidates:
+    their images are gathered, sorted, and encoded as integers in base
+    |V(h)| + 1, which are then looked up in a table of the codes of the edges
+    of h. Candidates are dropped as soon as one edge fails. If these codes
+    would overflow, then rows are compared directly instead.
+    """
+    g = as_incidence_graph(g)
+    h = g if h is None else as_incidence_graph(h)
+    candidates = np.asarray(candidates, dtype=np.int64)
+    assert candidates.ndim == 2 and candidates.shape[1] == g.vertex_count, \
+        'Candidates must have one column per vertex of g.'
+    if not g.vertex_count:
+        return np.ones(len(candidates), dtype=bool)
+
+    # Sorted rows give the range check and the injectivity check.
+    ordered: Array = candidates.copy()
+    _sort_rows(ordered)
+    mask: Array = (ordered[:, 0] >= 0) & (ordered[:, -1] < h.vertex_count)
+    for i in range(g.vertex_count - 1):
+        mask &= ordered[:, i] != ordered[:, i + 1]
+
+    members: Array = edge_matrix(g)
+    if not g.edge_count:
+        return mask
+    width: int = members.shape[1]
+    base: int = h.vertex_count + 1
+    exact: bool = base ** width < 2 ** 63
+    lookup: Optional[Array] = None
+    table: Array
+    if exact:
+        table = edge_code_table(h, width)
+        if base ** width <= LOOKUP_SIZE:
+            lookup = edge_code_lookup(h, width)
+    else:
+        table = _padded_edges(h, width)
+    arity: Array = arities(g)
+
+    survivors: Array = np.flatnonzero(mask)
+    block: int = max(1, BLOCK_SIZE // g.vertex_count)
+    for start in range(0, len(survivors), block):
+        rows: Array = survivors[start:start + block]
+        mask[rows] = False
+        for e in range(g.edge_count):
+            image: Array = candidates[rows][:, members[e, :arity[e]]]
+            _sort_rows(image)
+            if exact:
+                codes: Array = _edge_codes(image, base)
+                codes = codes * base ** (width - arity[e]) \
+                    + (base ** (width - arity[e]) - 1)
+                if lookup is not None:
+                    found: Array = lookup[codes]
+                else:
+                    positions: Array = np.searchsorted(table, codes)
+                    positions[positions == len(table)] = 0
+                    found = (table[positions] == codes if len(table)
+                             else np.zeros(len(codes), dtype=bool))
+            else:
+                padded: Array = np.full((len(rows), width), h.vertex_count,
+                                        dtype=np.int64)
+                padded[:, :arity[e]] = image
+                found = rows_in(padded, table)
+            rows = rows[found]
+        mask[rows] = True
+    return mask
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+"""An index of stored host graphs for "which hosts contain this pattern"
+queries.
+
+Every host is described by a counter of features, each of which can only
+occur as often in a subgraph as in the graph containing it --
+1. ('edge', shape): edges of a given shape, counted with edge-multiplicities.
+   The shape of an edge is the sorted tuple of the number of times each of
+   its vertices occurs in it, so 'ab' has shape (1, 1) and 'aab' has shape
+   (1, 2).
+2. ('degree', d): vertices of degree at least d.
+3. ('pair', end, end): pairs of distinct edges (counting repeated copies of
+   a multi-edge as distinct) meeting at a vertex, counted once per vertex
+   they share. Each edge is described by its end at the vertex, that is by
+   its shape and by how often the vertex occurs in it. Pairs are counted
+   from the number of edges with each end at a vertex, without listing
+   them, so that hubs of high degree stay cheap to index.
+For each feature, a posting list records how often it occurs in each host.
+A query keeps only the hosts having every feature of the pattern at least as
+often, starting from the shortest posting list, and then verifies the
+remaining candidates with the subgraph matcher.
+"""
+
+import time
+from collections import Counter as counter
+from typing import (Any, Counter, Dict, Hashable, Iterable, Iterator, List,
+                    Optional, Tuple)
+
+from .matching import (Budget, CancellationToken, SearchCancelled,
+                       SearchTimeout, checkpoint)
+from .morphisms import Morphism, SearchResult, bounded_subgraph, subgraph
+from .objects import AnyGraph, CompiledGraph, EdgeMembers, compiled_graph
+
+# Define new types and type aliases.
+Feature = Tuple[Any, ...]
+Shape = Tuple[int, ...]
+End = Tuple[Shape, int]  # An edge seen from one of its vertices.
+
+
+# Define features.
+def edge_shape(members: EdgeMembers) -> Shape:
+    """Return the sorted numbers of times each vertex occurs in an edge."""
+    return tuple(sorted(counter(members).values()))
+
+
+def features(g: AnyGraph) -> Counter[Feature]:
+    """Return the (memoised) counter of index features of a graph."""
+    g = compiled_graph(g)
+    if 'index features' in g.cache:
+        return g.cache['index features']
+
+    found: Counter[Feature] = counter()
+    degrees: List[int] = [0] * g.vertex_count
+    ends: List[Counter[End]] = [counter() for _ in range(g.vertex_count)]
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        shape: Shape = edge_shape(members)
+        found['edge', shape] += multiplicity
+        for v, occurrences in counter(members).items():
+            degrees[v] += multiplicity
+            ends[v][shape, occurrences] += multiplicity
+    for degree in degrees:
+        for d in range(1, degree + 1):
+            found['degree', d] += 1
+
+    for ends_v in ends:
+        counts: List[Tuple[End, int]] = sorted(ends_v.items())
+        for i, (end, count) in enumerate(counts):
+            if count > 1:
+                found['pair', end, end] += count * (count - 1) // 2
+            for other, other_count in counts[i + 1:]:
+                found['pair', end, other] += count * other_count
+    g.cache['index features'] = found
+    return found
+
+
+# Define the index.
+class GraphIndex:
+    """A catalogue of host graphs with posting lists of their features.
+
+    Hosts are stored under hashable keys. If no key is given on insertion,
+    then hosts are numbered 0, 1, ... in order of insertion.
+    """
+    __slots__ = ('hosts', 'postings', '_next_key')
+
+    hosts: Dict[Hashable, CompiledGraph]
+    postings: Dict[Feature, Dict[Hashable, int]]
+    _next_key: int
+
+    def __init__(self, hosts: Iterable[AnyGraph] = ()) -> None:
+        self.hosts = {}
+        self.postings = {}
+        self._next_key = 0
+        for h in hosts:
+            self.insert(h)
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.hosts
+
+    def __getitem__(self, key: Hashable) -> CompiledGraph:
+        return self.hosts[key]
+
+    def insert(self, h: AnyGraph, key: Optional[Hashable] = None) \
+        -> Hashable:
+        """Add a host graph to the index and return its key."""
+        if key is None:
+            while self._next_key in self.hosts:
+                self._next_key += 1
+            key = self._next_key
+        assert key not in self.hosts, 'Host keys must be unique.'
+        h = compiled_graph(h)
+        self.hosts[key] = h
+        for feature, count in features(h).items():
+            self.postings.setdefault(feature, {})[key] = count
+        return key
+
+    def delete(self, key: Hashable) -> CompiledGraph:
+        """Remove a host graph from the index and return it."""
+        h: CompiledGraph = self.hosts.pop(key)
+        for feature in features(h):
+            posting: Dict[Hashable, int] = self.postings[feature]
+            del posting[key]
+            if not posting:
+                del self.postings[feature]
+        return h
+
+    def candidates(self, g: AnyGraph) -> List[Hashable]:
+        """Return the keys of all hosts having every feature of a pattern at
+        least as often as the pattern, in order of insertion."""
+        required: Counter[Feature] = features(g)
+        postings: List[Tuple[Dict[Hashable, int], int]] = []
+        for feature, count in required.items():
+            if feature not in self.postings:
+                return []
+            postings.append((self.postings[feature], count))
+        postings.sort(key=lambda posting: len(posting[0]))
+
+        shortest, count = postings[0]
+        keys: List[Hashable] = [key for key, count_h in shortest.items()
+                                if count_h >= count]
+        for posting, count in postings[1:]:
+            if not keys:
+                break
+            keys = [key for key in keys if posting.get(key, 0) >= count]
+        # Posting lists are filled in order of insertion, so keys are too.
+        return keys
+
+    def query(self, g: AnyGraph, budget: Optional[Budget] = None,
+              token: Optional[CancellationToken] = None) \
+        -> Iterator[Tuple[Hashable, Morphism]]:
+        """Generate the key of every host containing a pattern as a
+        subgraph, along with a morphism witnessing it.
+
+        If a budget is provided, then raise SearchTimeout once the whole
+        query runs past `budget.seconds`, or once the search of one host
+        visits more than `budget.nodes` nodes (see `bounded_subgraph`). If a
+        cancellation token is provided, then raise SearchCancelled once it is
+        cancelled.
+        """
+        g = compiled_graph(g)
+        bounded: bool = budget is not None or token is not None
+        budget = budget or Budget()
+        deadline: Optional[float] = budget.deadline()
+        for key in self.candidates(g):
+            morphism: Morphism
+            if bounded:
+                # Check the limits between hosts too, however quick their
+                # searches are.
+                checkpoint(0, deadline, None, token)
+                remaining: Optional[float] = (
+                    None if deadline is None
+                    else max(deadline - time.monotonic(), 0.0))
+                result: SearchResult = bounded_subgraph(
+                    g, self.hosts[key], Budget(remaining, budget.nodes),
+                    token)
+                if result.found is None:
+                    if token is not None and token.cancelled:
+                        raise SearchCancelled
+                    raise SearchTimeout
+                morphism = result.morphism
+            else:
+                morphism = subgraph(g, self.hosts[key])
+            if morphism:
+                yield key, morphism
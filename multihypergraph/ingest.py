@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+"""Streaming ingestion of graphs from files, pipes and other text streams.
+
+Edges are read in fixed-size chunks of text, one record at a time, where
+records are separated by commas or newlines, so a graph can be written either
+as 'ab,bc,ca' or with one edge per line. Every record is checked against
+the `objects.vertex` and `objects.edge` axioms as it streams past, so a bad
+record fails at once, and is sorted before it is counted, so that records of
+the same edge written in different orders, such as 'ab' and 'ba', are
+counted together. Every distinct edge is then interned into a compiled graph
+once. Memory use is therefore bounded by the number of distinct edges plus
+one chunk of text (and a cache of a fixed number of records), never by the
+size of the raw text.
+"""
+
+import itertools as it
+import re
+import sys
+import time
+from collections import Counter as counter
+from typing import (IO, Callable, Counter, Dict, Hashable, Iterable, Iterator,
+                    List, NamedTuple, Optional, Tuple, Union, cast)
+
+from .objects import (Vertex, CompiledGraph, EdgeMembers, VertexTable,
+                      label, vertex)
+
+CHUNK_SIZE: int = 1 << 16  # Number of characters read at a time.
+RECORD_CACHE_SIZE: int = 1 << 12
+SEPARATORS: 're.Pattern[str]' = re.compile('([,\n])')
+
+Source = Union[str, IO[str]]
+
+
+class Progress(NamedTuple):
+    """How much of a stream has been ingested so far."""
+    characters: int
+    edges: int
+    seconds: float
+
+    @property
+    def edges_per_second(self) -> float:
+        return self.edges / self.seconds if self.seconds else 0.0
+
+
+# Define the reader.
+def _open(source: Source) -> IO[str]:
+    """Open a path, or '-' for standard input, for reading text."""
+    if not isinstance(source, str):
+        return source
+    if source == '-':
+        return sys.stdin
+    return open(source)
+
+
+def read_records(source: Source, chunksize: int = CHUNK_SIZE,
+                 progress: Optional[Callable[[Progress], None]] = None) \
+    -> Iterator[str]:
+    """Generate the edge records of a text stream, one at a time.
+
+    'source' is a path, '-' for standard input, or an open text stream.
+    Records are separated by commas or newlines, and surrounding whitespace
+    and blank lines are skipped, but an empty record next to a comma (as in
+    'ab,,bc' or 'ab,') is an empty edge and raises an AssertionError, as
+    for `objects.graph`. If 'progress' is provided, then it is called after
+    every chunk, and once more at the end of the stream.
+    """
+    assert chunksize > 0, 'Chunks must contain at least one character.'
+    stream: IO[str] = _open(source)
+    start: float = time.perf_counter()
+    characters: int = 0
+    edges_: int = 0
+    partial: str = ''
+    before: str = '\n'  # The separator in front of 'partial'.
+    try:
+        while True:
+            chunk: str = stream.read(chunksize)
+            if not chunk:
+                break
+            characters += len(chunk)
+            pieces: List[str] = SEPARATORS.split(partial + chunk)
+            partial = pieces.pop()
+            for record, after in zip(pieces[::2], pieces[1::2]):
+                record = record.strip()
+                if record:
+                    edges_ += 1
+                    yield record
+                else:
+                    assert ',' not in (before, after), \
+                        'Empty edges not allowed.'
+                before = after
+            if progress is not None:
+                progress(Progress(characters, edges_,
+                                  time.perf_counter() - start))
+        partial = partial.strip()
+        if partial:
+            edges_ += 1
+            yield partial
+        else:
+            assert before != ',', 'Empty edges not allowed.'
+        if progress is not None:
+            progress(Progress(characters, edges_,
+                              time.perf_counter() - start))
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+# Define the builders.
+def _normalised_records(records: Iterable[str]) -> Iterator[str]:
+    """Check the vertex and edge axioms on edge records as they are read,
+    and generate them with their characters sorted.
+
+    The sorted forms of up to RECORD_CACHE_SIZE distinct records are kept,
+    so that frequent records are only checked and sorted once.
+    """
+    seen: Dict[str, str] = {}
+    for record in records:
+        normalised: Optional[str] = seen.get(record)
+        if normalised is None:
+            for character in set(record):
+                vertex(character)
+            normalised = ''.join(sorted(record))
+            if len(seen) < RECORD_CACHE_SIZE:
+                seen[record] = normalised
+        yield normalised
+
+
+def ingest(source: Source, chunksize: int = CHUNK_SIZE,
+           progress: Optional[Callable[[Progress], None]] = None) \
+    -> CompiledGraph:
+    """Read a graph from a text stream into a compiled graph.
+
+    Vertices are single characters, as for `objects.graph`. Arguments are
+    the same as for `read_records`.
+    """
+    records: Counter[str] = counter(_normalised_records(
+        read_records(source, chunksize, progress)))
+    return compile_edges(records, records.values())
+
+
+def ingest_labelled(source: Source, chunksize: int = CHUNK_SIZE,
+                    progress: Optional[Callable[[Progress], None]] = None) \
+    -> CompiledGraph:
+    """Read a labelled graph from a text stream into a compiled graph.
+
+    Labels within an edge are separated by spaces or tabs, as for
+    `objects.labelled_graph`. Arguments are the same as for `read_records`.
+    """
+    records: Counter[Tuple[Vertex, ...]] = counter(
+        tuple(sorted(map(label, record.split())))
+        for record in read_records(source, chunksize, progress))
+    return compile_edges(records, records.values())
+
+
+def compile_edges(edge_iter: Iterable[Iterable[Hashable]],
+                  multiplicities: Optional[Iterable[int]] = None) \
+    -> CompiledGraph:
+    """Build a compiled graph from edges given one at a time, each as an
+    iterable of vertex labels.
+
+    If 'multiplicities' is provided, then each edge is counted that many
+    times.
+    """
+    table: VertexTable = VertexTable()
+    intern: Callable[[Vertex], int] = table.intern
+    edge_table: Counter[EdgeMembers] = counter()
+    multiplicity_iter: Iterable[int] = (it.repeat(1) if multiplicities is None
+                                        else multiplicities)
+    for edge_labels, multiplicity in zip(edge_iter, multiplicity_iter):
+        members: EdgeMembers = tuple(sorted(
+            map(intern, cast(Iterable[Vertex], edge_labels))))
+        assert members, 'Empty edges not allowed.'
+        edge_table[members] += multiplicity
+    return CompiledGraph(table.labels, dict(edge_table))
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+"""Cheap graph invariants used to reject pairs of graphs before any search.
+
+Each invariant is computed once per compiled graph in O(|E|) time and
+memoised on it. A pair (g, h) is rejected --
+1. for subgraph search, if the invariant of g does not embed in that of h,
+2. for isomorphism, if the invariants of g and h differ.
+Invariants are tried in the order in which they were registered, and the
+number of pairs rejected by each one is recorded in `statistics`.
+"""
+
+from collections import Counter as counter
+from typing import Any, Callable, Counter, List, NamedTuple, Tuple
+
+from .matching import is_dominated, vertex_signatures
+from .objects import AnyGraph, CompiledGraph, compiled_graph
+
+
+# Define new types and type aliases.
+class Invariant(NamedTuple):
+    """A named graph invariant.
+
+    `compute` maps a compiled graph to its (hashable) invariant, and `embeds`
+    checks if the invariant of a subgraph can sit inside that of a graph.
+    """
+    name: str
+    compute: Callable[[CompiledGraph], Any]
+    embeds: Callable[[Any, Any], bool]
+
+
+INVARIANTS: List[Invariant] = []
+
+# Counts of pairs checked, passed and rejected (by invariant name).
+statistics: Counter[str] = counter()
+
+
+# Define the registry.
+def register_invariant(name: str,
+                       compute: Callable[[CompiledGraph], Any],
+                       embeds: Callable[[Any, Any], bool]) -> Invariant:
+    """Add an invariant to the ones checked by `admissible`."""
+    assert name not in (invariant.name for invariant in INVARIANTS), \
+        'Invariant names must be unique.'
+    invariant: Invariant = Invariant(name, compute, embeds)
+    INVARIANTS.append(invariant)
+    return invariant
+
+
+def invariant_value(g: CompiledGraph, invariant: Invariant) -> Any:
+    """Return the (memoised) value of an invariant on a compiled graph."""
+    key: str = 'invariant: ' + invariant.name
+    if key not in g.cache:
+        g.cache[key] = invariant.compute(g)
+    return g.cache[key]
+
+
+def admissible(g: AnyGraph, h: AnyGraph, isomorphism: bool = False) -> bool:
+    """Check if no registered invariant rules out g being a subgraph of h.
+
+    If optional argument 'isomorphism' is set to True, then check if no
+    registered invariant rules out g being isomorphic to h.
+    """
+    g = compiled_graph(g)
+    h = compiled_graph(h)
+    statistics['checked'] += 1
+    for invariant in INVARIANTS:
+        value_g: Any = invariant_value(g, invariant)
+        value_h: Any = invariant_value(h, invariant)
+        if (value_g != value_h if isomorphism
+                else not invariant.embeds(value_g, value_h)):
+            statistics[invariant.name] += 1
+            return False
+    statistics['passed'] += 1
+    return True
+
+
+def reset_statistics() -> None:
+    """Set all counts of checked, passed and rejected pairs to zero."""
+    statistics.clear()
+
+
+# Define comparisons.
+def _at_most(x: int, y: int) -> bool:
+    return x <= y
+
+
+def _pointwise_at_most(x: Tuple[int, ...], y: Tuple[int, ...]) -> bool:
+    return all(a <= b for a, b in zip(x, y))
+
+
+def _histogram_dominated(x: Tuple[Tuple[Any, int], ...],
+                         y: Tuple[Tuple[Any, int], ...]) -> bool:
+    return is_dominated(counter(dict(x)), counter(dict(y)))
+
+
+def _each_dominated_by_some(x: Tuple[Tuple[Tuple[Any, int], ...], ...],
+                            y: Tuple[Tuple[Tuple[Any, int], ...], ...]) \
+    -> bool:
+    signatures_y = [counter(dict(signature)) for signature in set(y)]
+    return all(any(is_dominated(counter(dict(signature)), signature_y)
+                   for signature_y in signatures_y)
+               for signature in set(x))
+
+
+# Define invariants.
+def _histogram(values: Counter[Any]) -> Tuple[Tuple[Any, int], ...]:
+    return tuple(sorted(values.items()))
+
+
+def arity_histogram(g: CompiledGraph) -> Tuple[Tuple[int, int], ...]:
+    """Return the number of edges of each arity, counted with
+    edge-multiplicities."""
+    arities: Counter[int] = counter()
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        arities[len(members)] += multiplicity
+    return _histogram(arities)
+
+
+def loop_counts(g: CompiledGraph) -> Tuple[int, int]:
+    """Return the numbers of self-loops and of other collapsed edges,
+    counted with edge-multiplicities.
+
+    A self-loop has a single vertex repeated, like 'aa'. Any other edge with
+    a repeated vertex, like 'aab', is a collapsed edge.
+    """
+    loops: int = 0
+    collapsed: int = 0
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        distinct: int = len(set(members))
+        if distinct == 1 and len(members) > 1:
+            loops += multiplicity
+        elif 1 < distinct < len(members):
+            collapsed += multiplicity
+    return loops, collapsed
+
+
+def degree_sequence(g: CompiledGraph) -> Tuple[int, ...]:
+    """Return the degrees of all vertices in decreasing order.
+
+    The degree of a vertex is the number of edges containing it, counted with
+    edge-multiplicities.
+    """
+    degrees: List[int] = [0] * g.vertex_count
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        for v in set(members):
+            degrees[v] += multiplicity
+    return tuple(sorted(degrees, reverse=True))
+
+
+def neighbourhood_signatures(g: CompiledGraph) \
+    -> Tuple[Tuple[Tuple[Tuple[int, int], int], ...], ...]:
+    """Return the sorted signatures of all vertices (see
+    `matching.vertex_signatures`)."""
+    return tuple(sorted(_histogram(signature)
+                        for signature in vertex_signatures(g)))
+
+
+register_invariant('vertex count', lambda g: g.vertex_count, _at_most)
+register_invariant('edge count', lambda g: g.edge_count, _at_most)
+register_invariant('multiplicity', lambda g: g.multiplicity, _at_most)
+register_invariant('arity histogram', arity_histogram, _histogram_dominated)
+register_invariant('loop counts', loop_counts, _pointwise_at_most)
+register_invariant('degree sequence', degree_sequence, _pointwise_at_most)
+register_invariant('neighbourhood signatures', neighbourhood_signatures,
+                   _each_dominated_by_some)
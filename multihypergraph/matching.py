@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+
+"""Backtracking subgraph matcher for looped-multi-hyper-graphs.
+
+The matcher extends an injective map from the vertices of a pattern graph to
+the vertices of a host graph one vertex at a time (in the style of VF2 and
+Ullmann's algorithm) and abandons a branch as soon as it cannot be extended.
+Branches are pruned on --
+1. vertex signatures: the edge-arities and collapsed-vertex counts (weighted
+   by edge-multiplicity) around a pattern vertex must all be available around
+   its image,
+2. adjacency: vertices sharing an edge must map to vertices sharing an edge,
+3. edge-multiplicity: every edge whose vertices are all mapped must map to an
+   edge of the host with at least the same multiplicity,
+4. ordering conditions (optional): pairs (a, b) of pattern vertices whose
+   images must satisfy image(a) < image(b), used to break the symmetries of
+   the pattern (see `symmetry`).
+
+All work happens on the integer vertex ids of compiled graphs.
+Searches can be limited by a deadline and a number of search nodes (see
+`Budget`), and stopped from outside with a CancellationToken.
+"""
+
+import threading
+import time
+from collections import Counter as counter
+from typing import (Counter, Dict, FrozenSet, Generator, Iterable, List,
+                    NamedTuple, Optional, Tuple)
+
+from .objects import CompiledGraph, EdgeMembers, VertexId
+from .profiling import CallStats
+
+# Define new types and type aliases.
+Signature = Counter[Tuple[int, int]]
+Embedding = Tuple[VertexId, ...]
+Condition = Tuple[VertexId, VertexId]
+
+# Number of search nodes between two looks at the clock.
+CLOCK_INTERVAL: int = 1024
+
+
+class SearchInterrupted(Exception):
+    """Raised when a search stops before it could finish."""
+
+
+class SearchTimeout(SearchInterrupted):
+    """Raised when a search runs past its deadline or its node budget."""
+
+
+class SearchCancelled(SearchInterrupted):
+    """Raised when a search notices that its cancellation token was
+    cancelled."""
+
+
+class Budget(NamedTuple):
+    """Limits on the work done by a search, in seconds of wall-clock time
+    and in search nodes. A limit of None means no limit."""
+    seconds: Optional[float] = None
+    nodes: Optional[int] = None
+
+    def deadline(self) -> Optional[float]:
+        """Return the deadline (in seconds of `time.monotonic`) of a search
+        starting now."""
+        if self.seconds is None:
+            return None
+        return time.monotonic() + self.seconds
+
+
+class CancellationToken:
+    """A flag that asks the searches holding it to stop.
+
+    Tokens can be cancelled from any thread, and searches look at them every
+    CLOCK_INTERVAL search nodes.
+    """
+    __slots__ = ('_event',)
+
+    def __init__(self) -> None:
+        self._event: threading.Event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+def checkpoint(nodes: int, deadline: Optional[float] = None,
+               max_nodes: Optional[int] = None,
+               token: Optional[CancellationToken] = None) -> int:
+    """Check the limits of a search that has visited some nodes, and return
+    the node count at which to check them next (or -1 for never).
+
+    Raise SearchCancelled if the token was cancelled, and SearchTimeout if
+    the search is past its deadline or has visited more than 'max_nodes'
+    nodes.
+    """
+    if token is not None and token.cancelled:
+        raise SearchCancelled
+    if deadline is not None and time.monotonic() > deadline:
+        raise SearchTimeout
+    if max_nodes is not None and nodes > max_nodes:
+        raise SearchTimeout
+    if deadline is None and token is None:
+        return -1 if max_nodes is None else max_nodes + 1
+    if max_nodes is None:
+        return nodes + CLOCK_INTERVAL
+    return min(nodes + CLOCK_INTERVAL, max_nodes + 1)
+
+
+# Define local invariants of vertices.
+def vertex_signatures(g: CompiledGraph) -> List[Signature]:
+    """Return the signature of every vertex of a compiled graph.
+
+    The signature of a vertex counts the edges around it by (arity, number of
+    times the vertex occurs in the edge), with edge-multiplicities.
+    An injective vertexmap preserves both numbers for every edge.
+    Signatures are memoised on the compiled graph.
+    """
+    if 'vertex signatures' in g.cache:
+        return g.cache['vertex signatures']
+    signatures: List[Signature] = [counter() for _ in range(g.vertex_count)]
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        arity: int = len(members)
+        for v, occurrences in counter(members).items():
+            signatures[v][arity, occurrences] += multiplicity
+    g.cache['vertex signatures'] = signatures
+    return signatures
+
+
+def neighbourhoods(g: CompiledGraph) -> List[FrozenSet[VertexId]]:
+    """Return the set of vertices sharing an edge with each vertex.
+
+    Neighbourhoods are memoised on the compiled graph.
+    """
+    if 'neighbourhoods' in g.cache:
+        return g.cache['neighbourhoods']
+    neighbours: List[set] = [set() for _ in range(g.vertex_count)]
+    for members in g.edge_members:
+        for v in members:
+            neighbours[v].update(members)
+    g.cache['neighbourhoods'] = [frozenset(n - {v})
+                                 for v, n in enumerate(neighbours)]
+    return g.cache['neighbourhoods']
+
+
+def is_dominated(s1: Signature, s2: Signature) -> bool:
+    """Check if every count in the first signature is at most that in the
+    second."""
+    return all(s2[key] >= count for key, count in s1.items())
+
+
+# Define search plans.
+class Plan:
+    """Everything the matcher precomputes for one (pattern, host) pair.
+
+    `order` is the order in which pattern vertices get mapped.
+    `domains[i]` lists the host vertices that may receive `order[i]`.
+    `back_neighbours[i]` lists the earlier pattern vertices adjacent to
+    `order[i]`, and `checks[i]` lists the edges (with multiplicity) that
+    become fully mapped once `order[i]` is.
+    `smaller[i]` and `larger[i]` list the earlier pattern vertices whose
+    images must be smaller and larger than that of `order[i]`.
+    If 'restrictions' is provided, then the domain of each pattern vertex
+    it mentions is cut down to the host vertices it lists. If 'conditions'
+    is provided, then only embeddings satisfying every ordering condition
+    are generated.
+    """
+    __slots__ = ('g', 'h', 'order', 'domains', 'back_neighbours', 'checks',
+                 'smaller', 'larger', 'host_neighbours')
+
+    g: CompiledGraph
+    h: CompiledGraph
+    order: Tuple[VertexId, ...]
+    domains: Tuple[Tuple[VertexId, ...], ...]
+    back_neighbours: Tuple[Tuple[VertexId, ...], ...]
+    checks: Tuple[Tuple[Tuple[EdgeMembers, int], ...], ...]
+    smaller: Tuple[Tuple[VertexId, ...], ...]
+    larger: Tuple[Tuple[VertexId, ...], ...]
+    host_neighbours: List[FrozenSet[VertexId]]
+
+    def __init__(self, g: CompiledGraph, h: CompiledGraph,
+                 restrictions: Optional[Dict[VertexId,
+                                             Iterable[VertexId]]] = None,
+                 conditions: Iterable[Condition] = ()) -> None:
+        self.g = g
+        self.h = h
+        self.host_neighbours = neighbourhoods(h)
+
+        signatures_h: List[Signature] = vertex_signatures(h)
+        domains: Dict[VertexId, Tuple[VertexId, ...]] = {}
+        for u, signature in enumerate(vertex_signatures(g)):
+            domains[u] = tuple(v for v in range(h.vertex_count)
+                               if is_dominated(signature, signatures_h[v]))
+        for u, allowed in (restrictions or {}).items():
+            allowed_set: FrozenSet[VertexId] = frozenset(allowed)
+            domains[u] = tuple(v for v in domains[u] if v in allowed_set)
+
+        neighbours_g: List[FrozenSet[VertexId]] = neighbourhoods(g)
+        self.order = _matching_order(domains, neighbours_g)
+        position: Dict[VertexId, int] = {u: i for i, u in enumerate(self.order)}
+
+        self.domains = tuple(domains[u] for u in self.order)
+        self.back_neighbours = tuple(
+            tuple(w for w in neighbours_g[u] if position[w] < position[u])
+            for u in self.order)
+
+        checks: List[List[Tuple[EdgeMembers, int]]] = [[] for _ in self.order]
+        for members, multiplicity in zip(g.edge_members,
+                                         g.edge_multiplicities):
+            last: int = max(position[v] for v in members)
+            checks[last].append((members, multiplicity))
+        self.checks = tuple(map(tuple, checks))
+
+        smaller: List[List[VertexId]] = [[] for _ in self.order]
+        larger: List[List[VertexId]] = [[] for _ in self.order]
+        for a, b in conditions:
+            if position[a] < position[b]:
+                smaller[position[b]].append(a)
+            else:
+                larger[position[a]].append(b)
+        self.smaller = tuple(map(tuple, smaller))
+        self.larger = tuple(map(tuple, larger))
+
+
+def _matching_order(domains: Dict[VertexId, Tuple[VertexId, ...]],
+                    neighbours: List[FrozenSet[VertexId]]) \
+    -> Tuple[VertexId, ...]:
+    """Order pattern vertices so that constrained vertices come first.
+
+    Start from the vertex with the fewest candidates and then repeatedly pick
+    the vertex with the most already-ordered neighbours, breaking ties by
+    fewest candidates and then by most neighbours.
+    """
+    remaining: set = set(domains)
+    ordered: List[VertexId] = []
+    connections: Dict[VertexId, int] = dict.fromkeys(domains, 0)
+    while remaining:
+        u: VertexId = min(remaining, key=lambda w: (-connections[w],
+                                                     len(domains[w]),
+                                                     -len(neighbours[w]),
+                                                     w))
+        remaining.remove(u)
+        ordered.append(u)
+        for w in neighbours[u]:
+            connections[w] += 1
+    return tuple(ordered)
+
+
+# Define the search.
+def embeddings(plan: Plan, deadline: Optional[float] = None,
+               positions: Optional[List[int]] = None,
+               stats: Optional[CallStats] = None,
+               max_nodes: Optional[int] = None,
+               token: Optional[CancellationToken] = None) \
+    -> Generator[Embedding, None, None]:
+    """Generate all injective maps of pattern vertices into host vertices
+    under which the pattern is contained in the host.
+
+    An embedding is returned as a tuple whose i-th entry is the host vertex
+    receiving pattern vertex i. Containment counts edge-multiplicities.
+    If a deadline (in seconds of `time.monotonic`) or a maximum number of
+    search nodes is provided, then raise SearchTimeout once the search runs
+    past it. If a cancellation token is provided, then raise SearchCancelled
+    once it is cancelled (see `checkpoint`).
+    The search records its progress in 'positions', the index of the next
+    candidate to try at each depth. If a list of positions saved right after
+    an embedding was generated is provided, then the search resumes just
+    after that embedding.
+    If a CallStats is provided, then the counters of the search are added to
+    it once the search stops (see `profiling`).
+    """
+    order = plan.order
+    domains = plan.domains
+    domain_sets = [frozenset(domain) for domain in domains]
+    back_neighbours = plan.back_neighbours
+    checks = plan.checks
+    smaller = plan.smaller
+    larger = plan.larger
+    host_neighbours = plan.host_neighbours
+    edge_table = plan.h.edge_table
+
+    depth_max: int = len(order) - 1
+    phi: List[VertexId] = [-1] * plan.g.vertex_count
+    used: List[bool] = [False] * plan.h.vertex_count
+    if positions is None:
+        positions = [0] * len(order)
+    candidates: List[Tuple[VertexId, ...]] = [()] * len(order)
+
+    def enter(depth: int) -> None:
+        # Candidates must be adjacent to the image of an earlier neighbour,
+        # if there is one.
+        if back_neighbours[depth]:
+            anchor: VertexId = phi[back_neighbours[depth][0]]
+            candidates[depth] = tuple(sorted(
+                host_neighbours[anchor] & domain_sets[depth]))
+        else:
+            candidates[depth] = domains[depth]
+
+    # Counters for `profiling`, kept in locals and only flushed at the end.
+    nodes: int = 0
+    generated: int = 0
+    tried: int = 0
+    checked: int = 0
+    extended: int = 0
+    found: int = 0
+    peak: int = 0
+    depth: int = 0
+    next_check: int = checkpoint(0, deadline, max_nodes, token)
+    if any(positions):
+        # Replay the choices leading to the last embedding generated.
+        for depth in range(len(order)):
+            enter(depth)
+            v: VertexId = candidates[depth][positions[depth] - 1]
+            phi[order[depth]] = v
+            used[v] = True
+
+    try:
+        while depth >= 0:
+            nodes += 1
+            if nodes == next_check:
+                next_check = checkpoint(nodes, deadline, max_nodes, token)
+            u: VertexId = order[depth]
+            if phi[u] >= 0:
+                used[phi[u]] = False
+                phi[u] = -1
+
+            first: int = positions[depth]
+            i: int = first
+            if i == 0:
+                enter(depth)
+                generated += len(candidates[depth])
+            domain = candidates[depth]
+            while i < len(domain):
+                v = domain[i]
+                i += 1
+                if used[v]:
+                    continue
+                if smaller[depth] and not all(phi[w] < v
+                                              for w in smaller[depth]):
+                    continue
+                if larger[depth] and not all(phi[w] > v
+                                             for w in larger[depth]):
+                    continue
+                adjacent = host_neighbours[v]
+                if not all(phi[w] in adjacent
+                           for w in back_neighbours[depth]):
+                    continue
+                checked += 1
+                phi[u] = v
+                if all(edge_table.get(tuple(sorted([phi[x]
+                                                    for x in members])),
+                                      0) >= multiplicity
+                       for members, multiplicity in checks[depth]):
+                    used[v] = True
+                    break
+                phi[u] = -1
+            positions[depth] = i
+            tried += i - first
+
+            if phi[u] < 0:
+                # Branch exhausted. Backtrack.
+                positions[depth] = 0
+                depth -= 1
+                continue
+            extended += 1
+            if depth >= peak:
+                peak = depth + 1
+            if depth == depth_max:
+                found += 1
+                yield tuple(phi)
+            else:
+                depth += 1
+    finally:
+        if stats is not None:
+            stats.counters.update({'nodes': nodes, 'candidates': generated,
+                                   'pruned': tried - checked,
+                                   'checked': checked, 'extended': extended,
+                                   'embeddings': found})
+            stats.reach(peak)
+
+
+def first_embedding(g: CompiledGraph, h: CompiledGraph,
+                    deadline: Optional[float] = None,
+                    restrictions: Optional[Dict[VertexId,
+                                                Iterable[VertexId]]] = None,
+                    conditions: Iterable[Condition] = (),
+                    stats: Optional[CallStats] = None,
+                    max_nodes: Optional[int] = None,
+                    token: Optional[CancellationToken] = None) \
+    -> Optional[Embedding]:
+    """Return the first embedding of g into h found, or None.
+
+    Optional arguments 'restrictions' and 'conditions' are as for `Plan`, and
+    the others are as for `embeddings`.
+    """
+    search: Generator[Embedding, None, None] = embeddings(
+        Plan(g, h, restrictions, conditions), deadline, stats=stats,
+        max_nodes=max_nodes, token=token)
+    try:
+        return next(search, None)
+    finally:
+        search.close()
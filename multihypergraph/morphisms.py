@@ -8,13 +8,26 @@ Think of these as the "morphisms" for the category of looped-multi-hyper-graphs.
 ## WIP
 
 import itertools as it
+import time
 from collections import Counter as counter
 from typing import (List, FrozenSet, Dict, Iterator, Tuple, KeysView,
-                    Counter, NewType, Iterable, Union, Optional)
+                    Counter, NewType, Iterable, Union, Optional, NamedTuple,
+                    Callable)
 
 from .hashable_counter import frozencounter, FrozenCounter
-from .objects import (Vertex, Graph, Edge, EdgeCounter,
-                     vertices, edge, edges, graph)
+from . import incidence
+from . import profiling
+from .cache import memoised
+from .incidence import IncidenceGraph
+from .matching import (Budget, CancellationToken, Condition, Embedding, Plan,
+                       SearchInterrupted, embeddings, first_embedding)
+from .canonical import canonical_search
+from .profiling import CallStats
+from .invariants import admissible
+from .symmetry import symmetry
+from .objects import (Vertex, Graph, Edge, EdgeCounter, AnyGraph,
+                     CompiledGraph, EdgeMembers, VertexId, VertexTable,
+                     vertices, edge, edges, graph, compiled_graph)
 
 # Define new types and type aliases.
 VertexMap = NewType('VertexMap', Dict[Vertex, Vertex])
@@ -22,8 +35,30 @@ InjectiveVertexMap = NewType('InjectiveVertexMap', VertexMap)
 Morphism = NewType('Morphism', InjectiveVertexMap)
 
 
+# Define keys for cached searches (see `cache`).
+def _pair_key(g: AnyGraph, h: AnyGraph) -> Tuple[EdgeCounter, EdgeCounter]:
+    return edges(g), edges(h)
+
+
+def _unbounded_pair_key(g: AnyGraph, h: AnyGraph,
+                        budget: Optional[Budget] = None,
+                        token: Optional[CancellationToken] = None) \
+    -> Optional[Tuple[EdgeCounter, EdgeCounter]]:
+    # Calls within a budget or with a cancellation token are not cached.
+    if budget is not None or token is not None:
+        return None
+    return _pair_key(g, h)
+
+
+def copy_morphism(m: Morphism) -> Morphism:
+    """Return a copy of a morphism that can be changed without changing the
+    original."""
+    return Morphism(InjectiveVertexMap(VertexMap(dict(m))))
+
+
 # Define constructors for each type.
-def is_vertexmap(d: Dict[Vertex, Vertex], g: Graph, h: Optional[Graph] = None)\
+def is_vertexmap(d: Dict[Vertex, Vertex], g: AnyGraph,
+                 h: Optional[AnyGraph] = None) \
     -> bool:
     """Check if a dictionary is a vertexmap from one graph to another.
 
@@ -46,7 +81,9 @@ def is_injective(d: Dict) -> bool:
     return len(d) == len(frozenset(d.values()))
 
 
-def is_morphism(d: Dict[Vertex, Vertex], g: Graph, h: Optional[Graph] = None) \
+def is_morphism(d: Dict[Vertex, Vertex],
+                g: Union[AnyGraph, IncidenceGraph],
+                h: Union[AnyGraph, IncidenceGraph, None] = None) \
     -> bool:
     """Check if a dictionary is a morphism from one graph to another.
 
@@ -58,7 +95,14 @@ def is_morphism(d: Dict[Vertex, Vertex], g: Graph, h: Optional[Graph] = None) \
     Injectivity ensures that edges do not get mapped to collapsed edges.
     Morphisms by our definition will ignore edge-multiplicities.
     Note that not every injective vertexmap is a morphism.
+    Incidence graphs (see `incidence`) are checked with array operations.
     """
+    if isinstance(g, IncidenceGraph) or isinstance(h, IncidenceGraph):
+        return incidence.is_morphism(d, incidence.as_incidence_graph(g),
+                                     None if h is None
+                                     else incidence.as_incidence_graph(h))
+    g = compiled_graph(g)
+    h = g if h is None else compiled_graph(h)
     if not is_vertexmap(d, g, h):
         return False
     vm: VertexMap = VertexMap(d)
@@ -67,15 +111,12 @@ def is_morphism(d: Dict[Vertex, Vertex], g: Graph, h: Optional[Graph] = None) \
         return False
     ivm: InjectiveVertexMap = InjectiveVertexMap(vm)
 
-    if h is None:
-        h = g
-
-    edge_g: Edge
-    for edge_g in edges(g):
-        mapped_edge1: Iterator[Vertex]
-        mapped_edge1 = (ivm[vertex_g] for vertex_g in edge_g)
-        mapped_edge2: Edge = edge(''.join(mapped_edge1))
-        if edge_g in edges(g) and mapped_edge2 not in edges(h):
+    # Compare edges as sorted tuples of vertex ids of h.
+    image: List[VertexId] = [h.ids[ivm[vertex_g]] for vertex_g in g.labels]
+    members: EdgeMembers
+    for members in g.edge_members:
+        mapped_members: EdgeMembers = tuple(sorted([image[v] for v in members]))
+        if mapped_members not in h.edge_table:
             return False
     return True
 
@@ -85,7 +126,24 @@ def empty_morphism() -> Morphism:
     return Morphism(InjectiveVertexMap(VertexMap({})))
 
 
-def translate_graph(g: Graph, ivm: InjectiveVertexMap) -> Graph:
+def translate(g: AnyGraph, vm: VertexMap) -> CompiledGraph:
+    """Return the image of a graph under a vertexmap, as a compiled graph.
+
+    Edges are translated as arrays of vertex ids, so this works for any
+    vertex labels and any number of vertices. Edges that get identified by a
+    non-injective vertexmap have their multiplicities added up.
+    """
+    g = compiled_graph(g)
+    table: VertexTable = VertexTable()
+    image: List[VertexId] = [table.intern(vm[vertex_g])
+                             for vertex_g in g.labels]
+    edge_table: Counter[EdgeMembers] = counter()
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        edge_table[tuple(sorted([image[v] for v in members]))] += multiplicity
+    return CompiledGraph(table.labels, dict(edge_table))
+
+
+def translate_graph(g: AnyGraph, ivm: InjectiveVertexMap) -> Graph:
     """Return the image of a graph under an injective vertexmap.
 
     Note that translation is guaranteed to always return a graph if the
@@ -93,14 +151,14 @@ def translate_graph(g: Graph, ivm: InjectiveVertexMap) -> Graph:
     1. vertexmap ensures that all vertices of the domain graph are mapped.
     2. injectivity of the vertexmap prevents repetition of vertex in any
     single edge.
+    Raise ValueError if some image is not a single character, since the
+    image then has no graph string (use `translate` instead).
     """
-    ivm2: Dict[str, str]
-    ivm2 = {str(key): str(value) for (key, value) in ivm.items()}
-    translation_table = str.maketrans(ivm2)
-    return graph(g.translate(translation_table))
+    return translate(g, ivm).graph
 
 
-def morphism(d: Dict[Vertex, Vertex], g: Graph, h: Optional[Graph] = None) \
+def morphism(d: Dict[Vertex, Vertex], g: AnyGraph,
+             h: Optional[AnyGraph] = None) \
     -> Morphism:
     """Convert dictionary to morphism between two graphs.
 
@@ -115,8 +173,8 @@ def morphism(d: Dict[Vertex, Vertex], g: Graph, h: Optional[Graph] = None) \
 
 # Define graph methods.
 
-def generate_vertexmaps(g: Graph,
-                        h: Optional[Graph] = None,
+def generate_vertexmaps(g: AnyGraph,
+                        h: Optional[AnyGraph] = None,
                         injective: Optional[bool] = True) \
     -> Union[Iterator[InjectiveVertexMap], Iterator[VertexMap]]:
     """Generate all (injective) vertexmaps from one graph to another.
@@ -130,24 +188,25 @@ def generate_vertexmaps(g: Graph,
     vertexmaps (not just the injective ones).
     If only one graph argument is provided, then return (injective) vertexmaps
     from a graph to itself.
+    To count the vertexmaps that are (injective) homomorphisms without
+    generating them, see `homomorphisms`.
     """
 
     if h is None:
         h = g
 
-    domain: Iterator[Tuple[Vertex, ...]] # order matters in the domain.
-    domain = it.permutations(vertices(g))
-
+    domain: Iterable[Tuple[Vertex, ...]]
     codomain: Iterable[Tuple[Vertex, ...]]
     if injective:
-        # Order doesn't matter in codomain and injectivity implies picking
-        # vertices of graph2 without replacement.
+        # Order matters in the domain, but not in the codomain, and
+        # injectivity implies picking vertices of graph2 without replacement.
+        domain = it.permutations(vertices(g))
         codomain = it.combinations(vertices(h), len(vertices(g)))
     else:
-        # A general vertexmap is generated by picking vertices of graph2
-        # with replacement.
-        codomain = it.combinations_with_replacement(vertices(h), \
-            len(vertices(g)))
+        # A general vertexmap is generated by fixing the order of the domain
+        # and picking vertices of graph2 with replacement, in every order.
+        domain = [tuple(vertices(g))]
+        codomain = it.product(vertices(h), repeat=len(vertices(g)))
 
     mappings1: Iterator[Tuple[Tuple[Vertex, ...], Tuple[Vertex, ...]]]
     mappings1 = it.product(domain, codomain)
@@ -167,8 +226,9 @@ def generate_vertexmaps(g: Graph,
 
 
 
-def subgraph(g: Graph, h: Graph) -> Morphism:
-    """Bruteforce subgraph search algorithm.
+@memoised('subgraph', _pair_key, copy_morphism)
+def subgraph(g: AnyGraph, h: AnyGraph) -> Morphism:
+    """Backtracking subgraph search algorithm.
 
     Graph1 is a subgraph of Graph2 if there is a morphism from the vertexset of
     Graph1 to the vertexset of Graph2 such that every edge of Graph1 maps to a
@@ -177,40 +237,374 @@ def subgraph(g: Graph, h: Graph) -> Morphism:
     If Graph1 is indeed a subgraph of Graph2, then return the corresponding
     relabling from vertices of g to vertices of copy of g in h.
     Else return an empty morphism.
+    The morphism is built one vertex at a time (see `matching`), so branches
+    that cannot be extended are abandoned early. Branches that only differ by
+    an automorphism of g are explored once (see `symmetry`).
+    While profiling is on, the call is recorded (see `profiling`).
+    """
+    stats: Optional[CallStats] = profiling.start('subgraph')
+    result: Morphism = _subgraph(g, h, stats)
+    if stats is not None:
+        profiling.finish(stats)
+    return result
+
+
+def _subgraph(g: AnyGraph, h: AnyGraph, stats: Optional[CallStats],
+              deadline: Optional[float] = None,
+              max_nodes: Optional[int] = None,
+              token: Optional[CancellationToken] = None) -> Morphism:
+    g = compiled_graph(g)
+    h = compiled_graph(h)
+    if stats is not None:
+        stats.lap('compile')
+
+    result: Morphism = empty_morphism()
+    # An invariant of g (vertex count, degree sequence, etc.) may not fit
+    # inside the same invariant of h.
+    if admissible(g, h):
+        if stats is not None:
+            stats.lap('admissible')
+        conditions: Tuple[Condition, ...]
+        conditions = symmetry(g, deadline, token).conditions
+        if stats is not None:
+            stats.lap('symmetry')
+        embedding: Optional[Embedding]
+        embedding = first_embedding(g, h, deadline, conditions=conditions,
+                                    stats=stats, max_nodes=max_nodes,
+                                    token=token)
+        if embedding is not None:
+            result = embedding_to_morphism(embedding, g, h)
+        if stats is not None:
+            stats.lap('search')
+    elif stats is not None:
+        stats.lap('admissible')
+    return result
+
+
+class SearchResult(NamedTuple):
+    """The outcome of a search run within a budget.
+
+    `found` is True or False if the search finished, and None (unknown) if it
+    ran out of budget or was cancelled first. `morphism` is empty unless
+    something was found. `stats` records the work done (see `profiling`).
+    """
+    found: Optional[bool]
+    morphism: Morphism
+    stats: CallStats
+
+
+def _bounded(name: str, search: Callable[..., Morphism], g: AnyGraph,
+             h: AnyGraph, budget: Optional[Budget],
+             token: Optional[CancellationToken]) -> SearchResult:
+    """Run a search within a budget and wrap its outcome."""
+    budget = budget or Budget()
+    stats: CallStats = CallStats(name)
+    found: Optional[bool]
+    try:
+        morphism: Morphism = search(g, h, stats, budget.deadline(),
+                                    budget.nodes, token)
+        found = bool(morphism)
+    except SearchInterrupted:
+        # Charge the phase cut short to 'interrupted'.
+        stats.lap('interrupted')
+        morphism, found = empty_morphism(), None
+    profiling.finish(stats)
+    return SearchResult(found, morphism, stats)
+
+
+def bounded_subgraph(g: AnyGraph, h: AnyGraph,
+                     budget: Optional[Budget] = None,
+                     token: Optional[CancellationToken] = None) \
+    -> SearchResult:
+    """Search for g as a subgraph of h (see `subgraph`) within a budget.
+
+    The search gives up once it runs past `budget.seconds` or visits more than
+    `budget.nodes` nodes of the matcher (see `matching`), or once the
+    cancellation token is cancelled, and then reports an unknown result.
+    Time spent breaking the symmetries of g counts against the time budget
+    only.
     """
+    return _bounded('bounded_subgraph', _subgraph, g, h, budget, token)
 
-    # Perform basic checks.
-    if len(vertices(g)) > len(vertices(h)):
-        # Subgraph must have lesser vertices than its supergraph.
-        return empty_morphism()
-
-    if len(edges(g)) > len(edges(h)):
-        # Subgraph must have lesser edges than its supergraph,
-        # (counted without multiplicities).
-        return empty_morphism()
-
-    if sum(edges(g).values()) > sum(edges(h).values()):
-        # Subgraph must have lesser edges that its supergraph,
-        # (counted with multiplicities).
-        return empty_morphism()
-
-    vm: VertexMap # injective must always be set to True
-    for vm in generate_vertexmaps(g, h, injective=True):
-        m: Morphism = morphism(vm, g, h)
-        m2: Dict[str, str] = {str(key): str(value) for key, value in m.items()}
-        translation_table = str.maketrans(m2)
-        translated_graph = graph(g.translate(translation_table))
-
-        edges_h: EdgeCounter = edges(h).copy()
-        edges_h.subtract(edges(translated_graph))
-        negative_edges = -edges_h
-        if not negative_edges:
-            return m
-    return empty_morphism()
 
-def isomorphism(g: Graph, h: Graph) -> Morphism:
+def embedding_to_morphism(embedding: Embedding, g: CompiledGraph,
+                          h: CompiledGraph) -> Morphism:
+    """Translate an embedding on vertex ids into a morphism on vertices."""
+    return Morphism(InjectiveVertexMap(VertexMap(
+        {g.labels[u]: h.labels[v] for u, v in enumerate(embedding)})))
+
+
+class Cursor(NamedTuple):
+    """A checkpoint of an enumeration of embeddings.
+
+    Cursors are plain tuples of integers and booleans, so they can be saved
+    anywhere. A cursor is only meaningful for the pair of graphs it was taken
+    from.
+    """
+    positions: Tuple[int, ...]
+    exhausted: bool
+
+
+class Embeddings:
+    """An iterator over the embeddings of one graph in another.
+
+    See `iter_embeddings`. The `cursor` property can be read at any time to
+    checkpoint the enumeration.
+    """
+    __slots__ = ('g', 'h', 'remaining', 'exhausted', 'interrupted',
+                 '_positions', '_search', '_bounded', '_interruption')
+
+    def __init__(self, g: AnyGraph, h: AnyGraph, limit: Optional[int] = None,
+                 cursor: Optional[Cursor] = None,
+                 up_to_symmetry: bool = False,
+                 budget: Optional[Budget] = None,
+                 token: Optional[CancellationToken] = None) -> None:
+        self.g: CompiledGraph = compiled_graph(g)
+        self.h: CompiledGraph = compiled_graph(h)
+        self.remaining: Optional[int] = limit
+        self.exhausted: bool = False
+        self.interrupted: bool = False
+        self._interruption: Optional[SearchInterrupted] = None
+        self._bounded: bool = budget is not None or token is not None
+        budget = budget or Budget()
+        deadline: Optional[float] = budget.deadline()
+        self._positions: List[int] = [0] * self.g.vertex_count
+        if cursor is not None:
+            assert len(cursor.positions) == self.g.vertex_count, \
+                'Cursor does not belong to this pattern.'
+            self._positions[:] = cursor.positions
+            self.exhausted = cursor.exhausted
+        if not self.exhausted and not admissible(self.g, self.h):
+            self.exhausted = True
+        self._search: Iterator[Embedding] = iter(())
+        if not self.exhausted:
+            conditions: Tuple[Condition, ...] = ()
+            if up_to_symmetry:
+                conditions = symmetry(self.g, deadline, token).conditions
+            self._search = embeddings(Plan(self.g, self.h,
+                                           conditions=conditions),
+                                      deadline, self._positions,
+                                      max_nodes=budget.nodes, token=token)
+
+    @property
+    def cursor(self) -> Cursor:
+        """Return a checkpoint from which the enumeration can be resumed."""
+        return Cursor(tuple(self._positions), self.exhausted)
+
+    def __iter__(self) -> 'Embeddings':
+        return self
+
+    def next_embedding(self) -> Embedding:
+        """Return the next embedding on vertex ids.
+
+        Once the enumeration is interrupted, raise the same kind of
+        interruption on every later call, since the search cannot go on (it
+        can be resumed from the cursor instead).
+        """
+        if self._interruption is not None:
+            raise type(self._interruption)(
+                'The enumeration was interrupted. Resume it from its cursor.')
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                raise StopIteration
+            self.remaining -= 1
+        if not self._bounded:
+            try:
+                return next(self._search)
+            except StopIteration:
+                self.exhausted = True
+                raise
+        # Keep the positions after the last embedding generated, so that the
+        # cursor stays valid if the search is interrupted.
+        positions: List[int] = self._positions[:]
+        try:
+            return next(self._search)
+        except StopIteration:
+            self.exhausted = True
+            raise
+        except SearchInterrupted as interruption:
+            self._positions[:] = positions
+            self.interrupted = True
+            self._interruption = interruption
+            if self.remaining is not None:
+                self.remaining += 1
+            raise
+
+    def __next__(self) -> Morphism:
+        return embedding_to_morphism(self.next_embedding(), self.g, self.h)
+
+    def count(self) -> int:
+        """Count the remaining embeddings without building morphisms."""
+        count: int = 0
+        try:
+            while True:
+                self.next_embedding()
+                count += 1
+        except StopIteration:
+            return count
+
+
+def iter_embeddings(g: AnyGraph, h: Optional[AnyGraph] = None,
+                    limit: Optional[int] = None, count_only: bool = False,
+                    cursor: Optional[Cursor] = None,
+                    up_to_symmetry: bool = False,
+                    budget: Optional[Budget] = None,
+                    token: Optional[CancellationToken] = None) \
+    -> Union[Embeddings, int]:
+    """Lazily generate every morphism under which g is a subgraph of h.
+
+    Only valid morphisms are generated (see `subgraph` for the definition).
+    If only one graph argument is provided, then generate the morphisms from a
+    graph into itself.
+    If optional argument 'limit' is provided, then stop after that many
+    morphisms. If optional argument 'count_only' is set to True, then return
+    the number of morphisms instead, without building any of them.
+    If a cursor (taken from the `cursor` property of an earlier enumeration of
+    the same graphs) is provided, then continue from where it was taken.
+    If optional argument 'up_to_symmetry' is set to True, then generate only
+    one morphism out of every class of morphisms that differ by an
+    automorphism of g (see `symmetry`). Cursors only resume enumerations made
+    with the same setting.
+    If a budget or a cancellation token is provided (see `bounded_subgraph`),
+    then the enumeration raises SearchTimeout or SearchCancelled once it runs
+    out, and sets `interrupted`. Every morphism generated so far is valid,
+    and the cursor resumes just after the last of them. Later calls keep
+    raising the same kind of interruption, and the enumeration is never
+    marked exhausted.
+    """
+    if h is None:
+        h = g
+    embeddings_: Embeddings = Embeddings(g, h, limit, cursor, up_to_symmetry,
+                                         budget, token)
+    if count_only:
+        return embeddings_.count()
+    return embeddings_
+
+
+def count_embedding_classes(g: AnyGraph, h: Optional[AnyGraph] = None,
+                            budget: Optional[Budget] = None,
+                            token: Optional[CancellationToken] = None) \
+    -> Tuple[int, int]:
+    """Count the classes of morphisms under which g is a subgraph of h.
+
+    Morphisms are in the same class if they differ by an automorphism of g.
+    Return the number of classes, found by visiting one morphism per class,
+    along with the number of automorphisms of g, which is the size of every
+    class. Their product is the number of morphisms.
+    Optional arguments 'budget' and 'token' are as for `iter_embeddings`.
+    """
+    if h is None:
+        h = g
+    g = compiled_graph(g)
+    budget = budget or Budget()
+    deadline: Optional[float] = budget.deadline()
+    # Break the symmetries of g first, within the same deadline, since the
+    # enumeration skips them for pairs that are not admissible.
+    automorphism_count: int = symmetry(g, deadline, token).automorphism_count
+    if deadline is not None:
+        budget = Budget(max(deadline - time.monotonic(), 0.0), budget.nodes)
+    classes: int = Embeddings(g, h, up_to_symmetry=True, budget=budget,
+                              token=token).count()
+    return classes, automorphism_count
+
+
+def automorphisms(g: AnyGraph, limit: Optional[int] = None,
+                  count_only: bool = False, cursor: Optional[Cursor] = None,
+                  budget: Optional[Budget] = None,
+                  token: Optional[CancellationToken] = None) \
+    -> Union[Embeddings, int]:
+    """Lazily generate every automorphism of a graph.
+
+    Automorphisms are the morphisms under which a graph is a subgraph of
+    itself. Optional arguments are the same as for `iter_embeddings`.
+    """
+    return iter_embeddings(g, g, limit, count_only, cursor, budget=budget,
+                           token=token)
+
+
+@memoised('isomorphism', _pair_key, copy_morphism)
+def isomorphism(g: AnyGraph, h: AnyGraph) -> Morphism:
     """If g is isomorphic to h, return the isomorphism. Else return empty
-       dict."""
-    if subgraph(h, g):
-        return subgraph(g, h)
-    return empty_morphism()
+       dict.
+
+    The isomorphism sends every vertex of g to the vertex of h with the same
+    canonical label (see `canonical`).
+    While profiling is on, the call is recorded (see `profiling`).
+    """
+    stats: Optional[CallStats] = profiling.start('isomorphism')
+    result: Morphism = _isomorphism(g, h, stats)
+    if stats is not None:
+        profiling.finish(stats)
+    return result
+
+
+def _isomorphism(g: AnyGraph, h: AnyGraph, stats: Optional[CallStats],
+                 deadline: Optional[float] = None,
+                 max_nodes: Optional[int] = None,
+                 token: Optional[CancellationToken] = None) -> Morphism:
+    g = compiled_graph(g)
+    h = compiled_graph(h)
+    if stats is not None:
+        stats.lap('compile')
+    result: Morphism = empty_morphism()
+    if admissible(g, h, isomorphism=True):
+        if stats is not None:
+            stats.lap('admissible')
+        certificate_g, labelling_g = canonical_search(g, stats, deadline,
+                                                      max_nodes, token)
+        if max_nodes is not None:
+            # Both searches share the node budget.
+            assert stats is not None, 'Node budgets need a CallStats.'
+            max_nodes -= stats.counters['tree nodes']
+        certificate_h, labelling_h = canonical_search(h, stats, deadline,
+                                                      max_nodes, token)
+        if certificate_g == certificate_h:
+            inverse_h: Dict[int, Vertex]
+            inverse_h = {label: h.labels[v]
+                         for v, label in enumerate(labelling_h)}
+            result = Morphism(InjectiveVertexMap(VertexMap(
+                {g.labels[v]: inverse_h[label]
+                 for v, label in enumerate(labelling_g)})))
+        if stats is not None:
+            stats.lap('canonical')
+    elif stats is not None:
+        stats.lap('admissible')
+    return result
+
+
+def bounded_isomorphism(g: AnyGraph, h: AnyGraph,
+                        budget: Optional[Budget] = None,
+                        token: Optional[CancellationToken] = None) \
+    -> SearchResult:
+    """Search for an isomorphism from g to h (see `isomorphism`) within a
+    budget.
+
+    The search gives up once it runs past `budget.seconds` or visits more than
+    `budget.nodes` nodes of the two canonical searches together (see
+    `canonical`), or once the cancellation token is cancelled, and then
+    reports an unknown result.
+    """
+    return _bounded('bounded_isomorphism', _isomorphism, g, h, budget, token)
+
+
+@memoised('is_isomorphic', _unbounded_pair_key)
+def is_isomorphic(g: AnyGraph, h: AnyGraph, budget: Optional[Budget] = None,
+                  token: Optional[CancellationToken] = None) -> bool:
+    """Check if two graphs are isomorphic by comparing their certificates.
+
+    If a budget or a cancellation token is provided (see
+    `bounded_isomorphism`), then raise SearchTimeout or SearchCancelled once
+    the search runs out of it. Such calls are not cached.
+    While profiling is on, the call is recorded (see `profiling`).
+    """
+    budget = budget or Budget()
+    stats: Optional[CallStats] = profiling.start('is_isomorphic')
+    counted: Optional[CallStats] = stats
+    if counted is None and budget.nodes is not None:
+        # Node budgets are counted on a CallStats, recorded or not.
+        counted = CallStats('is_isomorphic')
+    result: bool = bool(_isomorphism(g, h, counted, budget.deadline(),
+                                     budget.nodes, token))
+    if stats is not None:
+        profiling.finish(stats)
+    return result
@@ -8,8 +8,10 @@ Think of these as the "objects" for the category of looped-multi-hyper-graphs.
 import itertools as it
 from collections import Counter as counter
 from typing import (List, FrozenSet, Dict, Iterator, Tuple, KeysView,
-                    Counter, NewType, Iterable, Union, Optional)
+                    Counter, NewType, Iterable, Union, Optional, Any, Hashable,
+                    Sequence, cast)
 
+from .cache import memoised
 from .hashable_counter import frozencounter, FrozenCounter
 
 # Define new types and type aliases.
@@ -18,6 +20,15 @@ Edge = NewType('Edge', FrozenCounter[Vertex])
 Graph = NewType('Graph', str)
 VertexSet = FrozenSet[Vertex]
 EdgeCounter = Counter[Edge]
+VertexId = int
+EdgeMembers = Tuple[VertexId, ...]
+
+RESERVED_SYMBOLS: Tuple[str, ...] = ('', ' ', '~', ',', '|')
+
+
+def _string_key(expression: Any) -> Optional[str]:
+    """Cache graph functions on graph strings only (see `cache`)."""
+    return expression if isinstance(expression, str) else None
 
 
 # Define constructors for each type.
@@ -26,7 +37,7 @@ def vertex(s: str) -> Vertex:
 
     By definition, a vertex is just a character (length one string).
     """
-    assert s not in ('', ' ', '~', ',', '|'), 'Vertex equals a reserved symbol.'
+    assert s not in RESERVED_SYMBOLS, 'Vertex equals a reserved symbol.'
     assert len(s) == 1, 'Vertex names must be strings of length one.'
     return Vertex(s)
 
@@ -43,7 +54,8 @@ def edge(s: str) -> Edge:
     return Edge(frozencounter(map(vertex, s)))
 
 
-def graph(expression: str) -> Graph:
+@memoised('graph', _string_key)
+def graph(expression: Union[str, 'CompiledGraph']) -> Graph:
     """Check axioms that Graph type must satisfy.
 
     By definition, a graph is a string-representation of edges separated by
@@ -54,28 +66,260 @@ def graph(expression: str) -> Graph:
     Isolated vertices are allowed.
     Isolated vertices with multiplicity are allowed.
     Empty edges are not allowed.
+    A compiled graph is converted back to its canonical string (see
+    `CompiledGraph.graph`).
     """
-    edge_iter: Iterator[Edge] = map(edge, expression.split(','))
-    
-    edge_elements_iter: Iterator[Iterator[str]]
-    edge_elements_iter = (edge_.elements() for edge_ in edge_iter)
-    
-    edge_strings: Iterator[str] = map(''.join, edge_elements_iter)
-    graph_string: str = ','.join(edge_strings)
+    if isinstance(expression, CompiledGraph):
+        return expression.graph
+    # Each distinct edge string is checked and normalised only once.
+    edge_strings: List[str] = expression.split(',')
+    normalised: Dict[str, str] = {
+        edge_string: ''.join(edge(edge_string).elements())
+        for edge_string in dict.fromkeys(edge_strings)}
+    graph_string: str = ','.join(map(normalised.__getitem__, edge_strings))
     return Graph(graph_string)
 
 
-def edges(g: Graph) -> EdgeCounter:
+@memoised('edges', _string_key)
+def edges(g: 'AnyGraph') -> EdgeCounter:
     """Return edges of a graph as an (frozen)counter.
 
     Return edges as a frozencounter with edge-multiplicities as values.
+    Compiled graphs return the counter cached at compile-time.
     """
-    edge_iter: Iterator[Edge] = map(edge, g.split(','))
-    return frozencounter(edge_iter)
+    if isinstance(g, CompiledGraph):
+        return g.edge_counter
+    edge_counter: EdgeCounter = counter()
+    for edge_string, multiplicity in counter(g.split(',')).items():
+        edge_counter[edge(edge_string)] += multiplicity
+    return frozencounter(edge_counter)
 
 
-def vertices(g: Graph) -> VertexSet:
+@memoised('vertices', _string_key)
+def vertices(g: 'AnyGraph') -> VertexSet:
     """Return (frozen)set of all vertices of a graph."""
+    if isinstance(g, CompiledGraph):
+        return g.vertex_set
     edges_without_multiplicities: KeysView[Edge] = edges(g).keys()
     vertex_set: VertexSet = frozenset()
     return vertex_set.union(*edges_without_multiplicities)
+
+
+# Define a compiled (parse-once) representation of graphs.
+def label(x: Hashable) -> Vertex:
+    """Check axioms that vertex labels of labelled graphs must satisfy.
+
+    Labels of labelled graphs can be any hashable values. Strings may be of
+    any length, but must not be empty or contain whitespace or any reserved
+    symbol.
+    """
+    if isinstance(x, str):
+        assert x and not any(symbol in x for symbol in RESERVED_SYMBOLS[2:]) \
+            and not any(character.isspace() for character in x), \
+            'Label contains a reserved symbol.'
+    hash(x)
+    return cast(Vertex, x)
+
+
+class VertexTable:
+    """An interning table from vertex labels to dense integer ids.
+
+    Ids are handed out as 0, 1, ... in order of first appearance.
+    """
+    __slots__ = ('labels', 'ids')
+
+    labels: List[Vertex]
+    ids: Dict[Vertex, VertexId]
+
+    def __init__(self, labels: Iterable[Vertex] = ()) -> None:
+        self.labels = []
+        self.ids = {}
+        for label_ in labels:
+            self.intern(label_)
+
+    def intern(self, label_: Vertex) -> VertexId:
+        """Return the id of a label, adding the label if it is new."""
+        id_: Optional[VertexId] = self.ids.get(label_)
+        if id_ is None:
+            id_ = self.ids[label_] = len(self.labels)
+            self.labels.append(label_)
+        return id_
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, label_: object) -> bool:
+        return label_ in self.ids
+
+
+class CompiledGraph:
+    """A graph parsed once into interned integer vertex ids.
+
+    Vertices are numbered 0, 1, ... in order of first appearance in the
+    canonical graph string, and `labels` maps these ids back to vertices.
+    Labelled graphs (see `labelled_graph`) may use any hashable labels.
+    Graphs whose labels are not all single characters have no graph string,
+    and are written out as lists of edge labels instead (see `edge_labels`).
+    Every distinct edge is stored as a sorted tuple of vertex ids (a vertex
+    is repeated once per occurrence in the edge) in `edge_members`, with its
+    edge-multiplicity at the same position in `edge_multiplicities`.
+    Vertex and edge counts are computed once and cached.
+    Compiled graphs are never mutated after construction, except for `cache`
+    which memoises data derived from the graph (such as invariants).
+    """
+    __slots__ = ('_graph', 'labels', 'ids', 'edge_members',
+                 'edge_multiplicities', 'edge_table', '_edge_counter',
+                 'vertex_set', 'vertex_count', 'edge_count',
+                 'multiplicity', 'cache')
+
+    _graph: Optional[Graph]
+    labels: Tuple[Vertex, ...]
+    ids: Dict[Vertex, VertexId]
+    edge_members: Tuple[EdgeMembers, ...]
+    edge_multiplicities: Tuple[int, ...]
+    edge_table: Dict[EdgeMembers, int]
+    _edge_counter: Optional[EdgeCounter]
+    vertex_set: VertexSet
+    vertex_count: int
+    edge_count: int
+    multiplicity: int
+    cache: Dict[str, Any]
+
+    def __init__(self, labels: Iterable[Vertex],
+                 edge_table: Dict[EdgeMembers, int],
+                 expression: Optional[Graph] = None) -> None:
+        """Build a compiled graph from its vertices and its edge table.
+
+        The edge table maps sorted tuples of vertex ids to edge-multiplicities.
+        If the graph string is not provided, then it is rebuilt from the
+        edge table, unless the graph is labelled and has none.
+        """
+        self.labels = tuple(labels)
+        self.ids = {vertex_: id_ for id_, vertex_ in enumerate(self.labels)}
+        self.edge_table = edge_table
+        self.edge_members = tuple(edge_table)
+        self.edge_multiplicities = tuple(edge_table.values())
+
+        if expression is None and all(isinstance(label_, str)
+                                      and len(label_) == 1
+                                      for label_ in self.labels):
+            expression = Graph(','.join(
+                ','.join([''.join(self.labels[v] for v in members)]
+                         * multiplicity)
+                for members, multiplicity in edge_table.items()))
+        self._graph = expression
+        self._edge_counter = None
+
+        self.vertex_set = frozenset(self.labels)
+        self.vertex_count = len(self.labels)
+        self.edge_count = len(self.edge_members)
+        self.multiplicity = sum(self.edge_multiplicities)
+        self.cache = {}
+
+    @property
+    def edge_counter(self) -> EdgeCounter:
+        """Return the edges as a frozencounter of edges, built on first use."""
+        if self._edge_counter is None:
+            self._edge_counter = frozencounter({
+                Edge(frozencounter(self.labels[v] for v in members)):
+                multiplicity
+                for members, multiplicity in self.edge_table.items()})
+        return self._edge_counter
+
+    @property
+    def graph(self) -> Graph:
+        """Return the graph string.
+
+        Raise ValueError if some label is not a single character, since such
+        labels cannot be written in a graph string.
+        """
+        if self._graph is None:
+            raise ValueError('Labelled graph has no graph string. '
+                             'Use edge_labels instead.')
+        return self._graph
+
+    @property
+    def edge_labels(self) -> Tuple[Tuple[Vertex, ...], ...]:
+        """Return the labels of the vertices of every edge, with every edge
+        repeated once per unit of multiplicity.
+
+        This works for any labels, and `labelled_graph` turns it back into an
+        equal compiled graph.
+        """
+        return tuple(tuple(self.labels[v] for v in members)
+                     for members, multiplicity in self.edge_table.items()
+                     for _ in range(multiplicity))
+
+    def __str__(self) -> str:
+        if self._graph is None:
+            return repr(self)
+        return self._graph
+
+    def __repr__(self) -> str:
+        if self._graph is None:
+            return ('labelled_graph('
+                    f'{[list(members) for members in self.edge_labels]!r})')
+        return f'compiled_graph({self._graph!r})'
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompiledGraph):
+            return self.edge_counter == other.edge_counter
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.edge_counter)
+
+    def __reduce__(self) \
+        -> Tuple[type, Tuple[Tuple[Vertex, ...], Dict[EdgeMembers, int],
+                             Optional[Graph]]]:
+        return (CompiledGraph, (self.labels, self.edge_table, self._graph))
+
+
+AnyGraph = Union[Graph, CompiledGraph]
+
+
+@memoised('compiled_graph', _string_key)
+def compiled_graph(g: AnyGraph) -> CompiledGraph:
+    """Parse a graph once into its compiled representation.
+
+    Compiled graphs are returned as they are, so this function can be
+    called on either form at the top of any function that takes a graph.
+    """
+    if isinstance(g, CompiledGraph):
+        return g
+    expression: Graph = graph(g)
+    table: VertexTable = VertexTable()
+    edge_table: Counter[EdgeMembers] = counter()
+    for edge_string, multiplicity in counter(expression.split(',')).items():
+        members: EdgeMembers = tuple(sorted(
+            map(table.intern, cast(Iterable[Vertex], edge_string))))
+        edge_table[members] += multiplicity
+    return CompiledGraph(table.labels, dict(edge_table), expression)
+
+
+def labelled_graph(expression: Union[str, Iterable[Iterable[Hashable]]]) \
+    -> CompiledGraph:
+    """Construct a compiled graph whose vertices have arbitrary labels.
+
+    The graph is given either as a sequence of edges, each a sequence of
+    hashable labels, or as a string of edges separated by commas, with the
+    labels in each edge separated by whitespace (like 'v1 v2,v2 v3').
+    Labels are interned into dense integer ids, so graphs can have any number
+    of vertices.
+    Otherwise, the same axioms hold as for `graph`.
+    """
+    edge_iter: Iterable[Iterable[Hashable]]
+    if isinstance(expression, str):
+        edge_iter = (edge_string.split() for edge_string
+                     in expression.split(','))
+    else:
+        edge_iter = expression
+
+    table: VertexTable = VertexTable()
+    edge_table: Counter[EdgeMembers] = counter()
+    for edge_labels in edge_iter:
+        members: EdgeMembers
+        members = tuple(sorted(table.intern(label(x)) for x in edge_labels))
+        assert members, 'Empty edges not allowed.'
+        edge_table[members] += 1
+    return CompiledGraph(table.labels, dict(edge_table))
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+
+"""Subgraph search for many patterns at once.
+
+A PatternSet compiles its patterns into a trie of search steps. A step maps
+one more pattern vertex, and is described by the earlier steps whose
+vertices are adjacent to it and by the edges (with multiplicity) that become
+fully mapped once it is, both written in terms of step numbers. Each pattern
+is a path from the root of the trie, one step per vertex, so patterns
+sharing a sub-pattern, mapped in the same order, share the steps mapping it.
+Patterns are inserted one at a time, following existing steps for as long as
+some unmapped vertex fits one, and otherwise mapping vertices as `matching`
+does: most already-mapped neighbours first, then highest degree. Remaining
+ties are broken by canonical labels (see `canonical`), so isomorphic
+patterns follow the same path.
+A host is searched by one backtracking traversal of the trie (in the style
+of `matching`), so that the work of each shared step is done once for all
+the patterns below it. Host vertices are pruned on the smallest signature
+(see `matching.vertex_signatures`) of the pattern vertices mapped at a
+step, and branches are abandoned once every pattern below them has found as
+many matches as asked for.
+"""
+
+from collections import Counter as counter
+from typing import (Dict, FrozenSet, Iterable, Iterator, List, NamedTuple,
+                    Optional, Tuple)
+
+from .canonical import canonical_labelling
+from .invariants import admissible
+from .matching import (Budget, CancellationToken, Signature, checkpoint,
+                       is_dominated, neighbourhoods, vertex_signatures)
+from .morphisms import Morphism, embedding_to_morphism, empty_morphism
+from .objects import (AnyGraph, CompiledGraph, EdgeMembers, VertexId,
+                      compiled_graph)
+
+# Define new types and type aliases.
+Step = Tuple[Tuple[int, ...], Tuple[Tuple[Tuple[int, ...], int], ...]]
+
+
+class Match(NamedTuple):
+    """A morphism under which the pattern at position `pattern` of a
+    PatternSet is a subgraph of the host."""
+    pattern: int
+    morphism: Morphism
+
+
+class _Node:
+    """A step of the trie, with the steps following it and the patterns
+    ending with it."""
+    __slots__ = ('index', 'step', 'signature', 'children', 'ends')
+
+    def __init__(self, index: int, step: Step, signature: Signature) -> None:
+        self.index: int = index
+        self.step: Step = step
+        self.signature: Signature = signature
+        self.children: Dict[Step, '_Node'] = {}
+        self.ends: List[int] = []
+
+
+class PatternSet:
+    """A collection of pattern graphs compiled into one trie of search
+    steps.
+
+    Patterns are numbered 0, 1, ... in order of insertion.
+    """
+    __slots__ = ('patterns', 'orders', 'paths', 'nodes')
+
+    patterns: List[CompiledGraph]
+    orders: List[Tuple[VertexId, ...]]
+    paths: List[Tuple[int, ...]]
+    nodes: List[_Node]
+
+    def __init__(self, patterns: Iterable[AnyGraph] = ()) -> None:
+        self.patterns = []
+        self.orders = []
+        self.paths = []
+        self.nodes = [_Node(0, ((), ()), counter())]
+        for g in patterns:
+            self.insert(g)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def __getitem__(self, index: int) -> CompiledGraph:
+        return self.patterns[index]
+
+    @property
+    def step_count(self) -> int:
+        """Return the number of steps in the trie, which is at most the total
+        number of pattern vertices."""
+        return len(self.nodes) - 1
+
+    def insert(self, g: AnyGraph) -> int:
+        """Add a pattern to the trie and return its position."""
+        g = compiled_graph(g)
+        signatures: List[Signature] = vertex_signatures(g)
+        neighbours: List[FrozenSet[VertexId]] = neighbourhoods(g)
+        labels: Dict[VertexId, int] = {
+            g.ids[vertex]: label
+            for vertex, label in canonical_labelling(g).items()}
+        incident: List[List[Tuple[EdgeMembers, int]]] = [
+            [] for _ in range(g.vertex_count)]
+        for members, multiplicity in zip(g.edge_members,
+                                         g.edge_multiplicities):
+            for v in set(members):
+                incident[v].append((members, multiplicity))
+
+        position: Dict[VertexId, int] = {}
+
+        def step(u: VertexId) -> Step:
+            # Describe the mapping of u once every vertex in 'position' is.
+            depth: int = len(position)
+            back: Tuple[int, ...] = tuple(sorted(
+                position[w] for w in neighbours[u] if w in position))
+            checks = tuple(sorted(
+                (tuple(sorted(position.get(x, depth) for x in members)),
+                 multiplicity)
+                for members, multiplicity in incident[u]
+                if all(x == u or x in position for x in members)))
+            return back, checks
+
+        node: _Node = self.nodes[0]
+        order: List[VertexId] = []
+        path: List[int] = [0]
+        while len(order) < g.vertex_count:
+            steps: Dict[VertexId, Step] = {u: step(u)
+                                           for u in range(g.vertex_count)
+                                           if u not in position}
+            ranked: List[VertexId] = sorted(
+                steps, key=lambda w: (-len(steps[w][0]),
+                                      -sum(signatures[w].values()),
+                                      labels[w]))
+            u: VertexId = next((w for w in ranked
+                                if steps[w] in node.children), ranked[0])
+            if steps[u] in node.children:
+                node = node.children[steps[u]]
+                node.signature = node.signature & signatures[u]
+            else:
+                child: _Node = _Node(len(self.nodes), steps[u],
+                                     counter(signatures[u]))
+                node.children[steps[u]] = child
+                self.nodes.append(child)
+                node = child
+            position[u] = len(order)
+            order.append(u)
+            path.append(node.index)
+
+        node.ends.append(len(self.patterns))
+        self.patterns.append(g)
+        self.orders.append(tuple(order))
+        self.paths.append(tuple(path))
+        return len(self.patterns) - 1
+
+    def matches(self, h: AnyGraph, limit: Optional[int] = 1,
+                budget: Optional[Budget] = None,
+                token: Optional[CancellationToken] = None) -> Iterator[Match]:
+        """Generate morphisms under which patterns are subgraphs of h, as
+        soon as they are found.
+
+        Generate up to 'limit' matches per pattern, or every embedding of
+        every pattern (as `morphisms.iter_embeddings` would) if 'limit' is
+        None.
+        If a budget is provided, then raise SearchTimeout once the search runs
+        past it, and if a cancellation token is provided, then raise
+        SearchCancelled once it is cancelled (see `matching.checkpoint`).
+        """
+        assert limit is None or limit > 0, 'Limits must be positive.'
+        h = compiled_graph(h)
+        budget = budget or Budget()
+        deadline: Optional[float] = budget.deadline()
+        wanted: List[int] = [(limit or 1) if admissible(g, h) else 0
+                             for g in self.patterns]
+        # Number of patterns below each step still wanting matches.
+        alive: List[int] = [0] * len(self.nodes)
+        for pattern, path in enumerate(self.paths):
+            if wanted[pattern]:
+                for index in path:
+                    alive[index] += 1
+
+        host_neighbours: List[FrozenSet[VertexId]] = neighbourhoods(h)
+        signatures_h: List[Signature] = vertex_signatures(h)
+        edge_table = h.edge_table
+        domains: Dict[int, Tuple[VertexId, ...]] = {}
+        domain_sets: Dict[int, FrozenSet[VertexId]] = {}
+        phi: List[VertexId] = []
+        used: List[bool] = [False] * h.vertex_count
+        nodes: int = 0
+        next_check: int = checkpoint(0, deadline, budget.nodes, token)
+
+        def candidates(node: _Node) -> Tuple[VertexId, ...]:
+            if node.index not in domains:
+                domains[node.index] = tuple(
+                    v for v in range(h.vertex_count)
+                    if is_dominated(node.signature, signatures_h[v]))
+                domain_sets[node.index] = frozenset(domains[node.index])
+            back: Tuple[int, ...] = node.step[0]
+            if back:
+                return tuple(sorted(host_neighbours[phi[back[0]]]
+                                    & domain_sets[node.index]))
+            return domains[node.index]
+
+        def visit(node: _Node) -> Iterator[Match]:
+            nonlocal nodes, next_check
+            back, checks = node.step
+            for v in candidates(node):
+                if not alive[node.index]:
+                    return
+                nodes += 1
+                if nodes == next_check:
+                    next_check = checkpoint(nodes, deadline, budget.nodes,
+                                            token)
+                if used[v]:
+                    continue
+                adjacent: FrozenSet[VertexId] = host_neighbours[v]
+                if not all(phi[d] in adjacent for d in back):
+                    continue
+                phi.append(v)
+                if all(edge_table.get(tuple(sorted([phi[d] for d in members])),
+                                      0) >= multiplicity
+                       for members, multiplicity in checks):
+                    used[v] = True
+                    for pattern in node.ends:
+                        if not wanted[pattern]:
+                            continue
+                        yield Match(pattern, self._morphism(pattern, phi, h))
+                        if limit is not None:
+                            wanted[pattern] -= 1
+                            if not wanted[pattern]:
+                                for index in self.paths[pattern]:
+                                    alive[index] -= 1
+                    for child in list(node.children.values()):
+                        if alive[child.index]:
+                            yield from visit(child)
+                    used[v] = False
+                phi.pop()
+
+        for child in list(self.nodes[0].children.values()):
+            if alive[child.index]:
+                yield from visit(child)
+
+    def subgraphs(self, h: AnyGraph, budget: Optional[Budget] = None,
+                  token: Optional[CancellationToken] = None) \
+        -> List[Morphism]:
+        """Return, for every pattern, a morphism under which it is a subgraph
+        of h, or an empty morphism if it is not (see `morphisms.subgraph`).
+
+        Optional arguments 'budget' and 'token' are as for `matches`.
+        """
+        results: List[Morphism] = [empty_morphism() for _ in self.patterns]
+        for pattern, morphism in self.matches(h, 1, budget, token):
+            results[pattern] = morphism
+        return results
+
+    def _morphism(self, pattern: int, phi: List[VertexId],
+                  h: CompiledGraph) -> Morphism:
+        """Translate the images of the steps of a pattern into a morphism on
+        vertices."""
+        g: CompiledGraph = self.patterns[pattern]
+        embedding: List[VertexId] = [-1] * g.vertex_count
+        for u, v in zip(self.orders[pattern], phi):
+            embedding[u] = v
+        return embedding_to_morphism(tuple(embedding), g, h)
+
+
+def subgraph_all(patterns: Iterable[AnyGraph], h: AnyGraph) \
+    -> List[Morphism]:
+    """Search for every pattern as a subgraph of h in one traversal (see
+    `PatternSet.subgraphs`)."""
+    return PatternSet(patterns).subgraphs(h)
@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+
+"""Persistent (structurally shared) graphs for many small edits.
+
+A PersistentGraph is never changed in place. Adding or removing an edge
+returns a new version in O(log n) time, which shares all but O(log n) of its
+structure with the old one, so earlier versions stay valid and cheap to keep.
+Edges, vertex degrees and histograms of edge shapes and degrees are kept in
+persistent maps (hash array mapped tries with path copying), and are updated
+along with an isomorphism-invariant hash rather than recomputed after every
+edit. Invariant hashes are the same in every process and run.
+"""
+
+import hashlib
+from typing import (Any, Dict, Generic, Hashable, Iterable, Iterator, List,
+                    Optional, Tuple, TypeVar)
+
+from .hashable_counter import frozencounter
+from .objects import (Vertex, Edge, Graph, EdgeMembers, AnyGraph,
+                      CompiledGraph, VertexTable, compiled_graph, label)
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+Shape = Tuple[int, ...]
+HASH_MODULUS: int = 1 << 64
+
+
+# Define persistent maps.
+BITS: int = 5  # Number of hash bits used at each level of a trie.
+WIDTH: int = 1 << BITS
+HASH_MASK: int = (1 << 64) - 1
+
+_Trie = Tuple[Any, ...]  # WIDTH slots, each None, a _Leaf or a _Trie.
+
+
+class _Leaf:
+    """The (key, value) pairs of all keys of a trie with one hash.
+
+    Leaves are never changed once built.
+    """
+    __slots__ = ('hash', 'bucket')
+
+    def __init__(self, hash_: int, bucket: Tuple[Tuple[Any, Any], ...]) \
+        -> None:
+        self.hash = hash_
+        self.bucket = bucket
+
+
+EMPTY_TRIE: _Trie = (None,) * WIDTH
+
+
+def _set(trie: _Trie, hash_: int, key: Any, value: Any, shift: int) \
+    -> Tuple[_Trie, bool]:
+    """Return a copy of a trie with a key set to a value, and whether the
+    key is new. Only the path to the key is copied."""
+    slot: int = (hash_ >> shift) & (WIDTH - 1)
+    child: Any = trie[slot]
+    added: bool = True
+    if child is None:
+        child = _Leaf(hash_, ((key, value),))
+    elif type(child) is tuple:
+        child, added = _set(child, hash_, key, value, shift + BITS)
+    elif child.hash == hash_:
+        bucket = tuple((k, v) for k, v in child.bucket if k != key)
+        added = len(bucket) == len(child.bucket)
+        child = _Leaf(hash_, bucket + ((key, value),))
+    else:
+        # Two hashes share this slot, so push the old leaf one level down.
+        pushed: List[Any] = list(EMPTY_TRIE)
+        pushed[(child.hash >> (shift + BITS)) & (WIDTH - 1)] = child
+        child, _ = _set(tuple(pushed), hash_, key, value, shift + BITS)
+    copy: List[Any] = list(trie)
+    copy[slot] = child
+    return tuple(copy), added
+
+
+def _delete(trie: _Trie, hash_: int, key: Any, shift: int) \
+    -> Optional[_Trie]:
+    """Return a copy of a trie without a key, or None if it is empty."""
+    slot: int = (hash_ >> shift) & (WIDTH - 1)
+    child: Any = trie[slot]
+    if child is None:
+        raise KeyError(key)
+    if type(child) is tuple:
+        child = _delete(child, hash_, key, shift + BITS)
+    elif child.hash == hash_:
+        bucket = tuple((k, v) for k, v in child.bucket if k != key)
+        if len(bucket) == len(child.bucket):
+            raise KeyError(key)
+        child = _Leaf(hash_, bucket) if bucket else None
+    else:
+        raise KeyError(key)
+    copy: List[Any] = list(trie)
+    copy[slot] = child
+    if child is None and not any(copy):
+        return None
+    return tuple(copy)
+
+
+def _leaves(trie: _Trie) -> Iterator[_Leaf]:
+    for child in trie:
+        if type(child) is tuple:
+            yield from _leaves(child)
+        elif child is not None:
+            yield child
+
+
+class PersistentMap(Generic[K, V]):
+    """An immutable mapping whose updates return new mappings in
+    O(log n) time, sharing structure with the original.
+
+    Keys are stored in a hash array mapped trie, which branches on 5 bits of
+    the hash of a key at each level, so an update copies only the few
+    32-slot nodes on the path to the key.
+    """
+    __slots__ = ('_root', '_size')
+
+    _root: _Trie
+    _size: int
+
+    def __init__(self, items: Iterable[Tuple[K, V]] = ()) -> None:
+        self._root = EMPTY_TRIE
+        self._size = 0
+        for key, value in items:
+            self._root, added = _set(self._root, hash(key) & HASH_MASK,
+                                     key, value, 0)
+            self._size += added
+
+    @classmethod
+    def _from_root(cls, root: Optional[_Trie], size: int) \
+        -> 'PersistentMap[K, V]':
+        new: PersistentMap[K, V] = cls.__new__(cls)
+        new._root = EMPTY_TRIE if root is None else root
+        new._size = size
+        return new
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        hash_: int = hash(key) & HASH_MASK
+        node: Any = self._root
+        shift: int = 0
+        while type(node) is tuple:
+            node = node[(hash_ >> shift) & (WIDTH - 1)]
+            shift += BITS
+        if node is not None and node.hash == hash_:
+            for k, v in node.bucket:
+                if k == key:
+                    return v
+        return default
+
+    def __getitem__(self, key: K) -> V:
+        value: Optional[V] = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value  # type: ignore
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING  # type: ignore
+
+    def set(self, key: K, value: V) -> 'PersistentMap[K, V]':
+        """Return a new mapping with a key set to a value."""
+        root: _Trie
+        added: bool
+        root, added = _set(self._root, hash(key) & HASH_MASK, key, value, 0)
+        return self._from_root(root, self._size + added)
+
+    def delete(self, key: K) -> 'PersistentMap[K, V]':
+        """Return a new mapping without a key, which must be present."""
+        return self._from_root(
+            _delete(self._root, hash(key) & HASH_MASK, key, 0),
+            self._size - 1)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def items(self) -> Iterator[Tuple[K, V]]:
+        """Generate all (key, value) pairs, in no particular order."""
+        for leaf in _leaves(self._root):
+            yield from leaf.bucket
+
+    def __iter__(self) -> Iterator[K]:
+        return (key for key, _ in self.items())
+
+    def __repr__(self) -> str:
+        return f'PersistentMap({dict(self.items())!r})'
+
+
+_MISSING: Any = object()
+
+
+# Define persistent graphs.
+def _shape(e: Edge) -> Shape:
+    """Return the sorted numbers of times each vertex occurs in an edge."""
+    return tuple(sorted(e.values()))
+
+
+def _term(kind: str, value: Any) -> int:
+    """Return the contribution of one edge or vertex to an invariant hash.
+
+    Terms are digests of the repr of (kind, value), rather than built-in
+    hashes, so that they do not depend on the process computing them.
+    """
+    return int.from_bytes(hashlib.blake2b(repr((kind, value)).encode(),
+                                          digest_size=8).digest(), 'little')
+
+
+class PersistentGraph:
+    """A looped-multi-hyper-graph with O(log n) edits.
+
+    Edges are frozencounters of vertex labels, as returned by
+    `objects.edges`. Unlike graph strings, a persistent graph may be empty.
+    """
+    __slots__ = ('edge_multiplicities', 'degrees', 'shape_counts',
+                 'degree_counts', 'multiplicity', 'invariant_hash',
+                 '_compiled')
+
+    edge_multiplicities: PersistentMap[Edge, int]
+    degrees: PersistentMap[Vertex, int]
+    shape_counts: PersistentMap[Shape, int]
+    degree_counts: PersistentMap[int, int]
+    multiplicity: int
+    invariant_hash: int
+    _compiled: Optional[CompiledGraph]
+
+    def __init__(self) -> None:
+        self.edge_multiplicities = PersistentMap()
+        self.degrees = PersistentMap()
+        self.shape_counts = PersistentMap()
+        self.degree_counts = PersistentMap()
+        self.multiplicity = 0
+        self.invariant_hash = 0
+        self._compiled = None
+
+    def _copy(self) -> 'PersistentGraph':
+        new: PersistentGraph = PersistentGraph.__new__(PersistentGraph)
+        new.edge_multiplicities = self.edge_multiplicities
+        new.degrees = self.degrees
+        new.shape_counts = self.shape_counts
+        new.degree_counts = self.degree_counts
+        new.multiplicity = self.multiplicity
+        new.invariant_hash = self.invariant_hash
+        new._compiled = None
+        return new
+
+    def _change(self, e: Edge, change: int) -> 'PersistentGraph':
+        """Return a new version with the multiplicity of an edge changed."""
+        new: PersistentGraph = self._copy()
+        old_multiplicity: int = self.edge_multiplicities.get(e, 0) or 0
+        multiplicity: int = old_multiplicity + change
+        assert multiplicity >= 0, 'Edge is not in the graph.'
+        new.edge_multiplicities = (
+            self.edge_multiplicities.set(e, multiplicity) if multiplicity
+            else self.edge_multiplicities.delete(e))
+        new.multiplicity += change
+
+        shape: Shape = _shape(e)
+        new.shape_counts = _add(self.shape_counts, shape, change)
+        hash_: int = new.invariant_hash + change * _term('edge', shape)
+
+        for v in e:
+            degree: int = self.degrees.get(v, 0) or 0
+            hash_ -= _term('vertex', degree) if degree else 0
+            new.degree_counts = _add(new.degree_counts, degree, -1)
+            degree += change
+            hash_ += _term('vertex', degree) if degree else 0
+            new.degree_counts = _add(new.degree_counts, degree, 1)
+            new.degrees = (new.degrees.set(v, degree) if degree
+                           else new.degrees.delete(v))
+        new.invariant_hash = hash_ % HASH_MODULUS
+        return new
+
+    def add_edge(self, e: Iterable[Hashable], multiplicity: int = 1) \
+        -> 'PersistentGraph':
+        """Return a new version with an edge added.
+
+        The edge is given by its vertex labels, so 'ab' and ('v1', 'v2') are
+        both edges.
+        """
+        assert multiplicity > 0, 'Multiplicities must be positive.'
+        return self._change(_edge(e), multiplicity)
+
+    def remove_edge(self, e: Iterable[Hashable], multiplicity: int = 1) \
+        -> 'PersistentGraph':
+        """Return a new version with an edge removed.
+
+        Vertices that are left without edges are removed too.
+        """
+        assert multiplicity > 0, 'Multiplicities must be positive.'
+        return self._change(_edge(e), -multiplicity)
+
+    def edge_multiplicity(self, e: Iterable[Hashable]) -> int:
+        """Return the multiplicity of an edge (0 if it is absent)."""
+        return self.edge_multiplicities.get(_edge(e), 0) or 0
+
+    def edges(self) -> Dict[Edge, int]:
+        """Return the edges with their multiplicities."""
+        return dict(self.edge_multiplicities.items())
+
+    def vertices(self) -> Iterator[Vertex]:
+        """Generate the vertices."""
+        return iter(self.degrees)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.degrees)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_multiplicities)
+
+    def degree_sequence(self) -> Tuple[int, ...]:
+        """Return the degrees of all vertices in decreasing order (see
+        `invariants.degree_sequence`)."""
+        return tuple(degree for degree, count in sorted(
+            self.degree_counts.items(), reverse=True) for _ in range(count))
+
+    def compiled(self) -> CompiledGraph:
+        """Return the (memoised) compiled graph of this version."""
+        if self._compiled is None:
+            table: VertexTable = VertexTable()
+            edge_table: Dict[EdgeMembers, int] = {}
+            for e, multiplicity in self.edge_multiplicities.items():
+                edge_table[tuple(sorted(map(table.intern, e.elements())))] \
+                    = multiplicity
+            self._compiled = CompiledGraph(table.labels, edge_table)
+        return self._compiled
+
+    @property
+    def graph(self) -> Graph:
+        """Return the graph string.
+
+        Raise ValueError if the graph is empty, since graph strings have at
+        least one edge, or if some label is not a single character (see
+        `objects.CompiledGraph.graph`).
+        """
+        if not self.edge_count:
+            raise ValueError('Empty graph has no graph string.')
+        return self.compiled().graph
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PersistentGraph):
+            return (self.invariant_hash == other.invariant_hash
+                    and self.edges() == other.edges())
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return self.invariant_hash
+
+    def __repr__(self) -> str:
+        if not self.edge_count:
+            return 'persistent_graph()'
+        return f'persistent_graph({self.compiled()!r})'
+
+
+def _edge(e: Iterable[Hashable]) -> Edge:
+    """Check the edge axioms on vertex labels and build the edge."""
+    labels: List[Vertex] = [label(x) for x in e]
+    assert labels, 'Empty edges not allowed.'
+    return Edge(frozencounter(labels))
+
+
+def _add(counts: PersistentMap[K, int], key: K, change: int) \
+    -> PersistentMap[K, int]:
+    """Add to a count in a persistent map of positive counts of keys, where
+    a key of 0 is never counted."""
+    if not key:
+        return counts
+    count: int = (counts.get(key, 0) or 0) + change
+    return counts.set(key, count) if count else counts.delete(key)
+
+
+def persistent_graph(g: Optional[AnyGraph] = None) -> PersistentGraph:
+    """Convert a graph (or compiled graph) to a persistent graph.
+
+    If no graph is provided, then return the empty persistent graph.
+    """
+    new: PersistentGraph = PersistentGraph()
+    if g is None:
+        return new
+    g = compiled_graph(g)
+    for members, multiplicity in zip(g.edge_members, g.edge_multiplicities):
+        new = new.add_edge([g.labels[v] for v in members], multiplicity)
+    return new
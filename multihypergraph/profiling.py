@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+"""Opt-in instrumentation of graph searches.
+
+While profiling is on, every call to `morphisms.subgraph`,
+`morphisms.isomorphism` or `morphisms.is_isomorphic` records a CallStats
+holding --
+1. counters of the work done by the search. The matcher (see `matching`)
+   counts the search nodes visited, the candidate images generated, those
+   pruned before the edge check (already used, ordering conditions,
+   adjacency), those fully checked against the edges of the host, those that
+   extended the map, and the embeddings found. The canonical search (see
+   `canonical`) counts its tree nodes, leaves and automorphisms found.
+2. the time spent in each phase of the call, in seconds,
+3. the peak search depth, i.e. the largest number of vertices mapped or
+   individualised at once,
+4. the total time of the call.
+Once a call returns, its CallStats is handed to every listener. Listeners are
+registered with `add_listener` or, for the duration of a block, with the
+`profiled` context manager, which also collects the CallStats of the block.
+Calls answered from the cache (see `cache`) are not recorded.
+Profiling is off by default, in which case instrumented calls skip all
+bookkeeping.
+"""
+
+import contextlib
+import time
+from collections import Counter as counter
+from typing import Callable, Counter, Dict, Iterator, List, Optional
+
+
+class CallStats:
+    """What one instrumented call did."""
+    __slots__ = ('name', 'counters', 'phases', 'peak_depth', 'seconds',
+                 '_start', '_lap')
+
+    name: str
+    counters: Counter[str]
+    phases: Dict[str, float]
+    peak_depth: int
+    seconds: float
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counters = counter()
+        self.phases = {}
+        self.peak_depth = 0
+        self.seconds = 0.0
+        self._start: float = time.perf_counter()
+        self._lap: float = self._start
+
+    def lap(self, phase: str) -> None:
+        """Charge the time since the previous lap (or the start of the call)
+        to a phase."""
+        now: float = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._lap
+        self._lap = now
+
+    def reach(self, depth: int) -> None:
+        """Record a search depth."""
+        self.peak_depth = max(self.peak_depth, depth)
+
+    def __repr__(self) -> str:
+        return (f'CallStats({self.name!r}, seconds={self.seconds:.6f}, '
+                f'phases={self.phases!r}, counters={dict(self.counters)!r}, '
+                f'peak_depth={self.peak_depth})')
+
+
+Listener = Callable[[CallStats], None]
+
+_listeners: List[Listener] = []
+
+
+# Define hooks for instrumented functions.
+def start(name: str) -> Optional[CallStats]:
+    """Return a new CallStats for a call, or None if profiling is off."""
+    return CallStats(name) if _listeners else None
+
+
+def finish(stats: CallStats) -> None:
+    """Close the last phase of a call and hand its CallStats to every
+    listener."""
+    stats.seconds = time.perf_counter() - stats._start
+    for listener in list(_listeners):
+        listener(stats)
+
+
+# Define the public interface.
+def add_listener(listener: Listener) -> None:
+    """Call a function with the CallStats of every instrumented call, and
+    switch profiling on."""
+    _listeners.append(listener)
+
+
+def remove_listener(listener: Listener) -> None:
+    """Stop calling a listener. Profiling switches off with the last one."""
+    _listeners.remove(listener)
+
+
+def enabled() -> bool:
+    """Check if profiling is on."""
+    return bool(_listeners)
+
+
+@contextlib.contextmanager
+def profiled(listener: Optional[Listener] = None) \
+    -> Iterator[List[CallStats]]:
+    """Switch profiling on within a block, and collect the CallStats of
+    every instrumented call made in the block into the list returned.
+
+    If 'listener' is provided, then it is also called with each CallStats as
+    soon as its call returns.
+    """
+    collected: List[CallStats] = []
+
+    def collect(stats: CallStats) -> None:
+        collected.append(stats)
+        if listener is not None:
+            listener(stats)
+
+    add_listener(collect)
+    try:
+        yield collected
+    finally:
+        remove_listener(collect)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+
+"""A binary, memory-mapped file format for catalogues of graphs.
+
+A store holds many graphs in flat columns, so that opening it only maps the
+file into memory and reading a graph copies nothing --
+1. a pool of vertex labels, as UTF-8 strings with their byte offsets,
+2. the vertex table of every graph, as ids into the pool,
+3. the edges of every graph, as offsets into an array of edge members (the
+   vertex ids of each edge, sorted, as in `objects.CompiledGraph`),
+4. the edge-multiplicity of every edge.
+All integers are little-endian. Every column starts at a multiple of 8
+bytes, and the file starts with a header giving the position of each column.
+Worker processes opening the same file share its pages through the operating
+system, and stores are pickled by path, so they can be handed to a process
+pool cheaply.
+Only graphs with string vertex labels can be stored.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import (Any, Dict, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+
+from .objects import (Vertex, Graph, AnyGraph, CompiledGraph, EdgeMembers,
+                      compiled_graph)
+
+# Define the layout.
+MAGIC: bytes = b'MHGSTOR1'
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('label offsets', 'Q'),
+    ('label bytes', 'B'),
+    ('vertex labels', 'I'),
+    ('vertex offsets', 'Q'),
+    ('edge offsets', 'Q'),
+    ('member offsets', 'Q'),
+    ('members', 'I'),
+    ('multiplicities', 'I'),
+)
+HEADER: struct.Struct = struct.Struct('<8sQQ' + 'QQ' * len(COLUMNS))
+ALIGNMENT: int = 8
+
+PathLike = Union[str, 'os.PathLike[str]']
+
+
+def _typecode(fmt: str) -> str:
+    """Return an array typecode with exactly the size of a column format."""
+    size: int = struct.calcsize(fmt)
+    return next(code for code in ('B', 'H', 'I', 'L', 'Q')
+                if array(code).itemsize == size)
+
+
+# Define the writer.
+class StoreWriter:
+    """Write graphs one at a time to a new store.
+
+    Columns are accumulated in compact arrays and written out on `close`.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = path
+        self.label_ids: Dict[str, int] = {}
+        self.columns: Dict[str, array] = {
+            name: array(_typecode(fmt)) for name, fmt in COLUMNS}
+        self.label_data: bytearray = bytearray()
+        self.columns['label offsets'].append(0)
+        self.columns['vertex offsets'].append(0)
+        self.columns['edge offsets'].append(0)
+        self.columns['member offsets'].append(0)
+        self.count: int = 0
+        self.closed: bool = False
+
+    def add(self, g: AnyGraph) -> int:
+        """Append a graph to the store and return its index."""
+        assert not self.closed, 'Store is already written.'
+        g = compiled_graph(g)
+        for label_ in g.labels:
+            assert isinstance(label_, str), 'Stored labels must be strings.'
+            id_: Optional[int] = self.label_ids.get(label_)
+            if id_ is None:
+                id_ = self.label_ids[label_] = len(self.label_ids)
+                self.label_data += label_.encode('utf-8')
+                self.columns['label offsets'].append(len(self.label_data))
+            self.columns['vertex labels'].append(id_)
+        members: array = self.columns['members']
+        member_offsets: array = self.columns['member offsets']
+        for edge_members in g.edge_members:
+            members.extend(edge_members)
+            member_offsets.append(len(members))
+        self.columns['multiplicities'].extend(g.edge_multiplicities)
+        self.columns['vertex offsets'].append(
+            len(self.columns['vertex labels']))
+        self.columns['edge offsets'].append(len(member_offsets) - 1)
+        self.count += 1
+        return self.count - 1
+
+    def close(self) -> None:
+        """Write the header and all columns to the file."""
+        if self.closed:
+            return
+        self.closed = True
+        self.columns['label bytes'] = array('B', self.label_data)
+        blobs: List[bytes] = []
+        positions: List[int] = []
+        position: int = HEADER.size
+        for name, _ in COLUMNS:
+            column: array = self.columns[name]
+            if sys.byteorder != 'little':  # pragma: no cover
+                column.byteswap()
+            position += -position % ALIGNMENT
+            positions += [position, len(column)]
+            blobs.append(column.tobytes())
+            position += len(blobs[-1])
+
+        with open(self.path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, self.count, len(self.label_ids),
+                                   *positions))
+            for blob, start in zip(blobs, positions[::2]):
+                file.write(b'\0' * (start - file.tell()))
+                file.write(blob)
+
+    def __enter__(self) -> 'StoreWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def write_store(path: PathLike, graphs: Iterable[AnyGraph]) -> int:
+    """Write graphs to a new store and return how many were written."""
+    with StoreWriter(path) as writer:
+        for g in graphs:
+            writer.add(g)
+    return writer.count
+
+
+# Define the reader.
+class GraphStore:
+    """A read-only store of graphs, memory-mapped from a file.
+
+    Indexing a store returns a GraphView of one graph.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer: memoryview = memoryview(self._mmap)
+        header: Tuple[Any, ...] = HEADER.unpack_from(buffer)
+        if header[0] != MAGIC or sys.byteorder != 'little':
+            buffer.release()
+            self.close()
+            raise ValueError(f'{path} is not a graph store, or was written '
+                             'with a different byte order.')
+        self.count: int = header[1]
+        self.label_count: int = header[2]
+        self.columns: Dict[str, memoryview] = {}
+        for (name, fmt), start, length in zip(COLUMNS, header[3::2],
+                                              header[4::2]):
+            end: int = start + length * struct.calcsize(fmt)
+            self.columns[name] = buffer[start:end].cast(  # type: ignore
+                _typecode(fmt))
+        buffer.release()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> 'GraphView':
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('Graph index out of range.')
+        return GraphView(self, index)
+
+    def __iter__(self) -> Iterator['GraphView']:
+        return (GraphView(self, index) for index in range(self.count))
+
+    def label(self, id_: int) -> Vertex:
+        """Decode one label of the label pool."""
+        offsets: memoryview = self.columns['label offsets']
+        return Vertex(str(self.columns['label bytes']
+                          [offsets[id_]:offsets[id_ + 1]], 'utf-8'))
+
+    def close(self) -> None:
+        """Release the store's views of the file and unmap it.
+
+        Graph views taken from the store must not be used afterwards. If
+        some are still alive, then the file stays mapped until they are gone.
+        """
+        for column in getattr(self, 'columns', {}).values():
+            column.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+
+    def __enter__(self) -> 'GraphStore':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __reduce__(self) -> Tuple[type, Tuple[PathLike]]:
+        return (GraphStore, (self.path,))
+
+    def __repr__(self) -> str:
+        return f'GraphStore({self.path!r})'
+
+
+class GraphView:
+    """A graph inside a store, read directly from the mapped file.
+
+    `members`, `member_offsets` and `edge_multiplicities` are memoryviews
+    into the file. Edge i has vertex ids
+    `members[member_offsets[i]:member_offsets[i + 1]]`.
+    """
+    __slots__ = ('store', 'index', 'vertex_count', 'edge_count',
+                 'vertex_labels', 'member_offsets', 'members',
+                 'edge_multiplicities')
+
+    store: GraphStore
+    index: int
+    vertex_count: int
+    edge_count: int
+    vertex_labels: memoryview
+    member_offsets: memoryview
+    members: memoryview
+    edge_multiplicities: memoryview
+
+    def __init__(self, store: GraphStore, index: int) -> None:
+        columns: Dict[str, memoryview] = store.columns
+        vertex_offsets: memoryview = columns['vertex offsets']
+        edge_offsets: memoryview = columns['edge offsets']
+        first_vertex: int = vertex_offsets[index]
+        first_edge: int = edge_offsets[index]
+        last_edge: int = edge_offsets[index + 1]
+        self.store = store
+        self.index = index
+        self.vertex_labels = \
+            columns['vertex labels'][first_vertex:vertex_offsets[index + 1]]
+        self.vertex_count = len(self.vertex_labels)
+        self.edge_count = last_edge - first_edge
+        self.member_offsets = columns['member offsets'][first_edge:
+                                                        last_edge + 1]
+        self.members = columns['members']
+        self.edge_multiplicities = \
+            columns['multiplicities'][first_edge:last_edge]
+
+    @property
+    def labels(self) -> Tuple[Vertex, ...]:
+        """Return the vertex labels, in order of vertex id."""
+        return tuple(map(self.store.label, self.vertex_labels))
+
+    def edge(self, i: int) -> EdgeMembers:
+        """Return the vertex ids of edge i."""
+        return tuple(self.members[self.member_offsets[i]:
+                                  self.member_offsets[i + 1]])
+
+    @property
+    def edge_members(self) -> Tuple[EdgeMembers, ...]:
+        """Return the vertex ids of every edge."""
+        return tuple(map(self.edge, range(self.edge_count)))
+
+    def to_compiled(self) -> CompiledGraph:
+        """Copy the graph into a compiled graph."""
+        return CompiledGraph(self.labels, dict(zip(
+            self.edge_members, self.edge_multiplicities)))
+
+    def to_graph(self) -> Graph:
+        """Copy the graph into a graph string.
+
+        Raise ValueError if the graph is labelled and has none (see
+        `objects.CompiledGraph.graph`).
+        """
+        return self.to_compiled().graph
+
+    def __repr__(self) -> str:
+        return f'<GraphView {self.index} of {self.store!r}>'
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""Symmetry breaking for embedding searches.
+
+Two embeddings of a pattern g into a host are equivalent if they differ by
+an automorphism of g, so every class of equivalent embeddings has exactly
+|Aut(g)| members. Searches only need to visit one embedding per class.
+Following Grochow and Kellis, the classes are told apart by ordering
+conditions on the images of pattern vertices, built from a stabiliser chain
+of Aut(g) --
+1. Pick a vertex a with a non-trivial orbit under the automorphisms fixing
+   all previously picked vertices.
+2. Require image(a) < image(b) for every other vertex b of that orbit.
+3. Fix a and repeat until only the identity fixes every picked vertex.
+Exactly one embedding of every class satisfies all conditions, and |Aut(g)|
+is the product of the sizes of the orbits picked along the way.
+Orbits are found by searching for automorphisms of g that fix the picked
+vertices and move a to each candidate b, where candidates are limited to the
+colour class of a after colour refinement (see `canonical`). Every
+automorphism found merges the orbits of all vertices it moves, which saves
+most of these searches.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .canonical import Colouring, _incidences, individualise, refine
+from .matching import (CancellationToken, Condition, Embedding,
+                       first_embedding)
+from .objects import AnyGraph, CompiledGraph, VertexId, compiled_graph
+
+
+class Symmetry(NamedTuple):
+    """Ordering conditions that break the symmetries of a pattern, along
+    with its number of automorphisms."""
+    conditions: Tuple[Condition, ...]
+    automorphism_count: int
+
+
+def _orbit(g: CompiledGraph, v: VertexId, candidates: List[VertexId],
+           fixed: Tuple[VertexId, ...], deadline: Optional[float] = None,
+           token: Optional[CancellationToken] = None) -> List[VertexId]:
+    """Return the orbit of a vertex under the automorphisms of g fixing some
+    vertices, given a superset of it."""
+    parent: Dict[VertexId, VertexId] = {u: u for u in candidates}
+
+    def find(x: VertexId) -> VertexId:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    pins: Dict[VertexId, Tuple[VertexId, ...]] = {w: (w,) for w in fixed}
+    for u in candidates:
+        if find(u) == find(v):
+            continue
+        gamma: Optional[Embedding] = first_embedding(
+            g, g, deadline, restrictions={**pins, v: (u,)}, token=token)
+        if gamma is None:
+            continue
+        for x, y in enumerate(gamma):
+            if x in parent and y in parent:
+                parent[find(x)] = find(y)
+    root: VertexId = find(v)
+    return [u for u in candidates if find(u) == root]
+
+
+def symmetry(g: AnyGraph, deadline: Optional[float] = None,
+             token: Optional[CancellationToken] = None) -> Symmetry:
+    """Return the (memoised) symmetry-breaking conditions of a graph.
+
+    Optional arguments 'deadline' and 'token' are as for
+    `matching.embeddings`.
+    """
+    g = compiled_graph(g)
+    if 'symmetry' in g.cache:
+        return g.cache['symmetry']
+
+    incidences = _incidences(g)
+    colouring: Colouring = refine(g, [0] * g.vertex_count, incidences)
+    fixed: Tuple[VertexId, ...] = ()
+    conditions: List[Condition] = []
+    automorphism_count: int = 1
+    while True:
+        cells: Dict[int, List[VertexId]] = {}
+        for u, colour in enumerate(colouring):
+            cells.setdefault(colour, []).append(u)
+        cell: Optional[List[VertexId]]
+        cell = max((cell for cell in cells.values() if len(cell) > 1),
+                   key=len, default=None)
+        if cell is None:
+            break
+        v: VertexId = cell[0]
+        orbit: List[VertexId] = _orbit(g, v, cell, fixed, deadline, token)
+        conditions.extend((v, u) for u in orbit if u != v)
+        automorphism_count *= len(orbit)
+        fixed += (v,)
+        colouring = refine(g, individualise(colouring, v), incidences)
+
+    g.cache['symmetry'] = Symmetry(tuple(conditions), automorphism_count)
+    return g.cache['symmetry']
+
+
+def automorphism_count(g: AnyGraph) -> int:
+    """Return the number of automorphisms of a graph."""
+    return symmetry(g).automorphism_count
@@ -13,6 +13,10 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/vaibhavkarve/multihypergraph",
     packages=setuptools.find_packages(),
+    extras_require={
+        "numpy": ["numpy"],
+        "scipy": ["numpy", "scipy"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: GNU General Public License v3 (GPLv3)",
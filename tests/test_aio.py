@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+import asyncio
+import time
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import aio as G
+from multihypergraph.canonical import canonical_vertex
+from multihypergraph.matching import Budget, SearchTimeout
+from multihypergraph.morphisms import is_morphism, iter_embeddings
+from multihypergraph.objects import compiled_graph
+
+
+def odd_cycle_and_grid():
+    """Return an odd cycle and a grid, which contains no odd cycles but many
+    long paths, so that the search takes long."""
+    cycle = ','.join(canonical_vertex(i) + canonical_vertex((i + 1) % 15)
+                     for i in range(15))
+    grid = ','.join(
+        [canonical_vertex(12 * i + j) + canonical_vertex(12 * i + j + 1)
+         for i in range(12) for j in range(11)]
+        + [canonical_vertex(12 * i + j) + canonical_vertex(12 * i + j + 12)
+           for i in range(11) for j in range(12)])
+    return cycle, grid
+
+
+def test_asubgraph_and_aisomorphism():
+    async def main():
+        m = await G.asubgraph('ab,bc', 'xy,yz,zx')
+        assert is_morphism(m, 'ab,bc', 'xy,yz,zx')
+        assert await G.asubgraph('abc', 'xy,yz,zx') == {}
+        assert await G.aisomorphism('ab,bc', 'yz,xy') in [
+            {'a': 'x', 'b': 'y', 'c': 'z'}, {'a': 'z', 'b': 'y', 'c': 'x'}]
+    asyncio.run(main())
+
+
+def test_identical_requests_are_merged():
+    async def main():
+        async with G.MorphismService(workers=1) as service:
+            results = await asyncio.gather(*[
+                service.subgraph('ab,bc', h)
+                for h in ['xy,yz,zx'] * 5 + ['yz,zx,xy']])
+            # Requests are compared as written, so the last one (the same
+            # graph with its edges in another order) is not merged.
+            assert service.merged == 4
+            assert all(m == results[0] for m in results[:5])
+            results[0]['a'] = 'changed'
+            assert results[1]['a'] != 'changed'
+    asyncio.run(main())
+
+
+def test_request_keys_do_not_parse_graphs():
+    # An invalid graph string only fails once it is searched, in a worker.
+    assert G._request_key('subgraph', 'ab,,', 'xy', None) \
+        == ('subgraph', 'ab,,', 'xy', None)
+    assert G._request_key('subgraph', compiled_graph('ab'), 'xy',
+                          None) is None
+
+
+def test_budget():
+    async def main():
+        async with G.MorphismService() as service:
+            with pytest.raises(SearchTimeout):
+                await service.subgraph(*odd_cycle_and_grid(),
+                                       budget=Budget(nodes=1000))
+    asyncio.run(main())
+
+
+def test_cancellation_stops_the_search():
+    async def main():
+        service = G.MorphismService(workers=1, max_pending=1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(service.subgraph(*odd_cycle_and_grid()),
+                                   0.1)
+        # The slot is freed once the search notices the cancellation.
+        start = time.monotonic()
+        assert await service.subgraph('ab', 'ab') == {'a': 'a', 'b': 'b'}
+        assert time.monotonic() - start < 1
+        await service.close()
+    asyncio.run(main())
+
+
+def test_aiter_embeddings():
+    async def main():
+        morphisms = [m async for m in G.aiter_embeddings('ab,bc',
+                                                         'wx,xy,yz,zw,wy',
+                                                         buffer=1)]
+        assert morphisms == list(iter_embeddings('ab,bc', 'wx,xy,yz,zw,wy'))
+    asyncio.run(main())
+
+
+def test_closing_an_enumeration_early():
+    async def main():
+        async with G.MorphismService(workers=1, max_pending=1) as service:
+            _, grid = odd_cycle_and_grid()
+            embeddings = service.iter_embeddings('ab,bc', grid, buffer=2)
+            async for _ in embeddings:
+                break
+            await embeddings.aclose()
+            assert await service.subgraph('ab', 'ab') == {'a': 'a', 'b': 'b'}
+    asyncio.run(asyncio.wait_for(main(), 5))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import time
+
+from .context import multihypergraph
+from multihypergraph import batch as G
+from multihypergraph.objects import compiled_graph, edges
+from multihypergraph.morphisms import translate_graph
+import pytest
+
+
+PATTERNS = ['ab', 'ab,bc', 'ab,bc,ca', 'aa']
+HOSTS = ['xy,yz', 'xy,yz,zx', 'xx,xy']
+
+
+def contained(results):
+    return {(r.pattern, r.host) for r in results if r.morphism}
+
+
+def test_encoding_round_trip():
+    g = compiled_graph('xyx,xy,yz,xy')
+    assert G.decode(G.encode(g)) == g
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_subgraph_many(workers):
+    results = list(G.subgraph_many(PATTERNS, HOSTS, workers=workers,
+                                   chunksize=2))
+    assert len(results) == len(PATTERNS) * len(HOSTS)
+    assert contained(results) == {(0, 0), (0, 1), (0, 2), (1, 0), (1, 1),
+                                  (2, 1), (3, 2)}
+    assert not any(r.timed_out for r in results)
+
+
+def test_morphisms_are_subgraph_embeddings():
+    for r in G.subgraph_many(PATTERNS, HOSTS, workers=0):
+        if r.morphism:
+            image = edges(translate_graph(PATTERNS[r.pattern], r.morphism))
+            assert not image - edges(HOSTS[r.host])
+
+
+# A bipartite host has no odd cycles, but has many long paths.
+BIPARTITE = ','.join(x + y for x in 'abcdefgh' for y in 'ABCDEFGH')
+ODD_CYCLE = ','.join('abcdefghijklm'[i] + 'abcdefghijklm'[(i + 1) % 13]
+                     for i in range(13))
+
+
+def test_searches_time_out():
+    [result] = G.subgraph_many([ODD_CYCLE], [BIPARTITE], workers=0,
+                               timeout=0)
+    assert result.timed_out
+    assert result.morphism == {}
+
+
+def test_stopping_early_cancels_pending_chunks():
+    # Every chunk of 10 pairs times out after 0.5 seconds, and 8 chunks are
+    # in flight, so waiting for them all would take about 2 seconds.
+    results = G.subgraph_many([ODD_CYCLE] * 200, [BIPARTITE], workers=2,
+                              chunksize=10, timeout=0.05)
+    assert next(results).timed_out
+    start = time.perf_counter()
+    results.close()
+    assert time.perf_counter() - start < 1.6
+
+
+def test_symmetry_breaking_counts_against_the_timeout():
+    # A large clique has a huge automorphism group.
+    clique = compiled_graph(','.join(x + y for i, x in enumerate('abcdefghij')
+                                     for y in 'abcdefghij'[i + 1:]))
+    assert G.contains(clique, clique, timeout=0) == ({}, True)
+    # Symmetries are only memoised once they are all found.
+    assert 'symmetry' not in clique.cache
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import cache as G
+from multihypergraph.morphisms import is_isomorphic, isomorphism, subgraph
+from multihypergraph.objects import compiled_graph, edges, graph, vertices
+
+
+@pytest.fixture
+def caching():
+    G.enable(maxsize=4)
+    yield
+    G.disable()
+
+
+def test_disabled_by_default():
+    assert not G.enabled()
+    edges('ab,bc')
+    assert G.info()['edges'] == G.CacheInfo(0, 0, 0, 0, G.DEFAULT_MAXSIZE)
+
+
+def test_hits_and_misses(caching):
+    assert edges('ab,bc') is edges('ab,bc')
+    assert vertices('ab,bc') == {'a', 'b', 'c'}
+    assert graph('ab,bc') == 'ab,bc'
+    assert compiled_graph('ab') is compiled_graph('ab')
+    info = G.info()
+    assert info['edges'].hits >= 1
+    assert info['compiled_graph'] == G.CacheInfo(1, 1, 0, 1, 4)
+
+
+def test_evictions(caching):
+    for g in ['a', 'b', 'c', 'd', 'e']:
+        graph(g)
+    graph('a')
+    assert G.info()['graph'] == G.CacheInfo(0, 6, 2, 4, 4)
+
+
+def test_least_recently_used_is_evicted(caching):
+    for g in ['a', 'b', 'c', 'd', 'a', 'e']:
+        graph(g)
+    assert list(G.CACHES['graph'].entries) == ['c', 'd', 'a', 'e']
+
+
+def test_searches_keyed_on_edges(caching):
+    assert subgraph('ab', 'bc,cd') == {'a': 'b', 'b': 'c'}
+    assert subgraph('ba', 'dc,bc') == {'a': 'b', 'b': 'c'}
+    assert is_isomorphic('ab,bc', 'xy,yz')
+    assert is_isomorphic('cb,ba', compiled_graph('yz,xy'))
+    assert G.info()['subgraph'].hits == 1
+    assert G.info()['is_isomorphic'].hits == 1
+
+
+def test_results_are_copies(caching):
+    morphism = isomorphism('ab', 'xy')
+    morphism['a'] = 'z'
+    assert isomorphism('ab', 'xy') in ({'a': 'x', 'b': 'y'},
+                                       {'a': 'y', 'b': 'x'})
+
+
+def test_sizes_and_clear(caching):
+    G.enable(sizes={'graph': 1})
+    graph('a'), graph('b')
+    assert G.info()['graph'].size == 1
+    assert G.info()['edges'].maxsize == G.DEFAULT_MAXSIZE
+    G.clear()
+    assert G.info()['graph'] == G.CacheInfo(0, 0, 0, 0, 1)
+
+
+@pytest.mark.parametrize('enabled', [False, True])
+def test_keyword_arguments(enabled):
+    if enabled:
+        G.enable()
+    try:
+        assert graph(expression='ab') == 'ab'
+        assert edges(g='ab') == edges('ab')
+        assert vertices(g='ab') == {'a', 'b'}
+        assert compiled_graph(g='ab').vertex_count == 2
+        assert subgraph(g='ab', h='xy') == subgraph('ab', 'xy')
+        assert subgraph('ab', h='xy') == subgraph('ab', 'xy')
+        assert isomorphism(g='ab', h='xy') == isomorphism('ab', 'xy')
+        assert is_isomorphic(g='ab', h='xy')
+        with pytest.raises(TypeError):
+            graph(g='ab')
+    finally:
+        G.disable()
+
+
+def test_caches_are_shared_between_threads():
+    G.enable(maxsize=2)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    graphs = ['ab,bc', 'ab', 'abc', 'aab,bc', 'a,b']
+
+    def work(seed):
+        for i in range(2000):
+            g = graphs[(seed + i) % len(graphs)]
+            assert compiled_graph(graph(g)).edge_counter == edges(g)
+        return True
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert all(executor.map(work, range(8)))
+        info = G.info()['compiled_graph']
+        assert info.size <= info.maxsize and info.evictions
+    finally:
+        sys.setswitchinterval(interval)
+        G.disable()
+
+
+def test_lru_cache_counts_every_access_across_threads():
+    cache = G.LRUCache(maxsize=2)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def work(seed):
+        for i in range(5000):
+            key = (seed + i) % 5
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+    info = cache.info()
+    assert info.hits + info.misses == 8 * 5000
+    assert info.size == 2
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+from .context import multihypergraph
+from multihypergraph import canonical as G
+from multihypergraph.objects import compiled_graph, edges
+import pytest
+
+
+class TestCertificate(object):
+    def test_relabelled_graphs_have_equal_certificates(self):
+        assert G.certificate('ab,bc') == G.certificate('yz,xy')
+        assert G.certificate('aab,bc,bc') == G.certificate('zy,yxx,yz')
+
+    def test_compiled_graphs_have_the_same_certificates(self):
+        assert G.certificate(compiled_graph('ab,bc')) == G.certificate('ab,bc')
+
+    def test_multiplicity_changes_certificate(self):
+        assert G.certificate('ab,bc') != G.certificate('ab,ab,bc')
+        assert G.certificate('ab,ab,bc') != G.certificate('ab,bc,bc,bc')
+
+    def test_collapsed_edges_change_certificate(self):
+        assert G.certificate('aab') != G.certificate('abb,a')
+        assert G.certificate('aab') != G.certificate('abc')
+
+    def test_regular_graphs_are_told_apart(self):
+        hexagon = 'ab,bc,cd,de,ef,fa'
+        two_triangles = 'ab,bc,ca,de,ef,fd'
+        assert G.certificate(hexagon) != G.certificate(two_triangles)
+
+    def test_certificates_are_hashable(self):
+        assert len({G.certificate('ab'), G.certificate('xy'),
+                    G.certificate('xyz')}) == 2
+
+
+class TestCanonicalLabelling(object):
+    def test_labels_are_a_numbering_of_vertices(self):
+        labelling = G.canonical_labelling('ab,bc,cd')
+        assert sorted(labelling) == ['a', 'b', 'c', 'd']
+        assert sorted(labelling.values()) == [0, 1, 2, 3]
+
+    def test_endpoints_of_a_path_are_labelled_alike(self):
+        labelling = G.canonical_labelling('ab,bc')
+        assert labelling['b'] not in (labelling['a'], labelling['c'])
+
+
+class TestCanonicalForm(object):
+    def test_canonical_form_is_a_graph_isomorphic_to_the_input(self):
+        assert G.certificate(G.canonical_form('xy,yz,zz')) == \
+            G.certificate('xy,yz,zz')
+
+    def test_isomorphic_graphs_have_identical_canonical_forms(self):
+        assert G.canonical_form('ab,bc,cd,da') == G.canonical_form('xz,zy,yw,wx')
+        assert G.canonical_form('abc,ab') == G.canonical_form('qr,pqr')
+
+    def test_non_isomorphic_graphs_have_different_canonical_forms(self):
+        assert G.canonical_form('ab,bc') != G.canonical_form('ab,cd')
+
+    def test_symmetric_graphs(self):
+        vertices = [G.canonical_vertex(i) for i in range(20)]
+        matching = ','.join(vertices[2 * i] + vertices[2 * i + 1]
+                            for i in range(10))
+        shuffled = ','.join(vertices[i] + vertices[19 - i] for i in range(10))
+        assert G.canonical_form(matching) == G.canonical_form(shuffled)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import generators as G
+from multihypergraph.morphisms import is_isomorphic, is_morphism, subgraph
+from multihypergraph.objects import compiled_graph, graph
+
+
+def test_random_graph():
+    g = compiled_graph(G.random_graph(20, 30, arity=3, multiplicity=4,
+                                      seed=1))
+    assert g.edge_count <= 30 <= g.multiplicity and g.vertex_count <= 20
+    assert all(len(members) == 3 for members in g.edge_members)
+    assert G.random_graph(20, 30, seed=1) == G.random_graph(20, 30, seed=1)
+    assert graph(G.random_graph(300, 10, seed=2))
+
+
+def test_random_graph_loops():
+    g = compiled_graph(G.random_graph(2, 10, arity=4, loops=True, seed=3))
+    assert all(len(set(members)) < 4 for members in g.edge_members)
+    with pytest.raises(AssertionError):
+        G.random_graph(2, 10, arity=4)
+
+
+def test_relabelled_graph():
+    g = G.random_graph(30, 60, arity=3, multiplicity=2, seed=4)
+    h = G.relabelled_graph(g, seed=5)
+    assert is_isomorphic(g, h)
+    assert is_morphism(G.random_relabelling(g, seed=5), g, h)
+
+
+@pytest.mark.parametrize('edge_count', [1, 5, 20])
+def test_random_subgraph(edge_count):
+    h = G.random_graph(15, 25, arity=3, multiplicity=2, seed=edge_count)
+    g = G.random_subgraph(h, edge_count, seed=6)
+    assert compiled_graph(g).multiplicity == edge_count
+    assert subgraph(g, h)
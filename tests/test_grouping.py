@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+import os
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import grouping as G
+from multihypergraph.generators import random_graph, relabelled_graph
+from multihypergraph.morphisms import is_isomorphic, translate_graph
+from multihypergraph.objects import edges
+
+
+def collection(seed=0):
+    """Return relabelled copies of a few graphs, some of them sharing all
+    cheap invariants."""
+    bases = [random_graph(6, 8, arity=3, multiplicity=2, seed=seed + i)
+             for i in range(4)]
+    # Two 6-cycles and two triangles, with equal invariants.
+    bases += ['ab,bc,cd,de,ef,fa', 'ab,bc,ca,de,ef,fd']
+    return [relabelled_graph(bases[i % len(bases)], seed=seed + i)
+            for i in range(30)] + ['xy']
+
+
+def test_invariant_hash():
+    assert G.invariant_hash('ab,bc,ca,de,ef,fd') \
+        == G.invariant_hash('ab,bc,cd,de,ef,fa')
+    assert G.invariant_hash('ab,bc') == G.invariant_hash('yz,xy')
+    assert G.invariant_hash('ab,bc') != G.invariant_hash('ab,cd')
+
+
+@pytest.mark.parametrize('workers,partitions', [(0, 1), (0, 7), (2, 3)])
+def test_group_by_isomorphism(workers, partitions):
+    graphs = collection()
+    classes = list(G.group_by_isomorphism(graphs, workers=workers,
+                                          partitions=partitions,
+                                          chunksize=4))
+    positions = sorted(m.position for c in classes for m in c.members)
+    assert positions == list(range(len(graphs)))
+    assert len(classes) == 7
+    for c in classes:
+        assert c.representative == c.members[0].graph
+        assert [m.position for m in c.members] \
+            == sorted(m.position for m in c.members)
+        for m in c.members:
+            assert m.graph == graphs[m.position]
+            assert edges(translate_graph(m.graph, m.morphism)) \
+                == edges(c.representative)
+    representatives = [c.representative for c in classes]
+    assert not any(is_isomorphic(g, h) for i, g in enumerate(representatives)
+                   for h in representatives[i + 1:])
+
+
+def test_spilled_partitions_are_removed(tmp_path):
+    classes = G.group_by_isomorphism(collection(), workers=0,
+                                     directory=str(tmp_path))
+    next(classes)
+    [spill] = os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path / spill)) < G.DEFAULT_PARTITIONS
+    list(classes)
+    assert os.listdir(tmp_path) == []
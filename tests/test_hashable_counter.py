@@ -1,9 +1,11 @@
 #!/usr/bin/env python
 
 import collections
+import pickle
 
 from .context import multihypergraph
 from multihypergraph.hashable_counter import frozencounter
+import pytest
 
 def test_basic_properties():
     assert frozencounter('aab') == frozencounter('aab')
@@ -15,4 +17,42 @@ def test_basic_properties():
 def test_nested_properties():
     assert frozencounter([frozencounter('aab'), frozencounter('aba')]) == frozencounter({frozencounter('aab'): 2})
     assert frozencounter(frozencounter()) == {}
-    assert frozencounter(frozencounter()) == collections.Counter()
\ No newline at end of file
+    assert frozencounter(frozencounter()) == collections.Counter()
+
+def test_hash_is_independent_of_order():
+    assert hash(frozencounter('aab')) == hash(frozencounter('baa'))
+    assert hash(frozencounter([frozencounter('ab'), frozencounter('abb')])) \
+        == hash(frozencounter([frozencounter('bba'), frozencounter('ba')]))
+    assert hash(frozencounter({'a': 0})) == hash(frozencounter())
+
+def test_unsortable_keys():
+    assert frozencounter([1, 'a', 1]) == frozencounter(['a', 1, 1])
+    assert hash(frozencounter([1, 'a', 1])) == hash(frozencounter(['a', 1, 1]))
+
+def test_mutation_raises_error():
+    c = frozencounter('aab')
+    for mutate in [lambda: c.__setitem__('a', 1), lambda: c.__delitem__('a'),
+                   lambda: c.update('a'), lambda: c.subtract('a'),
+                   c.clear, lambda: c.pop('a'), c.popitem,
+                   lambda: c.setdefault('c', 1)]:
+        with pytest.raises(TypeError):
+            mutate()
+    with pytest.raises(TypeError):
+        c += frozencounter('a')
+    assert c == frozencounter('aab')
+
+def test_copies_are_mutable():
+    c = frozencounter('aab')
+    copy = c.copy()
+    copy['a'] += 1
+    copy.subtract('b')
+    assert copy == collections.Counter({'a': 3, 'b': 0})
+    assert c == frozencounter('aab')
+
+def test_counter_operations_return_new_counters():
+    assert frozencounter('ab') + frozencounter('b') == collections.Counter('abb')
+    assert frozencounter('abb') - frozencounter('b') == collections.Counter('ab')
+    assert frozencounter('ab').copy() == frozencounter('ab')
+
+def test_pickling():
+    assert pickle.loads(pickle.dumps(frozencounter('aab'))) == frozencounter('aab')
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import homomorphisms as G
+from multihypergraph.generators import random_graph
+from multihypergraph.matching import (Budget, CancellationToken,
+                                      SearchCancelled, SearchTimeout)
+from multihypergraph.morphisms import generate_vertexmaps, iter_embeddings
+from multihypergraph.objects import compiled_graph, edges
+
+
+def brute_force(g, h, injective=False):
+    """Count homomorphisms by checking every vertexmap."""
+    g, h = compiled_graph(g), compiled_graph(h)
+    return sum(1 for d in generate_vertexmaps(g, h, injective=injective)
+               if all(tuple(sorted(h.ids[d[g.labels[v]]] for v in members))
+                      in h.edge_table for members in g.edge_members))
+
+
+def test_counting_colourings():
+    triangle = 'ab,bc,ca'
+    assert G.count_homomorphisms('ab', triangle) == 6
+    assert G.count_homomorphisms('ab,bc,ca,cd,da', triangle) == 6
+    assert G.count_homomorphisms('ab,bc,cd,da', triangle) == 18
+    assert G.count_homomorphisms(triangle, 'ab,bc,cd,da') == 0
+    assert G.count_homomorphisms('ab,ab', 'xy') == 2
+    assert G.count_homomorphisms('ab,ab', 'xy', weighted=True) == 2
+    assert G.count_homomorphisms('ab', 'xy,xy,xx', weighted=True) == 5
+
+
+def test_collapsed_edges():
+    # A collapsed edge of h can receive an edge of g whose vertices merge.
+    assert G.count_homomorphisms('ab', 'xx') == 1
+    assert G.count_homomorphisms('abc', 'xxy') == 3
+    assert G.count_homomorphisms('aab', 'xyz') == 0
+    assert G.count_injective_homomorphisms('ab', 'xx,xy') == 2
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_against_brute_force(seed):
+    g = random_graph(4, 4, arity=2, loops=seed % 2 == 0, seed=seed)
+    h = random_graph(4, 6, arity=2, multiplicity=2, loops=seed % 3 == 0,
+                     seed=seed + 100)
+    assert G.count_homomorphisms(g, h) == brute_force(g, h)
+    assert G.count_injective_homomorphisms(g, h) \
+        == brute_force(g, h, injective=True)
+
+
+def test_injective_homomorphisms_are_embeddings():
+    g = random_graph(6, 7, arity=3, seed=1)
+    h = random_graph(10, 40, arity=3, multiplicity=2, seed=2)
+    assert G.count_injective_homomorphisms(g, h) \
+        == iter_embeddings(g, h, count_only=True)
+
+
+def test_counting_within_limits():
+    g, h = 'ab,bc,cd,da', 'ab,bc,ca'
+    assert G.count_homomorphisms(g, h, budget=Budget(seconds=10)) == 18
+    assert G.count_injective_homomorphisms(
+        'ab,bc', h, budget=Budget(nodes=1000)) == 6
+    with pytest.raises(SearchTimeout):
+        G.count_homomorphisms(g, h, budget=Budget(nodes=10))
+    with pytest.raises(SearchTimeout):
+        G.count_injective_homomorphisms(g, h, budget=Budget(nodes=10))
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(SearchCancelled):
+        G.count_homomorphisms(g, h, token=token)
+
+
+def test_tree_decomposition():
+    cycle = 'ab,bc,cd,de,ea'
+    decomposition = G.tree_decomposition(cycle)
+    assert decomposition.width == 2
+    assert len(decomposition.bags) == 5
+    assert all(any(set(e) <= bag for bag in decomposition.bags)
+               for e in edges(cycle))
+    assert G.tree_decomposition('ab,bc,cd').width == 1
+    assert G.tree_decomposition('abcd').width == 3
+    assert decomposition.parents.count(None) == 1
+    assert G.tree_decomposition('ab,cd').parents.count(None) == 2
+
+
+def test_homomorphism_density():
+    assert G.homomorphism_density('ab', 'ab,bc,ca') == pytest.approx(6 / 9)
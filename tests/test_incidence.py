@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+import pytest
+np = pytest.importorskip('numpy')
+
+from .context import multihypergraph
+from multihypergraph import incidence as G
+from multihypergraph import invariants, morphisms
+from multihypergraph.objects import compiled_graph
+
+
+GRAPHS = ['x', 'xx,x', 'xy,yz,xy', 'xyx,yzw,zz', 'abc,abc,cd,dd,a']
+
+
+class TestIncidenceGraph(object):
+    def test_incidence_matrix(self):
+        ig = G.incidence_graph('xyx,yz,yz')
+        assert ig.edge_indptr.tolist() == [0, 2, 4]
+        assert ig.edge_vertices.tolist() == [0, 1, 1, 2]
+        assert ig.edge_data.tolist() == [2, 1, 1, 1]
+        assert ig.multiplicities.tolist() == [1, 2]
+        assert ig.indptr.tolist() == [0, 1, 3, 4]
+        assert ig.indices.tolist() == [0, 0, 1, 1]
+        assert ig.data.tolist() == [2, 1, 1, 1]
+
+    @pytest.mark.parametrize('g', GRAPHS)
+    def test_round_trip(self, g):
+        assert G.incidence_graph(g).to_compiled() == compiled_graph(g)
+        assert compiled_graph(G.incidence_graph(g).to_graph()) == \
+            compiled_graph(g)
+
+    def test_scipy_matrix(self):
+        pytest.importorskip('scipy')
+        matrix = G.incidence_graph('xyx,yz,yz').to_scipy()
+        assert matrix.toarray().tolist() == [[2, 0], [1, 1], [0, 1]]
+
+
+class TestVectorisedMethods(object):
+    def test_arities_and_degrees(self):
+        ig = G.incidence_graph('xyx,yz,yz')
+        assert G.arities(ig).tolist() == [3, 2]
+        assert G.degrees(ig).tolist() == [1, 3, 2]
+
+    def test_neighbours(self):
+        ig = G.incidence_graph('xy,yzw,ww')
+        assert G.neighbours(ig, 1).tolist() == [0, 2, 3]
+        assert G.neighbours(ig, 3).tolist() == [1, 2]
+
+    @pytest.mark.parametrize('g', GRAPHS)
+    def test_invariants_agree_with_invariants_module(self, g):
+        ig, cg = G.incidence_graph(g), compiled_graph(g)
+        assert G.arity_histogram(ig) == invariants.arity_histogram(cg)
+        assert G.loop_counts(ig) == invariants.loop_counts(cg)
+        assert G.degree_sequence(ig) == invariants.degree_sequence(cg)
+
+
+def test_is_morphism():
+    g, h = G.incidence_graph('xy,yz'), G.incidence_graph('ab,bc,cc')
+    assert morphisms.is_morphism({'x': 'a', 'y': 'b', 'z': 'c'}, g, h)
+    assert not morphisms.is_morphism({'x': 'a', 'y': 'c', 'z': 'b'}, g, h)
+    assert not morphisms.is_morphism({'x': 'a', 'y': 'b', 'z': 'b'}, g, h)
+    assert not morphisms.is_morphism({'x': 'a', 'y': 'b'}, g, h)
+    assert morphisms.is_morphism({'x': 'b', 'y': 'c', 'z': 'a'},
+                                 G.incidence_graph('xyy,z'), 'bcc,a')
+    assert not morphisms.is_morphism({'x': 'b', 'y': 'c'},
+                                     G.incidence_graph('xyy'), 'bbc')
+
+
+class TestValidateMorphisms(object):
+    def test_mask(self):
+        g, h = 'xy,yz', 'ab,bc,cc'
+        candidates = [[0, 1, 2], [0, 2, 1], [0, 1, 1], [2, 1, 0], [0, 1, 3]]
+        mask = G.validate_morphisms(candidates, g, h)
+        assert mask.tolist() == [True, False, False, True, False]
+
+    def test_collapsed_edges(self):
+        mask = G.validate_morphisms([[0, 1], [1, 0]], 'xxy', 'aab')
+        assert mask.tolist() == [True, False]
+
+    def test_isolated_vertices(self):
+        assert G.validate_morphisms([[0], [1]], 'x', 'a,b').tolist() \
+            == [True, True]
+        assert G.validate_morphisms([[0], [1]], 'x', 'a,bc').tolist() \
+            == [True, False]
+
+    @pytest.mark.parametrize('g', GRAPHS)
+    def test_agrees_with_is_morphism(self, g):
+        g, h = compiled_graph(g), compiled_graph('abc,abc,cd,dd,a,xyx,yz')
+        candidates = np.random.default_rng(0).integers(
+            0, h.vertex_count, size=(200, g.vertex_count))
+        expected = [morphisms.is_morphism(
+            {g.labels[i]: h.labels[y] for i, y in enumerate(row)}, g, h)
+                    for row in candidates]
+        assert G.validate_morphisms(candidates, g, h).tolist() == expected
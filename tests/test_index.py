@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import index as G
+from multihypergraph.matching import (Budget, CancellationToken,
+                                      SearchCancelled, SearchTimeout)
+from multihypergraph.morphisms import is_morphism, subgraph
+from multihypergraph.objects import labelled_graph
+
+
+HOSTS = ['ab,bc,ca', 'ab,bc,cd', 'abc,cd', 'aab,bc', 'ab,ab,bc', 'a,b,c']
+PATTERNS = ['xy', 'xy,yz', 'xy,yz,zx', 'xyz', 'xxy', 'xy,xy', 'x,y', 'xy,zw']
+
+
+def test_edge_shape():
+    assert G.edge_shape((0, 1)) == (1, 1)
+    assert G.edge_shape((0, 0, 1)) == (1, 2)
+    assert G.edge_shape((2, 2)) == (2,)
+
+
+def test_features():
+    features = G.features('ab,ab,bc')
+    assert features['edge', (1, 1)] == 3
+    assert features['degree', 1] == 3
+    assert features['degree', 3] == 1
+    assert features['pair', ((1, 1), 1), ((1, 1), 1)] == 4
+    assert G.features('aab,bc')['pair', ((1, 1), 1), ((1, 2), 1)] == 1
+
+
+def test_pairs_are_counted_without_listing_them():
+    hub = G.features(labelled_graph([(0, i) for i in range(1, 3001)]
+                                    + [(0, 0)]))
+    assert hub['pair', ((1, 1), 1), ((1, 1), 1)] == 3000 * 2999 // 2
+    assert hub['pair', ((1, 1), 1), ((2,), 2)] == 3000
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_query_agrees_with_subgraph(pattern):
+    index = G.GraphIndex(HOSTS)
+    assert [key for key, _ in index.query(pattern)] \
+        == [key for key, h in enumerate(HOSTS) if subgraph(pattern, h)]
+    assert set(index.candidates(pattern)) >= set(
+        key for key, _ in index.query(pattern))
+    for key, morphism in index.query(pattern):
+        assert is_morphism(morphism, pattern, HOSTS[key])
+
+
+def test_query_within_limits():
+    index = G.GraphIndex(HOSTS)
+    assert list(index.query('xy,yz', Budget(seconds=10))) \
+        == list(index.query('xy,yz'))
+    with pytest.raises(SearchTimeout):
+        list(index.query('xy,yz', Budget(nodes=0)))
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(SearchCancelled):
+        list(index.query('xy', token=token))
+
+
+def test_candidates_are_pruned():
+    index = G.GraphIndex(HOSTS)
+    assert index.candidates('xy,yz,zx') == [0]
+    assert index.candidates('xyz') == [2]
+    assert index.candidates('xyzw') == []
+
+
+def test_insert_and_delete():
+    index = G.GraphIndex()
+    assert index.insert('ab,bc') == 0
+    assert index.insert('abc', key='hyper') == 'hyper'
+    assert index.insert('ab') == 1
+    assert len(index) == 3
+    assert [key for key, _ in index.query('xy')] == [0, 1]
+    assert index.delete(0).graph == 'ab,bc'
+    assert 0 not in index
+    assert [key for key, _ in index.query('xy')] == [1]
+    assert [key for key, _ in index.query('xy,yz')] == []
+    index.delete('hyper')
+    index.delete(1)
+    assert not index.postings
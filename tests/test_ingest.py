@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+import io
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import ingest as G
+from multihypergraph.objects import compiled_graph, labelled_graph
+
+
+def test_read_records():
+    stream = io.StringIO('ab,bc\n\n ca \nd\n')
+    assert list(G.read_records(stream)) == ['ab', 'bc', 'ca', 'd']
+
+
+@pytest.mark.parametrize('chunksize', [1, 2, 3, 1000])
+def test_records_split_across_chunks(chunksize):
+    stream = io.StringIO('abc,bcd\ncde,def')
+    assert list(G.read_records(stream, chunksize)) \
+        == ['abc', 'bcd', 'cde', 'def']
+
+
+def test_ingest():
+    g = G.ingest(io.StringIO('ab\nbc\nab\naab'), chunksize=3)
+    assert g == compiled_graph('ab,bc,ab,aab')
+    assert g.multiplicity == 4
+
+
+def test_ingest_from_file(tmp_path):
+    path = tmp_path / 'edges.txt'
+    path.write_text('ab,bc\nca\n')
+    assert G.ingest(str(path)) == compiled_graph('ab,bc,ca')
+
+
+def test_ingest_checks_axioms():
+    with pytest.raises(AssertionError):
+        G.ingest(io.StringIO('ab\nb~c'))
+    with pytest.raises(AssertionError):
+        G.ingest(io.StringIO('ab\nb c'))
+
+
+@pytest.mark.parametrize('text', ['ab,,bc', 'ab,bc,', 'ab,\nbc', ',ab',
+                                  'ab, ,bc'])
+@pytest.mark.parametrize('chunksize', [1, 3, 1000])
+def test_empty_records_raise_error(text, chunksize):
+    with pytest.raises(AssertionError, match='Empty edges not allowed.'):
+        list(G.read_records(io.StringIO(text), chunksize))
+
+
+def test_bad_records_fail_as_they_are_read():
+    stream = io.StringIO('ab\nb~c\n' + 'ab\n' * 1000)
+    with pytest.raises(AssertionError):
+        G.ingest(stream, chunksize=4)
+    assert stream.tell() < 100
+
+
+def test_ingest_labelled():
+    g = G.ingest_labelled(io.StringIO('v1 v2\nv2\tv10\nv1 v2'))
+    assert g == labelled_graph('v1 v2,v2 v10,v1 v2')
+
+
+def test_progress():
+    reports = []
+    G.ingest(io.StringIO('ab\n' * 10), chunksize=9, progress=reports.append)
+    assert [report.characters for report in reports] == [9, 18, 27, 30, 30]
+    assert reports[-1].edges == 10
+    assert reports[-1].edges_per_second >= 0
+
+
+def test_compile_edges():
+    assert G.compile_edges(['ab', 'ba', 'c'], [1, 2, 1]) \
+        == compiled_graph('ab,ab,ab,c')
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+from .context import multihypergraph
+from multihypergraph import invariants as G
+from multihypergraph import morphisms
+from multihypergraph.objects import compiled_graph
+import pytest
+
+
+def test_arity_histogram():
+    assert G.arity_histogram(compiled_graph('ab,ab,abc,a')) == \
+        ((1, 1), (2, 2), (3, 1))
+
+
+def test_loop_counts():
+    assert G.loop_counts(compiled_graph('aa,aa,aab,ab,a')) == (2, 1)
+
+
+def test_degree_sequence():
+    assert G.degree_sequence(compiled_graph('ab,ab,bc,bb')) == (4, 2, 1)
+
+
+def test_neighbourhood_signatures_are_relabelling_invariant():
+    assert G.neighbourhood_signatures(compiled_graph('ab,bcc')) == \
+        G.neighbourhood_signatures(compiled_graph('yxx,zy'))
+
+
+class TestAdmissible(object):
+    def test_subgraphs_are_admissible(self):
+        assert G.admissible('ab', 'xy,yz')
+        assert G.admissible('ab,ab', 'xy,yx,yz')
+        assert G.admissible('aab', 'xxy,yz')
+
+    def test_isomorphic_graphs_are_admissible(self):
+        assert G.admissible('ab,bc', 'zy,yx', isomorphism=True)
+
+    def test_rejections_are_counted_per_invariant(self):
+        G.reset_statistics()
+        assert not G.admissible('ab,bc,cd', 'xy,yz')
+        assert not G.admissible('aa', 'xy')
+        assert not G.admissible('ab,ac,ad', 'wx,xy,yz')
+        assert not G.admissible('ab,ac,ad', 'wx,xy,yz', isomorphism=True)
+        assert G.admissible('ab', 'xy')
+        assert G.statistics == {'checked': 5, 'passed': 1,
+                                'vertex count': 1, 'loop counts': 1,
+                                'degree sequence': 2}
+
+    def test_search_entry_points_use_invariants(self):
+        G.reset_statistics()
+        assert morphisms.subgraph('ab,ac,ad', 'wx,xy,yz') == {}
+        assert not morphisms.is_isomorphic('ab,ac,ad', 'wx,xy,yz')
+        assert morphisms.isomorphism('ab,ac,ad', 'wx,xy,yz') == {}
+        assert G.statistics['degree sequence'] == 3
+
+
+def test_registered_invariants_are_checked():
+    invariant = G.register_invariant('has vertex a',
+                                     lambda g: 'a' in g.ids,
+                                     lambda x, y: x <= y)
+    try:
+        assert not G.admissible('ab', 'xy')
+        assert G.admissible('xy', 'ab')
+    finally:
+        G.INVARIANTS.remove(invariant)
+
+
+def test_invariant_names_are_unique():
+    with pytest.raises(AssertionError):
+        G.register_invariant('vertex count', len, lambda x, y: True)
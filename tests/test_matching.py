@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+from .context import multihypergraph
+from multihypergraph import matching as G
+from multihypergraph.objects import compiled_graph
+import pytest
+
+
+def all_embeddings(g, h):
+    return set(G.embeddings(G.Plan(compiled_graph(g), compiled_graph(h))))
+
+
+def test_vertex_signatures():
+    signatures = G.vertex_signatures(compiled_graph('xxy,xy,xy'))
+    assert signatures[0] == {(3, 2): 1, (2, 1): 2}
+    assert signatures[1] == {(3, 1): 1, (2, 1): 2}
+
+
+def test_neighbourhoods():
+    assert G.neighbourhoods(compiled_graph('xy,yz,zz')) == \
+        [{1}, {0, 2}, {1}]
+
+
+def test_embeddings_of_an_edge():
+    assert all_embeddings('ab', 'xy') == {(0, 1), (1, 0)}
+    assert all_embeddings('ab', 'xy,yz') == {(0, 1), (1, 0), (1, 2), (2, 1)}
+
+
+def test_embeddings_respect_multiplicity():
+    assert all_embeddings('ab,ab', 'xy,yz') == set()
+    assert all_embeddings('ab,ab', 'xy,yz,zy') == {(1, 2), (2, 1)}
+
+
+def test_embeddings_respect_collapsed_edges():
+    assert all_embeddings('aab', 'xyy') == {(1, 0)}
+    assert all_embeddings('aa', 'xy') == set()
+    assert all_embeddings('ab', 'xx') == set()
+
+
+def test_embeddings_respect_hyperedges():
+    assert all_embeddings('ab', 'xyz') == set()
+    assert len(all_embeddings('abc', 'xyz')) == 6
+
+
+def test_embeddings_are_injective():
+    assert all_embeddings('ab,bc', 'xy') == set()
+
+
+def test_first_embedding():
+    assert G.first_embedding(compiled_graph('ab,bc,ca'),
+                             compiled_graph('xy,yz')) is None
+    assert G.first_embedding(compiled_graph('ab,bc'),
+                             compiled_graph('xy,yz')) in [(0, 1, 2), (2, 1, 0)]
+
+
+def test_node_budget():
+    g, h = compiled_graph('ab,bc,cd'), compiled_graph('ab,bc,cd,de,ea')
+    with pytest.raises(G.SearchTimeout):
+        G.first_embedding(g, h, max_nodes=1)
+    assert G.first_embedding(g, h, max_nodes=1000) is not None
+
+
+def test_cancellation():
+    token = G.CancellationToken()
+    g, h = compiled_graph('ab,bc'), compiled_graph('ab,bc,ca')
+    assert G.first_embedding(g, h, token=token) is not None
+    token.cancel()
+    assert token.cancelled
+    with pytest.raises(G.SearchCancelled):
+        G.first_embedding(g, h, token=token)
+    with pytest.raises(G.SearchInterrupted):
+        G.first_embedding(g, h, deadline=0.0)
+
+
+def test_checkpoint():
+    assert G.checkpoint(0) == -1
+    assert G.checkpoint(0, max_nodes=10) == 11
+    assert G.checkpoint(0, max_nodes=10,
+                        token=G.CancellationToken()) == 11
+    assert G.checkpoint(0, token=G.CancellationToken()) == G.CLOCK_INTERVAL
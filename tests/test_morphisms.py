@@ -5,6 +5,9 @@
 from .context import multihypergraph
 from multihypergraph import morphisms as G
 from multihypergraph.hashable_counter import frozencounter
+from multihypergraph.matching import (Budget, CancellationToken, SearchCancelled,
+                                     SearchTimeout)
+from multihypergraph.objects import compiled_graph, edges, labelled_graph
 import pytest
 
 class TestIsVertexmap(object):
@@ -89,6 +92,15 @@ def test_generate_vertexmaps():
         G.generate_vertexmaps('ab,ab', 'xy,yx', injective = False)
 
 
+def test_generate_all_vertexmaps():
+    maps = [tuple(sorted(d.items()))
+            for d in G.generate_vertexmaps('abc', 'xy', injective=False)]
+    assert len(maps) == len(set(maps)) == 2 ** 3
+    maps = [tuple(sorted(d.items()))
+            for d in G.generate_vertexmaps('ab,bc', 'wx,yz')]
+    assert len(maps) == len(set(maps)) == 4 * 3 * 2
+
+
 def test_subgraph():
     assert G.subgraph('ab', 'xy') in \
         [{'a': 'x', 'b': 'y'}, {'a': 'y', 'b': 'x'}]
@@ -110,3 +122,193 @@ def test_isomorphism():
     assert G.isomorphism('ab', 'xy,pq') == {}
     assert G.isomorphism('ab', 'xy,yx') == {}
     assert G.isomorphism('ab', 'xyz') == {}
+
+
+def test_compiled_graphs_are_accepted():
+    g, h = compiled_graph('ab,bc'), compiled_graph('xy,yz,zx')
+    assert G.is_morphism({'a': 'x', 'b': 'y', 'c': 'z'}, g, h)
+    assert G.is_morphism({'a': 'x', 'b': 'y', 'c': 'z'}, g, 'xy,yz,zx')
+    assert G.subgraph(g, h)
+    assert G.isomorphism(compiled_graph('ab'), 'xy') in \
+        [{'a': 'x', 'b': 'y'}, {'a': 'y', 'b': 'x'}]
+    assert G.translate_graph(g, {'a': 'x', 'b': 'y', 'c': 'z'}) == 'xy,yz'
+
+
+def test_isomorphism_of_relabelled_graphs():
+    m = G.isomorphism('ab,bc,ccd,cd', 'zyy,zy,xy,wx')
+    assert m
+    assert edges(G.translate_graph('ab,bc,ccd,cd', m)) == \
+        edges('zyy,zy,xy,wx')
+
+
+def test_is_isomorphic():
+    assert G.is_isomorphic('ab,bc', 'xy,zy')
+    assert G.is_isomorphic('ab,ab', 'xy,yx')
+    assert not G.is_isomorphic('ab,ab', 'xy,yz')
+    assert not G.is_isomorphic('ab,bc,cd,da', 'ab,bc,ca,d')
+
+
+class TestIterEmbeddings(object):
+    def test_embeddings_are_valid_morphisms(self):
+        morphisms = list(G.iter_embeddings('ab,bc', 'xy,yz,zx'))
+        assert len(morphisms) == 6
+        assert all(G.is_morphism(m, 'ab,bc', 'xy,yz,zx') for m in morphisms)
+        assert len({tuple(sorted(m.items())) for m in morphisms}) == 6
+
+    def test_embeddings_respect_multiplicity(self):
+        assert list(G.iter_embeddings('ab,ab', 'xy,yz,zy')) in \
+            [[{'a': 'y', 'b': 'z'}, {'a': 'z', 'b': 'y'}],
+             [{'a': 'z', 'b': 'y'}, {'a': 'y', 'b': 'z'}]]
+
+    def test_limit(self):
+        assert len(list(G.iter_embeddings('ab', 'xy,yz,zx', limit=4))) == 4
+        assert G.iter_embeddings('ab', 'xy,yz,zx', limit=4,
+                                 count_only=True) == 4
+
+    def test_count_only(self):
+        assert G.iter_embeddings('ab', 'xy,yz,zx', count_only=True) == 6
+        assert G.iter_embeddings('abc', 'xy,yz,zx', count_only=True) == 0
+
+    def test_resuming_from_a_cursor(self):
+        everything = list(G.iter_embeddings('ab,bc', 'wx,xy,yz,zw,wy'))
+        first = G.iter_embeddings('ab,bc', 'wx,xy,yz,zw,wy', limit=5)
+        assert list(first) == everything[:5]
+        rest = G.iter_embeddings('ab,bc', 'wx,xy,yz,zw,wy',
+                                 cursor=first.cursor)
+        assert list(rest) == everything[5:]
+        assert rest.cursor.exhausted
+        assert list(G.iter_embeddings('ab,bc', 'wx,xy,yz,zw,wy',
+                                      cursor=rest.cursor)) == []
+
+
+def test_automorphisms():
+    assert G.automorphisms('ab,bc', count_only=True) == 2
+    assert G.automorphisms('ab,ac,ad,bc,bd,cd', count_only=True) == 24
+    assert G.automorphisms('ab,ab,bc', count_only=True) == 1
+    assert list(G.automorphisms('aab')) == [{'a': 'a', 'b': 'b'}]
+
+
+def test_embeddings_up_to_symmetry():
+    assert G.iter_embeddings('ab,bc,ca', 'ab,bc,ca,cd,da', count_only=True,
+                             up_to_symmetry=True) == 2
+    assert len(list(G.iter_embeddings('ab', 'ab,bc', up_to_symmetry=True))) \
+        == 2
+    for morphism in G.iter_embeddings('ab,bc', 'xy,yz,zw',
+                                      up_to_symmetry=True):
+        assert G.is_morphism(morphism, 'ab,bc', 'xy,yz,zw')
+
+
+@pytest.mark.parametrize('g, h', [('ab,bc,ca', 'ab,bc,ca,cd,da'),
+                                  ('ab,ac,ad', 'ab,ac,ad,ae,bc'),
+                                  ('abc,cd', 'abc,cde,ab,cd'),
+                                  ('ab,cd', 'ab,bc,cd,de')])
+def test_count_embedding_classes(g, h):
+    classes, multiplier = G.count_embedding_classes(g, h)
+    assert classes * multiplier == G.iter_embeddings(g, h, count_only=True)
+    assert multiplier == G.automorphisms(g, count_only=True)
+
+
+class TestBoundedSearch(object):
+    def test_tri_state(self):
+        found = G.bounded_subgraph('ab,bc', 'xy,yz,zx')
+        assert found.found is True
+        assert G.is_morphism(found.morphism, 'ab,bc', 'xy,yz,zx')
+        assert found.stats.counters['embeddings'] == 1
+        missing = G.bounded_subgraph('abc', 'xy,yz,zx')
+        assert missing.found is False and missing.morphism == {}
+        unknown = G.bounded_subgraph('ab,bc,cd', 'ab,bc,cd,de,ea',
+                                     Budget(nodes=1))
+        assert unknown.found is None and unknown.morphism == {}
+        assert 'interrupted' in unknown.stats.phases
+
+    def test_bounded_isomorphism(self):
+        assert G.bounded_isomorphism('ab,bc', 'yz,xy').found is True
+        assert G.bounded_isomorphism('ab,bc', 'xy,yz,zx').found is False
+        hexagon = 'ab,bc,cd,de,ef,fa'
+        assert G.bounded_isomorphism(hexagon, hexagon,
+                                     Budget(nodes=2)).found is None
+        assert G.bounded_isomorphism(hexagon, hexagon,
+                                     Budget(seconds=10)).found is True
+
+    def test_cancelled(self):
+        token = CancellationToken()
+        token.cancel()
+        result = G.bounded_subgraph('ab,bc', 'xy,yz,zx', token=token)
+        assert result.found is None
+
+    def test_resuming_an_interrupted_enumeration(self):
+        g, h = 'ab,bc,cd', 'ab,bc,cd,de,ea,ac,bd'
+        everything = list(G.iter_embeddings(g, h))
+        collected = []
+        cursor = None
+        while cursor is None or not cursor.exhausted:
+            embeddings = G.iter_embeddings(g, h, cursor=cursor,
+                                           budget=Budget(nodes=10))
+            try:
+                for morphism in embeddings:
+                    collected.append(morphism)
+            except SearchTimeout:
+                assert embeddings.interrupted
+            cursor = embeddings.cursor
+        assert collected == everything
+
+    def test_interrupted_enumeration_stays_interrupted(self):
+        g, h = 'ab,bc,cd', 'ab,bc,cd,de,ea,ac,bd'
+        embeddings = G.iter_embeddings(g, h, budget=Budget(nodes=10))
+        with pytest.raises(SearchTimeout):
+            list(embeddings)
+        cursor = embeddings.cursor
+        for _ in range(2):
+            with pytest.raises(SearchTimeout):
+                next(embeddings)
+        assert not embeddings.exhausted
+        assert embeddings.cursor == cursor and not cursor.exhausted
+        with pytest.raises(SearchTimeout):
+            embeddings.count()
+
+    def test_every_search_accepts_limits(self):
+        hexagon = 'ab,bc,cd,de,ef,fa'
+        with pytest.raises(SearchTimeout):
+            G.is_isomorphic(hexagon, hexagon, Budget(nodes=2))
+        assert G.is_isomorphic(hexagon, hexagon, Budget(seconds=10))
+        with pytest.raises(SearchTimeout):
+            G.automorphisms(hexagon, count_only=True, budget=Budget(nodes=2))
+        with pytest.raises(SearchTimeout):
+            G.count_embedding_classes('ab,bc', hexagon, Budget(nodes=2))
+        assert G.count_embedding_classes('ab,bc', hexagon,
+                                         Budget(seconds=10)) == (6, 2)
+        token = CancellationToken()
+        token.cancel()
+        with pytest.raises(SearchCancelled):
+            G.is_isomorphic(hexagon, hexagon, token=token)
+
+    def test_symmetry_of_inadmissible_pairs_counts_against_the_budget(self):
+        clique = labelled_graph([(i, j) for i in range(40)
+                                 for j in range(i + 1, 40)])
+        with pytest.raises(SearchTimeout):
+            G.count_embedding_classes(clique, 'ab', Budget(seconds=0.01))
+        token = CancellationToken()
+        token.cancel()
+        with pytest.raises(SearchCancelled):
+            G.count_embedding_classes(clique, 'ab', token=token)
+        assert G.count_embedding_classes('ab,bc', 'ab', Budget(seconds=10)) \
+            == (0, 2)
+
+
+class TestLabelledGraphs(object):
+    def test_translate(self):
+        g = labelled_graph('v1 v2,v2 v3,v1 v2')
+        image = G.translate(g, {'v1': 10, 'v2': 20, 'v3': 30})
+        assert image == labelled_graph([[10, 20], [20, 30], [10, 20]])
+        assert G.translate('ab,bc', {'a': 'x', 'b': 'y', 'c': 'x'}) == \
+            compiled_graph('xy,xy')
+        with pytest.raises(ValueError):
+            G.translate_graph('ab', {'a': 'x1', 'b': 'x2'})
+
+    def test_morphisms_between_labelled_graphs(self):
+        g = labelled_graph('p1 p2,p2 p3')
+        h = labelled_graph([(i, i + 1) for i in range(1000)])
+        m = G.subgraph(g, h)
+        assert m and G.is_morphism(m, g, h)
+        assert G.isomorphism(labelled_graph('p1 p2,p2 p3'),
+                             labelled_graph('q3 q2,q1 q2'))['p2'] == 'q2'
@@ -107,3 +107,96 @@ class TestVertices(object):
     def test_empty_edge_raises_error(self):
         with pytest.raises(AssertionError):
             G.vertices('xy,')
+
+
+class TestCompiledGraph(object):
+    def test_round_trip_to_canonical_string(self):
+        assert G.graph(G.compiled_graph('xy,yz,xy')) == G.graph('xy,yz,xy')
+        assert str(G.compiled_graph('xyx')) == G.graph('xyx')
+
+    def test_compiling_is_idempotent(self):
+        g = G.compiled_graph('xy,yz')
+        assert G.compiled_graph(g) is g
+
+    def test_interned_vertex_ids(self):
+        g = G.compiled_graph('xy,yz')
+        assert g.labels == ('x', 'y', 'z')
+        assert g.ids == {'x': 0, 'y': 1, 'z': 2}
+        assert g.edge_members == ((0, 1), (1, 2))
+
+    def test_collapsed_edges_and_multiplicities(self):
+        g = G.compiled_graph('xyx,xy,yx')
+        assert g.edge_table == {(0, 0, 1): 1, (0, 1): 2}
+        assert g.edge_multiplicities == (1, 2)
+
+    def test_cached_counts(self):
+        g = G.compiled_graph('xy,xy,xyz')
+        assert (g.vertex_count, g.edge_count, g.multiplicity) == (3, 2, 3)
+
+    def test_edges_and_vertices_accept_compiled_graphs(self):
+        assert G.edges(G.compiled_graph('xy,yx')) == G.edges('xy,yx')
+        assert G.vertices(G.compiled_graph('xy,yz')) == G.vertices('xy,yz')
+
+    def test_equality_ignores_edge_order(self):
+        assert G.compiled_graph('xy,yz') == G.compiled_graph('zy,yx')
+        assert G.compiled_graph('xy') != G.compiled_graph('xy,xy')
+
+    def test_compiled_graphs_are_immutable(self):
+        with pytest.raises(AttributeError):
+            G.compiled_graph('xy').color = 'red'
+
+    def test_empty_graph_raises_error(self):
+        with pytest.raises(AssertionError):
+            G.compiled_graph('')
+
+
+class TestVertexTable(object):
+    def test_ids_are_dense_and_in_order_of_first_appearance(self):
+        table = G.VertexTable(['v10', 'v2'])
+        assert table.intern('v2') == 1
+        assert table.intern(('x', 3)) == 2
+        assert table.labels == ['v10', 'v2', ('x', 3)]
+        assert len(table) == 3 and 'v10' in table
+
+
+class TestLabelledGraph(object):
+    def test_multi_character_labels(self):
+        g = G.labelled_graph('v1 v2,v2 v10,v10 v10 v1')
+        assert g.vertex_set == {'v1', 'v2', 'v10'}
+        assert g.edge_table == {(0, 1): 1, (1, 2): 1, (0, 2, 2): 1}
+
+    def test_round_trip(self):
+        g = G.labelled_graph('v1 v2,v2 v10,v1 v2')
+        assert G.labelled_graph(g.edge_labels) == g
+        assert eval(repr(g), vars(G)) == g
+        ints = G.labelled_graph([[1, 2], [2, 3]])
+        assert repr(ints) == 'labelled_graph([[1, 2], [2, 3]])'
+        assert eval(repr(ints), vars(G)) == ints
+        assert repr(G.labelled_graph('a b,b c')) == "compiled_graph('ab,bc')"
+
+    def test_labelled_graphs_have_no_graph_string(self):
+        g = G.labelled_graph('v1 v2,v2 v3')
+        with pytest.raises(ValueError):
+            g.graph
+        with pytest.raises(ValueError):
+            G.graph(g)
+
+    def test_sequences_of_hashable_labels(self):
+        g = G.labelled_graph([[1, 2], (2, 3), [3, 3], [1, 2]])
+        assert g.vertex_count == 3
+        assert g.edge_table == {(0, 1): 2, (1, 2): 1, (2, 2): 1}
+
+    def test_many_vertices(self):
+        g = G.labelled_graph([(i, i + 1) for i in range(20000)])
+        assert g.vertex_count == 20001
+        assert g.edge_count == 20000
+
+    def test_reserved_symbols_raise_error(self):
+        with pytest.raises(AssertionError):
+            G.labelled_graph([['v1', 'v|2']])
+        with pytest.raises(AssertionError):
+            G.labelled_graph([['v1', '']])
+
+    def test_empty_edge_raises_error(self):
+        with pytest.raises(AssertionError):
+            G.labelled_graph('v1 v2,')
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import patterns as G
+from multihypergraph.generators import random_graph, random_subgraph
+from multihypergraph.matching import Budget, SearchTimeout
+from multihypergraph.morphisms import is_morphism, iter_embeddings, subgraph
+
+
+HOSTS = ['ab,bc,ca', 'ab,bc,cd', 'abc,cd', 'aab,bc', 'ab,ab,bc', 'a,b,c']
+PATTERNS = ['xy', 'xy,yz', 'xy,yz,zx', 'xyz', 'xxy', 'xy,xy', 'x,y', 'xy,zw',
+            'zy,yx']
+
+
+@pytest.mark.parametrize('h', HOSTS)
+def test_subgraphs_agree_with_subgraph(h):
+    results = G.PatternSet(PATTERNS).subgraphs(h)
+    assert len(results) == len(PATTERNS)
+    for g, morphism in zip(PATTERNS, results):
+        assert bool(morphism) == bool(subgraph(g, h))
+        if morphism:
+            assert is_morphism(morphism, g, h)
+
+
+def test_steps_are_shared():
+    patterns = G.PatternSet(['ab,bc', 'xy,yz,zw', 'bc,ab', 'xy,yz,zx'])
+    # The path 'ab,bc' is mapped in 3 steps, which the longer path and the
+    # triangle follow before adding one step each.
+    assert patterns.step_count == 5
+    assert patterns.paths[0] == patterns.paths[2]
+    assert G.PatternSet(['ab', 'ab,ab']).step_count == 3
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_all_matches_are_embeddings(seed):
+    h = random_graph(8, 14, arity=3, multiplicity=2, loops=True, seed=seed)
+    patterns = [random_subgraph(h, 3, seed=seed)] + [
+        random_graph(4, 3, arity=2, multiplicity=2, loops=True,
+                     seed=seed + i) for i in range(4)]
+    found = {i: [] for i in range(len(patterns))}
+    for pattern, morphism in G.PatternSet(patterns).matches(h, limit=None):
+        found[pattern].append(morphism)
+    for i, g in enumerate(patterns):
+        key = lambda m: sorted(m.items())
+        assert sorted(found[i], key=key) \
+            == sorted(iter_embeddings(g, h), key=key)
+
+
+def test_limit():
+    matches = list(G.PatternSet(['xy', 'xyz']).matches('ab,bc,ca', limit=2))
+    assert [pattern for pattern, _ in matches] == [0, 0]
+
+
+def test_budget():
+    motif = random_graph(9, 14, seed=0)
+    patterns = G.PatternSet(random_subgraph(motif, 5, seed=i)
+                            for i in range(20))
+    with pytest.raises(SearchTimeout):
+        list(patterns.matches(random_graph(100, 300, seed=1), limit=None,
+                              budget=Budget(nodes=100)))
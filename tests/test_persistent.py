@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import persistent as G
+from multihypergraph.invariants import degree_sequence
+from multihypergraph.objects import compiled_graph, edge, labelled_graph
+
+
+class TestPersistentMap(object):
+    def test_set_and_delete(self):
+        empty = G.PersistentMap()
+        one = empty.set('a', 1)
+        two = one.set('b', 2).set('a', 3)
+        assert len(empty) == 0 and len(one) == 1 and len(two) == 2
+        assert one['a'] == 1 and two['a'] == 3
+        assert dict(two.items()) == {'a': 3, 'b': 2}
+        assert dict(two.delete('a').items()) == {'b': 2}
+        assert 'a' in two and 'a' not in two.delete('a')
+        with pytest.raises(KeyError):
+            one.delete('b')
+
+    def test_many_keys(self):
+        items = {i * 7919 % 10007: i for i in range(5000)}
+        m = G.PersistentMap(items.items())
+        assert dict(m.items()) == items and len(m) == len(items)
+        for key in list(items)[::2]:
+            m = m.delete(key)
+            del items[key]
+        assert dict(m.items()) == items and len(m) == len(items)
+
+    def test_equal_hashes(self):
+        m = G.PersistentMap([(-1, 'a'), (-2, 'b')])
+        assert hash(-1) == hash(-2)
+        assert m[-1] == 'a' and m[-2] == 'b'
+        assert dict(m.delete(-1).items()) == {-2: 'b'}
+
+
+class TestPersistentGraph(object):
+    def test_add_and_remove(self):
+        g = G.persistent_graph('ab,bc')
+        h = g.add_edge('ca').add_edge('ab')
+        assert h.compiled() == compiled_graph('ab,ab,bc,ca')
+        assert g.compiled() == compiled_graph('ab,bc')
+        assert h.remove_edge('ab', 2).compiled() == compiled_graph('bc,ca')
+        assert h.edge_multiplicity('ba') == 2
+        with pytest.raises(AssertionError):
+            g.remove_edge('ca')
+
+    def test_vertices_and_degrees(self):
+        g = G.persistent_graph('ab,ab,bcc')
+        assert set(g.vertices()) == {'a', 'b', 'c'}
+        assert g.degrees['b'] == 3
+        assert g.degree_sequence() == (3, 2, 1)
+        g = g.remove_edge('bcc')
+        assert set(g.vertices()) == {'a', 'b'}
+        assert g.vertex_count == 2 and g.edge_count == 1
+        assert g.multiplicity == 2
+
+    def test_edges(self):
+        g = G.persistent_graph('ab,ab,c')
+        assert g.edges() == {edge('ab'): 2, edge('c'): 1}
+
+    def test_labelled_edges(self):
+        g = G.persistent_graph().add_edge(('v1', 'v2')).add_edge(('v2', 'v10'))
+        assert g.compiled() == labelled_graph('v1 v2,v2 v10')
+
+    def test_empty(self):
+        g = G.persistent_graph()
+        assert g.vertex_count == g.edge_count == g.multiplicity == 0
+        assert g.add_edge('ab').remove_edge('ab') == g
+        with pytest.raises(AssertionError):
+            g.add_edge('')
+
+    def test_empty_graph_has_no_graph_string(self):
+        g = G.persistent_graph('ab,bc').remove_edge('ab').remove_edge('bc')
+        assert g == G.persistent_graph()
+        with pytest.raises(ValueError):
+            g.graph
+        assert eval(repr(g), vars(G)) == g
+
+    def test_invariants_are_maintained(self):
+        g = G.persistent_graph()
+        for e in ['ab', 'bc', 'abc', 'aa', 'bc', 'cd']:
+            g = g.add_edge(e)
+        g = g.remove_edge('bc')
+        assert g.degree_sequence() == degree_sequence(
+            compiled_graph('ab,bc,abc,aa,cd'))
+        assert g == G.persistent_graph('cd,aa,abc,bc,ab')
+
+    def test_invariant_hash(self):
+        g = G.persistent_graph('ab,bc,bcd,dd')
+        assert g.invariant_hash == G.persistent_graph('xy,yz,yzw,ww') \
+            .invariant_hash
+        assert g.invariant_hash != g.add_edge('ab').invariant_hash
+        assert g.invariant_hash == g.add_edge('ab').remove_edge('ab') \
+            .invariant_hash
+
+    def test_invariant_hash_is_the_same_in_every_process(self):
+        script = ('from multihypergraph.persistent import persistent_graph; '
+                  "print(persistent_graph('ab,bc,bcd,dd').invariant_hash)")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        hashes = {subprocess.run([sys.executable, '-c', script], cwd=root,
+                                 env={**os.environ, 'PYTHONHASHSEED': seed},
+                                 capture_output=True, text=True,
+                                 check=True).stdout
+                  for seed in ['1', '2']}
+        assert hashes == {
+            f"{G.persistent_graph('ab,bc,bcd,dd').invariant_hash}\n"}
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+from .context import multihypergraph
+from multihypergraph import profiling as G
+from multihypergraph.morphisms import is_isomorphic, isomorphism, subgraph
+
+
+def test_off_by_default():
+    assert not G.enabled()
+    assert G.start('subgraph') is None
+
+
+def test_subgraph_stats():
+    with G.profiled() as calls:
+        assert G.enabled()
+        subgraph('ab,bc', 'ab,bc,ca,cd')
+        subgraph('abc', 'ab,bc')
+    assert not G.enabled()
+    found, rejected = calls
+    assert found.name == 'subgraph' and found.seconds > 0
+    assert set(found.phases) == {'compile', 'admissible', 'symmetry',
+                                 'search'}
+    assert found.counters['embeddings'] == 1
+    assert found.peak_depth == 3
+    assert found.counters['checked'] + found.counters['pruned'] \
+        <= found.counters['candidates']
+    assert found.counters['extended'] <= found.counters['checked']
+    assert set(rejected.phases) == {'compile', 'admissible'}
+
+
+def test_search_counters():
+    # Every embedding is a search node that extended the map at full depth.
+    with G.profiled() as calls:
+        subgraph('ab,bc,cd', 'ab,bc,cd,de,ea,ac')
+    stats = calls[0]
+    assert stats.counters['nodes'] >= stats.counters['extended'] >= 4
+    assert stats.peak_depth == 4
+
+
+def test_isomorphism_stats():
+    with G.profiled() as calls:
+        isomorphism('ab,bc,ca', 'xy,yz,zx')
+        is_isomorphic('ab,bc,ca', 'xy,yz,zx,zx')
+    iso, not_iso = calls
+    assert iso.counters['leaves'] >= 2 and iso.counters['automorphisms'] > 0
+    assert 'canonical' in iso.phases
+    assert not_iso.name == 'is_isomorphic'
+
+
+def test_listeners():
+    names = []
+    listener = lambda stats: names.append(stats.name)
+    G.add_listener(listener)
+    try:
+        with G.profiled(lambda stats: names.append('block')) as calls:
+            subgraph('ab', 'ab')
+        subgraph('ab', 'ab')
+    finally:
+        G.remove_listener(listener)
+    assert names == ['subgraph', 'block', 'subgraph'] and len(calls) == 1
+    assert not G.enabled()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import pickle
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import store as G
+from multihypergraph.objects import compiled_graph, labelled_graph
+
+
+GRAPHS = ['a', 'ab,bc,ca', 'abc,abc,cd', 'aab,bb,b', 'xy,yz']
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'graphs.mhg'
+    assert G.write_store(path, GRAPHS) == len(GRAPHS)
+    return path
+
+
+def test_round_trip(path):
+    with G.GraphStore(path) as store:
+        assert len(store) == len(GRAPHS)
+        assert [view.to_compiled() for view in store] \
+            == list(map(compiled_graph, GRAPHS))
+        assert store[-1].to_graph() == 'xy,yz'
+
+
+def test_views_read_the_mapped_file(path):
+    with G.GraphStore(path) as store:
+        view = store[2]
+        assert isinstance(view.edge_multiplicities, memoryview)
+        assert view.vertex_count == 4 and view.edge_count == 2
+        assert view.labels == ('a', 'b', 'c', 'd')
+        assert view.edge_members == ((0, 1, 2), (2, 3))
+        assert view.edge(1) == (2, 3)
+        assert list(view.edge_multiplicities) == [2, 1]
+
+
+def test_labels_are_pooled(tmp_path):
+    path = tmp_path / 'labelled.mhg'
+    with G.StoreWriter(path) as writer:
+        assert writer.add(labelled_graph('v1 v2,v2 v10')) == 0
+        assert writer.add(labelled_graph('v10 v1')) == 1
+    with G.GraphStore(path) as store:
+        assert store.label_count == 3
+        assert store[1].labels == ('v10', 'v1')
+        assert store[0].to_compiled() == labelled_graph('v1 v2,v2 v10')
+
+
+def test_non_string_labels_rejected(tmp_path):
+    with pytest.raises(AssertionError):
+        G.write_store(tmp_path / 'ints.mhg', [labelled_graph([[1, 2]])])
+
+
+def test_pickled_by_path(path):
+    with G.GraphStore(path) as store:
+        copy = pickle.loads(pickle.dumps(store))
+        assert copy.path == store.path
+        assert copy[1].to_graph() == store[1].to_graph()
+        copy.close()
+
+
+def test_not_a_store(tmp_path):
+    path = tmp_path / 'text.mhg'
+    path.write_bytes(b'ab,bc' * 100)
+    with pytest.raises(ValueError):
+        G.GraphStore(path)
+
+
+def test_out_of_range(path):
+    with G.GraphStore(path) as store:
+        with pytest.raises(IndexError):
+            store[len(GRAPHS)]
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+import itertools as it
+
+import pytest
+
+from .context import multihypergraph
+from multihypergraph import symmetry as G
+from multihypergraph.matching import Plan, embeddings
+from multihypergraph.morphisms import automorphisms
+from multihypergraph.objects import compiled_graph, labelled_graph
+
+
+def complete_graph(n):
+    return labelled_graph([[i, j] for i, j in it.combinations(range(n), 2)])
+
+
+@pytest.mark.parametrize('g', ['a', 'ab', 'ab,bc', 'ab,bc,ca', 'abc',
+                               'ab,cd', 'aab,bcc', 'ab,ab,bc', 'ab,bc,cd,da'])
+def test_automorphism_count(g):
+    assert G.automorphism_count(g) == automorphisms(g, count_only=True)
+
+
+def test_complete_graph():
+    assert G.automorphism_count(complete_graph(6)) == 720
+    assert len(G.symmetry(complete_graph(4)).conditions) == 3 + 2 + 1
+
+
+def test_conditions_leave_one_automorphism():
+    for g in ['ab,bc,cd,da', 'abc,cde,eaf', 'ab,cd,ef']:
+        g = compiled_graph(g)
+        plan = Plan(g, g, conditions=G.symmetry(g).conditions)
+        assert list(embeddings(plan)) == [tuple(range(g.vertex_count))]
+
+
+def test_memoised():
+    g = compiled_graph('ab,bc')
+    assert G.symmetry(g) is G.symmetry(g)